@@ -0,0 +1,62 @@
+"""
+Benchmark: single-pass diff parser vs. the previous regex split + per-handler re-split.
+
+    python -m benchmarks.diff_parser_bench [size_mb]
+"""
+import re
+import sys
+import time
+from shared.utils.diff_parser import parse_unified_diff
+
+
+def make_diff(target_bytes: int) -> str:
+    parts = []
+    size = 0
+    i = 0
+    while size < target_bytes:
+        body = "".join(f" context line {n}\n-old line {n}\n+new line {n}\n+added line {n}\n" for n in range(40))
+        chunk = (
+            f"diff --git a/pkg/module_{i}.py b/pkg/module_{i}.py\n"
+            f"index 1111111..2222222 100644\n--- a/pkg/module_{i}.py\n+++ b/pkg/module_{i}.py\n"
+            f"@@ -1,80 +1,120 @@ def f_{i}():\n{body}"
+        )
+        parts.append(chunk)
+        size += len(chunk)
+        i += 1
+    return "".join(parts)
+
+
+def legacy_parse(diff: str) -> dict:
+    """The former LanguageService + PythonHandler path: split, rebuild a mini diff, split and re-match."""
+    file_diffs = re.split(r'diff --git a/(.+?) b/\1\n', diff)[1:]
+    mini_diff = "".join(f"diff --git a/{f} b/{f}\n{c}\n" for f, c in zip(file_diffs[::2], file_diffs[1::2]))
+    result = {}
+    file_diffs = re.split(r'diff --git a/(.+?) b/\1\n', mini_diff)[1:]
+    for filename, chunk in zip(file_diffs[::2], file_diffs[1::2]):
+        modified, current = set(), 0
+        for line in chunk.splitlines():
+            if line.startswith('@@'):
+                match = re.match(r'@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@', line)
+                if match:
+                    current = int(match.group(1))
+            elif line.startswith('+') and not line.startswith('+++'):
+                modified.add(current)
+                current += 1
+            elif line.startswith(' ') or line.startswith('-'):
+                current += 1
+        result[filename] = modified
+    return result
+
+
+def timed(label: str, fn, arg) -> None:
+    start = time.perf_counter()
+    result = fn(arg)
+    print(f"{label:<14} {time.perf_counter() - start:8.2f}s  files={len(result)}")
+
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    diff = make_diff(int(size_mb * 1024 * 1024))
+    print(f"diff size: {len(diff) / 1024 / 1024:.1f} MB, lines: {diff.count(chr(10))}")
+    timed("legacy", legacy_parse, diff)
+    timed("single-pass", parse_unified_diff, diff)
@@ -0,0 +1,59 @@
+"""
+Benchmark: peak RSS of ingesting and consuming a large PR diff as one str vs. a SpooledDiff.
+
+Each variant runs in a fresh child process that receives the diff as 64 KB chunks (as the HTTP
+client does), extracts changed lines with the diff parser and builds the bounded prompt text
+used for summarization, then reports ru_maxrss.
+
+    python -m benchmarks.diff_spool_memory_bench [size_mb]
+"""
+import sys
+import resource
+import multiprocessing
+from shared.utils.diff_parser import parse_unified_diff
+from shared.utils.spooled_diff import SpooledDiff, CHUNK_SIZE, bounded_diff_text
+
+
+def iter_chunks(size_mb: int):
+    lines = []
+    i = 0
+    while True:
+        lines.append(
+            f"diff --git a/vendor/lib_{i}.js b/vendor/lib_{i}.js\n--- a/vendor/lib_{i}.js\n+++ b/vendor/lib_{i}.js\n@@ -1,0 +1,200 @@\n"
+            + "+var generated_value_with_a_long_name = compute(alpha, beta, gamma);\n" * 200
+        )
+        i += 1
+        if i % 20 == 0:
+            block = "".join(lines).encode()
+            lines = []
+            for start in range(0, len(block), CHUNK_SIZE):
+                yield block[start:start + CHUNK_SIZE]
+            size_mb -= len(block) / 1024 ** 2
+            if size_mb <= 0:
+                return
+
+
+def run(kind: str, size_mb: int, result) -> None:
+    if kind == "str":
+        diff = b"".join(iter_chunks(size_mb)).decode()
+    else:
+        diff = SpooledDiff.from_chunks(iter_chunks(size_mb))
+    if size_mb:
+        added = sum(len(f.added_lines) for f in parse_unified_diff(diff))
+        prompt_chars = len(bounded_diff_text(diff))
+    else:
+        added = prompt_chars = 0
+    result.put((kind, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, added, prompt_chars))
+
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    ctx = multiprocessing.get_context("spawn")
+    result = ctx.Queue()
+    print(f"diff: ~{size_mb} MB")
+    for kind, size in (("baseline", 0), ("str", size_mb), ("spooled", size_mb)):
+        proc = ctx.Process(target=run, args=(kind, size, result))
+        proc.start()
+        _, peak_mb, added, prompt_chars = result.get()
+        proc.join()
+        print(f"{kind:<9} peak RSS {peak_mb:8.1f} MB  added lines={added} prompt chars={prompt_chars}")
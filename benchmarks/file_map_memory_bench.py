@@ -0,0 +1,47 @@
+"""
+Benchmark: peak RSS of a task holding a whole repository as dict[str, str] vs. PackedFileMap.
+
+Each variant runs in a fresh child process that builds the map from raw file bytes (as the
+fetchers do), reads every Python file once (as call-graph building does) and reports ru_maxrss.
+
+    python -m benchmarks.file_map_memory_bench [n_files] [file_kb]
+"""
+import sys
+import resource
+import multiprocessing
+from shared.integrations.packed_file_map import PackedFileMap
+
+
+def iter_repo(n_files: int, file_kb: int):
+    line = "    value = compute_something(alpha, beta, gamma)  # ünïcode\n".encode()
+    body = line * (file_kb * 1024 // len(line))
+    for i in range(n_files):
+        yield f"pkg/sub_{i % 50}/module_{i}.py", body + f"# {i}\n".encode()
+
+
+def run(kind: str, n_files: int, file_kb: int, result) -> None:
+    if kind == "dict":
+        file_map = {path: data.decode("utf-8", errors="replace") for path, data in iter_repo(n_files, file_kb)}
+    else:
+        file_map = PackedFileMap()
+        for path, data in iter_repo(n_files, file_kb):
+            file_map.add(path, data)
+    total_chars = sum(len(file_map[path]) for path in file_map)
+    result.put((kind, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, total_chars))
+
+
+if __name__ == "__main__":
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    file_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    ctx = multiprocessing.get_context("spawn")
+    result = ctx.Queue()
+    print(f"repo: {n_files} files x {file_kb} KB = {n_files * file_kb / 1024:.0f} MB")
+    for kind in ("baseline", "dict", "packed"):
+        if kind == "baseline":
+            proc = ctx.Process(target=run, args=("packed", 0, file_kb, result))
+        else:
+            proc = ctx.Process(target=run, args=(kind, n_files, file_kb, result))
+        proc.start()
+        _, peak_mb, chars = result.get()
+        proc.join()
+        print(f"{kind:<9} peak RSS {peak_mb:8.1f} MB  chars read={chars}")
@@ -0,0 +1,57 @@
+"""
+Benchmark: mapping changed lines to enclosing functions on a module with thousands of defs.
+
+Compares the former scan (every FunctionDef x every changed line) with PythonModuleIndex's
+sorted-interval lookup.
+
+    python -m benchmarks.function_index_bench [n_classes] [changed_lines]
+"""
+import ast
+import random
+import sys
+import time
+from shared.services.code_language_handlers.python_module_index import PythonModuleIndex
+
+
+def make_module(n_classes: int) -> str:
+    parts = []
+    for c in range(n_classes):
+        parts.append(f"class C{c}:\n")
+        for m in range(5):
+            parts.append(f"    def m{m}(self, x):\n        y = x + {m}\n        return helper_{c}(y)\n\n")
+        parts.append(f"def helper_{c}(v):\n    def inner(w):\n        return w * 2\n    return inner(v)\n\n")
+    return "".join(parts)
+
+
+def legacy_scan(source: str, lines: set) -> list:
+    tree = ast.parse(source)
+    found = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            if any(node.lineno <= line <= node.end_lineno for line in lines):
+                found.append(node.name)
+    return found
+
+
+if __name__ == "__main__":
+    n_classes = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n_changed = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    source = make_module(n_classes)
+    total_lines = source.count("\n")
+    changed = set(random.Random(0).sample(range(1, total_lines), min(n_changed, total_lines - 1)))
+
+    start = time.perf_counter()
+    legacy = legacy_scan(source, changed)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = PythonModuleIndex("bench.py", source)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    found = index.functions_containing(changed)
+    query_time = time.perf_counter() - start
+
+    print(f"defs: {len(index.functions)}, lines: {total_lines}, changed lines: {len(changed)}")
+    print(f"legacy scan (parse + scan)  {legacy_time:8.3f}s  matches={len(legacy)}")
+    print(f"index build (parse + index) {build_time:8.3f}s")
+    print(f"index query                 {query_time:8.4f}s  matches={len(found)}")
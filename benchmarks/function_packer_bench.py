@@ -0,0 +1,53 @@
+"""
+Benchmark: LLM requests and estimated input tokens for reviewing a PR of many small functions,
+one request per (factor, function) vs. token-budgeted batches.
+
+Prompts are rendered exactly as the chains would send them; no LLM is called.
+
+    python -m benchmarks.function_packer_bench [n_functions] [lines_per_function]
+"""
+import sys
+import time
+from review_agents.complicated_llm_review_agent import ComplicatedLLMPrReviewAgent
+from shared.utils.token_counter import count_tokens
+
+FACTORS = ["code_style", "bugs", "performance", "best_practices"]
+
+
+def make_functions(n: int, lines: int):
+    body = "".join(f"    value_{j} = helper_{j}(value_{j - 1})\n" for j in range(1, lines))
+    return [
+        {
+            "function": {"filename": f"pkg/helpers_{i % 10}.py", "function_name": f"helper_{i}"},
+            "context": f"# Function: helper_{i}\ndef helper_{i}(value_0):\n{body}    return value_{lines - 1}\n",
+            "diff_summary": "Adds small helper functions used by the request pipeline.",
+        }
+        for i in range(n)
+    ]
+
+
+if __name__ == "__main__":
+    n_functions = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    agent = ComplicatedLLMPrReviewAgent()
+    executor = agent.executor
+    functions = make_functions(n_functions, lines)
+    summary = functions[0]["diff_summary"]
+
+    per_call_tokens = sum(
+        count_tokens(executor.prompts[factor].format(function=fn["function"], context=fn["context"], diff_summary=summary))
+        for factor in FACTORS for fn in functions
+    )
+    print(f"{n_functions} functions x {len(FACTORS)} factors")
+    print(f"{'per (factor, function)':<24} requests={n_functions * len(FACTORS):5d}  input_tokens={per_call_tokens:8d}  functions/request=1.00")
+
+    for label, groups in (("batched, per factor", [[f] for f in FACTORS]), ("batched, multi-factor", [FACTORS])):
+        start = time.perf_counter()
+        requests = tokens = 0
+        for group in groups:
+            for batch in agent._pack_functions(group, functions, summary):
+                rendered = "\n\n".join(item.payload[1] for item in batch.items)
+                tokens += count_tokens(executor.render_batch_prompt(group, rendered, summary))
+                requests += 1
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{label:<24} requests={requests:5d}  input_tokens={tokens:8d}  functions/request={n_functions * len(groups) / requests:.2f}  packing={elapsed:.1f}ms")
@@ -0,0 +1,37 @@
+"""
+Benchmark: local prompt budget check (`fits_token_budget`) on prompts of growing size, and
+fitting an oversize function into windows with `fit_context`.
+
+Uses the tiktoken encoding from TIKTOKEN_CACHE_DIR when available, otherwise the character estimate.
+
+    python -m benchmarks.prompt_budget_bench [function_lines]
+"""
+import sys
+import time
+from review_agents.chains.complicated_llm_chain import MAX_PROMPT_TOKENS
+from shared.utils import token_counter
+from shared.utils.context_budget import ContextBlock, fit_context
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1e6
+
+
+if __name__ == "__main__":
+    function_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    line = "    total = accumulate(values[index], weights[index]) + offset\n"
+    token_counter.count_tokens("")
+    print(f"tokenizer: {'tiktoken ' + token_counter.settings.TOKENIZER_ENCODING if token_counter._encoding else 'character estimate'}")
+
+    for lines in (100, 1000, 10000, 100000):
+        prompt = line * lines
+        fits, micros = timed(lambda: token_counter.fits_token_budget(prompt, MAX_PROMPT_TOKENS), 20)
+        print(f"prompt {len(prompt) / 1024:8.0f} KB  fits={str(fits):5}  check={micros:10.1f}us")
+
+    target = ContextBlock("function", "pkg/big.py:handler", "# Function: pkg/big.py:handler", line * function_lines)
+    callee = ContextBlock("callee", "pkg/util.py:accumulate", "# Callee: pkg/util.py:accumulate", line * 200)
+    windows, micros = timed(lambda: fit_context([target, callee], MAX_PROMPT_TOKENS - 500), 3)
+    print(f"fit_context {function_lines} lines -> windows={len(windows)}  time={micros / 1000:.1f}ms")
@@ -10,6 +10,7 @@ from shared.models.enums import ReviewFactor
 from shared.models.payloads import SimpleLLMReviewStrategyContext, ComplicatedLLMReviewStrategyContext
 from shared.strategies.review_strategies.review_strategy_factory import ReviewStrategyFactory
 from shared.exceptions.fetcher_exceptions import FetcherException
+from shared.services.file_filter import FileFilter
 
 logger = logging.getLogger(__name__)
 
@@ -56,9 +57,18 @@ def analyze_pr_task(request_data):
         token = request_data.get('token', None)
 
         fetcher = PlatformFetcherFactory.get_fetcher(platform_type)
-        pr_data = fetcher.fetch_pr_data(repo_url, pr_number, token)
+        # The file listing and the diff are fetched concurrently; listing entries matching the
+        # exclude globs are dropped page by page as they arrive.
+        pr_data = asyncio.run(fetcher.afetch_pr_data(repo_url, pr_number, token))
+        snapshot = pr_data.get("snapshot")
         logger.info(f"Fetched PR data for repo {repo_url} and PR {pr_number}")
 
+        # Drop vendored, generated, binary and lock files before any agent sees the diff, and the
+        # files the diff lost from the listing.
+        file_filter = snapshot.file_filter if snapshot is not None else FileFilter()
+        diff = file_filter.filter_diff(pr_data["diff"])
+        files = file_filter.filter_files(pr_data["files"])
+
         # Step 5: Run AI code analysis
         # Hardcoded review factors for now — can be made configurable per task/request in the future
         factors = [
@@ -75,15 +85,19 @@ def analyze_pr_task(request_data):
             "pr_number": pr_number,
             "platform": platform_type,
             "token": token,
+            "snapshot": snapshot,
             # include any other fields required by the context class
         }
 
         review_strategy, context = ReviewStrategyFactory.get_strategy_by_name(pr_review_strategy, context_kwargs=context_kwargs)
 
-        review_output = asyncio.run(review_strategy.review(pr_data["diff"], pr_data["files"], context))
+        review_output = asyncio.run(review_strategy.review(diff, files, context))
         result = review_output.model_dump()
         
         logger.info(f"Code analysis completed for task {task_id}")
+        if snapshot is not None:
+            logger.info(f"event: analyze_pr_task, msg: Platform requests for Identifier: task_id={task_id}, head_sha={snapshot.head_sha}, requests={snapshot.request_count}")
+        logger.info(f"event: analyze_pr_task, msg: File filter for Identifier: task_id={task_id}, stats={file_filter.stats.as_dict()}")
 
         # Step 6: Store results and update task status using DAO
         TaskDAO.store_results_and_update_status(task_id=task_id, results=result, status=TaskStatus.COMPLETED)
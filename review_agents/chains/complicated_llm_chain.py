@@ -1,6 +1,6 @@
 import os
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from langchain_openai import ChatOpenAI, AzureChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.schema.runnable import Runnable
@@ -9,7 +9,11 @@ from pydantic import SecretStr
 # from langchain.output_parsers.openai_tools import JsonOutputToolsParser
 
 
-from review_agents.output_schemas.pr_review_output_schema import REVIEW_OUTPUT_SCHEMA
+from review_agents.output_schemas.pr_review_output_schema import REVIEW_OUTPUT_SCHEMA, MULTI_FACTOR_REVIEW_OUTPUT_SCHEMA, BATCH_REVIEW_OUTPUT_SCHEMA
+from shared.cache.llm_review_cache import LLMReviewCache, ProviderInvoke
+from shared.exceptions.agent_exceptions import AgentPromptException
+from shared.utils.token_counter import count_tokens, fits_token_budget
+from shared.config import settings
 
 PROMPT_FILE = os.path.join(os.path.dirname(__file__), "..", "prompts", "review_prompts.json")
 
@@ -20,15 +24,21 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 MAX_COMPLETION_TOKENS = 2000  # Todo: have ability to breakup into 2 or to fallback to llm having more context window.
 MAX_PROMPT_TOKENS = 13000     # conservative margin if total limit is 16k
+MULTI_FACTOR_PROMPT = "multi_factor"
+BATCH_PROMPT = "batch"
+# Expected completion tokens for one function reviewed for one factor, used to size batches.
+COMPLETION_TOKENS_PER_REVIEW = 150
 
 class ComplicatedLLMChainExecutor:
-    def __init__(self):
+    def __init__(self, review_cache: Optional[LLMReviewCache] = None):
         self.prompts = self._load_prompts()
         self.llm = ChatOpenAI(
             temperature=0.3,
             model="gpt-4o",
+            max_tokens=MAX_COMPLETION_TOKENS,
             openai_api_key=OPENAI_API_KEY
         )
+        self.review_cache = review_cache or (LLMReviewCache() if settings.LLM_REVIEW_CACHE_ENABLED else None)
 
     def _load_prompts(self) -> dict:
         with open(PROMPT_FILE, "r") as f:
@@ -50,9 +60,69 @@ class ComplicatedLLMChainExecutor:
         )
         return prompt | self.llm.with_structured_output(REVIEW_OUTPUT_SCHEMA)
 
-    async def run_chain(self, factor: str, function_data: Dict[str, str]) -> Dict[str, Any]:
+    async def run_chain(self, factor: str, function_data: Dict[str, str], invoke: Optional[ProviderInvoke] = None) -> Dict[str, Any]:
         chain = self.build_chain(factor)
-        return await chain.ainvoke(function_data)
+        return await self._ainvoke_cached(chain, self.prompts[factor], factor, function_data, REVIEW_OUTPUT_SCHEMA, invoke)
+
+    def build_multi_factor_chain(self) -> Runnable:
+        prompt_text = self.prompts.get(MULTI_FACTOR_PROMPT)
+        if not prompt_text:
+            raise ValueError(f"No prompt found for factor: {MULTI_FACTOR_PROMPT}")
+        prompt = PromptTemplate(
+            input_variables=["function", "context", "diff_summary", "factors"],
+            template=prompt_text
+        )
+        return prompt | self.llm.with_structured_output(MULTI_FACTOR_REVIEW_OUTPUT_SCHEMA)
+
+    async def run_multi_factor_chain(self, factors: List[str], function_data: Dict[str, str], invoke: Optional[ProviderInvoke] = None) -> Dict[str, Any]:
+        """One structured call reviewing the function for all `factors`; each issue's `type` names its factor."""
+        chain = self.build_multi_factor_chain()
+        inputs = {**function_data, "factors": ", ".join(factors)}
+        return await self._ainvoke_cached(chain, self.prompts[MULTI_FACTOR_PROMPT], MULTI_FACTOR_PROMPT, inputs, MULTI_FACTOR_REVIEW_OUTPUT_SCHEMA, invoke)
+
+    def build_batch_chain(self) -> Runnable:
+        prompt_text = self.prompts.get(BATCH_PROMPT)
+        if not prompt_text:
+            raise ValueError(f"No prompt found for factor: {BATCH_PROMPT}")
+        prompt = PromptTemplate(
+            input_variables=["functions", "diff_summary", "factors"],
+            template=prompt_text
+        )
+        return prompt | self.llm.with_structured_output(BATCH_REVIEW_OUTPUT_SCHEMA)
+
+    @staticmethod
+    def format_batch_entry(key: str, function_data: Dict[str, Any]) -> str:
+        fn = function_data.get("function", {})
+        return f"### {key}: {fn.get('filename')}:{fn.get('function_name')}\n{function_data.get('context', '')}"
+
+    def render_batch_prompt(self, factors: List[str], functions: str, diff_summary: str) -> str:
+        return self.prompts[BATCH_PROMPT].format(functions=functions, diff_summary=diff_summary, factors=", ".join(factors))
+
+    async def run_batch_chain(self, factors: List[str], functions: str, diff_summary: str, invoke: Optional[ProviderInvoke] = None) -> Dict[str, Any]:
+        """One structured call reviewing several rendered functions (see format_batch_entry) for `factors`."""
+        chain = self.build_batch_chain()
+        inputs = {"functions": functions, "diff_summary": diff_summary, "factors": ", ".join(factors)}
+        return await self._ainvoke_cached(chain, self.prompts[BATCH_PROMPT], BATCH_PROMPT, inputs, BATCH_REVIEW_OUTPUT_SCHEMA, invoke)
+
+    def prompt_overhead(self, factors: List[str], function: Dict[str, str], diff_summary: str) -> int:
+        """Tokens of the largest prompt used for `factors` with an empty context: what a function's context must fit beside."""
+        names = [MULTI_FACTOR_PROMPT] if settings.COMPLICATED_REVIEW_MODE == "multi_factor" else list(factors)
+        return max(
+            (count_tokens(self.prompts[name].format(function=function, context="", diff_summary=diff_summary, factors=", ".join(factors)))
+             for name in names if self.prompts.get(name)),
+            default=0,
+        )
+
+    async def _ainvoke_cached(self, chain: Runnable, template: str, factor: str, inputs: Dict[str, Any], schema: Dict[str, Any], invoke: Optional[ProviderInvoke] = None) -> Dict[str, Any]:
+        # Rejected here rather than by the provider after the request has queued.
+        if not fits_token_budget(template.format(**inputs), MAX_PROMPT_TOKENS):
+            raise AgentPromptException(f"Prompt for factor {factor} exceeds {MAX_PROMPT_TOKENS} tokens")
+        compute = lambda: chain.ainvoke(inputs)
+        call = (lambda: invoke(compute)) if invoke is not None else compute
+        if self.review_cache is None:
+            return await call()
+        key = self.review_cache.key(self.llm.model_name, template, factor, inputs, schema)
+        return await self.review_cache.get_or_compute(key, call)
 
     def summarize_diff(self) -> Runnable:
         """Uses an LLM to generate a concise summary of the code diff."""
@@ -63,3 +133,14 @@ class ComplicatedLLMChainExecutor:
         )
 
         return prompt_template | self.llm
+
+    def summarize(self, diff: str) -> str:
+        """Summary text for `diff`; an identical diff reuses the cached summary."""
+        if self.review_cache is None:
+            return self.summarize_diff().invoke({"diff": diff}).content
+        key = self.review_cache.key(self.llm.model_name, self.prompts["summarize"], "summarize", {"diff": diff})
+        summary = self.review_cache.get(key)
+        if summary is None:
+            summary = self.summarize_diff().invoke({"diff": diff}).content
+            self.review_cache.put(key, summary)
+        return summary
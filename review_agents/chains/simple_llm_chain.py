@@ -4,10 +4,13 @@ from langchain_openai import ChatOpenAI, AzureChatOpenAI
 from pydantic import SecretStr
 from langchain.prompts import PromptTemplate
 from langchain.schema.runnable import Runnable
+from typing import Any, Dict, Optional
 # from langchain.output_parsers.openai_tools import JsonOutputToolsParser
 
 
 from review_agents.output_schemas.pr_review_output_schema import REVIEW_OUTPUT_SCHEMA
+from shared.cache.llm_review_cache import LLMReviewCache, ProviderInvoke
+from shared.config import settings
 
 PROMPT_FILE = os.path.join(os.path.dirname(__file__), "..", "prompts", "review_prompts.json")
 
@@ -17,7 +20,7 @@ PROMPT_FILE = os.path.join(os.path.dirname(__file__), "..", "prompts", "review_p
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 class SimpleLLMChainExecutor:
-    def __init__(self):
+    def __init__(self, review_cache: Optional[LLMReviewCache] = None):
         self.prompts = self._load_prompts()
         self.llm = ChatOpenAI(
             temperature=0.3,
@@ -26,6 +29,7 @@ class SimpleLLMChainExecutor:
             base_url=None, # Todo: Use Portkey if needed. "https://api.portkey.ai/v1/proxy/openai"
         )
         # self.parser = JsonOutputToolsParser(schema=REVIEW_OUTPUT_SCHEMA)
+        self.review_cache = review_cache or (LLMReviewCache() if settings.LLM_REVIEW_CACHE_ENABLED else None)
 
     def _load_prompts(self) -> dict:
         with open(PROMPT_FILE, "r") as f:
@@ -43,3 +47,12 @@ class SimpleLLMChainExecutor:
             raise ValueError(f"No prompt found for factor: {factor}")
         prompt = PromptTemplate(input_variables=["code"], template=prompt_text)
         return prompt | self.llm.with_structured_output(REVIEW_OUTPUT_SCHEMA)
+
+    async def run_chain(self, factor: str, inputs: Dict[str, str], invoke: Optional[ProviderInvoke] = None) -> Dict[str, Any]:
+        chain = self.build_chain(factor)
+        compute = lambda: chain.ainvoke(inputs)
+        call = (lambda: invoke(compute)) if invoke is not None else compute
+        if self.review_cache is None:
+            return await call()
+        key = self.review_cache.key(self.llm.model_name, self.prompts[factor], factor, inputs, REVIEW_OUTPUT_SCHEMA)
+        return await self.review_cache.get_or_compute(key, call)
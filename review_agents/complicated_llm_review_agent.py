@@ -3,14 +3,23 @@ import json
 import ast
 import re
 import logging
-from typing import List, Dict, Any
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple, Union
 
-from review_agents.chains.complicated_llm_chain import ComplicatedLLMChainExecutor
+from review_agents.chains.complicated_llm_chain import ComplicatedLLMChainExecutor, MAX_PROMPT_TOKENS, MAX_COMPLETION_TOKENS, COMPLETION_TOKENS_PER_REVIEW
 from shared.models.enums import ErrorCode
 from shared.models.payloads import ErrorResult, Issue, FileResult, AnalysisResults, Summary, ReviewFactor
-from shared.exceptions.agent_exceptions import AgentOutputParseException
+from shared.exceptions.agent_exceptions import AgentOutputParseException, AgentPromptException
 from shared.utils.parse_llm_output import parse_review_result, parse_pr_analysis_result_for_complicated_agent_raw_result
 from shared.services.code_language_service import LanguageService
+from shared.utils.spooled_diff import SpooledDiff, bounded_diff_text
+from shared.utils.function_packer import Batch, PackItem, pack_first_fit_decreasing
+from shared.utils.token_counter import count_tokens
+from shared.utils.context_budget import fit_context
+from shared.utils.llm_concurrency_limiter import get_llm_limiter, is_rate_limit_error
+from shared.utils.request_hedging import get_request_hedger
+from shared.utils.adaptive_timeout import get_adaptive_timeout
+from shared.cache.llm_review_cache import ProviderInvoke
+from shared.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -18,46 +27,172 @@ class ComplicatedLLMPrReviewAgent:
     def __init__(self):
         self.executor = ComplicatedLLMChainExecutor()
         self.language_service = LanguageService()
+        self.limiter = get_llm_limiter()
+        self.hedger = get_request_hedger()
+        self.timeouts = get_adaptive_timeout()
 
-    async def review(self, code_diff: str, files: List[Dict[str, Any]], file_map: Dict[str, str], factors: List[str]) -> AnalysisResults:
+    async def review(self, code_diff: Union[str, SpooledDiff], files: List[Dict[str, Any]], file_map: Mapping[str, str], factors: List[str]) -> AnalysisResults:
         logger.info("event: review, msg: Starting advanced review with function-level granularity")
 
         diff_summary = self.summarize_diff(code_diff)
         functions_to_review =  self.language_service.extract_functions_from_diff(code_diff, file_map)
-        call_graph =  self.language_service.get_call_graph(file_map)
+        # Callees are resolved from the files under review, so only those need to be read.
+        call_graph =  self.language_service.get_call_graph(file_map, filenames={fn["filename"] for fn in functions_to_review})
 
         enriched_functions = []
+        context_errors = []
         for fn in functions_to_review:
-            context =  self.language_service.fetch_function_context(fn, file_map, call_graph)
-            enriched_functions.append({
-                "function": fn,
-                "context": context,
-                "diff_summary": diff_summary,
-            })
+            # Callees are trimmed to fit the prompt budget; a function too large on its own is reviewed
+            # in overlapping windows whose issues merge under its file.
+            blocks = self.language_service.fetch_function_context_blocks(fn, file_map, call_graph)
+            budget = MAX_PROMPT_TOKENS - self.executor.prompt_overhead(factors, fn, diff_summary)
+            try:
+                contexts = fit_context(blocks, budget)
+            except AgentPromptException as e:
+                logger.error(f"event: review, msg: Context does not fit the prompt for Identifier: {fn}, budget={budget}: {str(e)}")
+                context_errors.append(ErrorResult(error=f"Prompt error in {fn}: {str(e)}", error_code=e.error_code).model_dump())
+                continue
+            if len(contexts) > 1:
+                logger.info(f"event: review, msg: Splitting function into windows for Identifier: {fn}, windows={len(contexts)}, budget={budget}")
+            for context in contexts:
+                enriched_functions.append({
+                    "function": fn,
+                    "context": context,
+                    "diff_summary": diff_summary,
+                })
 
-        tasks = []
-        for factor in factors:
-            for func_data in enriched_functions:
-                tasks.append(self._review_function(factor, func_data))
+        if settings.COMPLICATED_REVIEW_BATCHING:
+            factor_groups = [factors] if settings.COMPLICATED_REVIEW_MODE == "multi_factor" else [[factor] for factor in factors]
+            raw_results = await self._review_batched(factor_groups, enriched_functions, diff_summary)
+        elif settings.COMPLICATED_REVIEW_MODE == "multi_factor":
+            # One call per function covers every factor; results are split back into per-factor entries.
+            grouped = await asyncio.gather(*(self._review_function_all_factors(factors, func_data) for func_data in enriched_functions))
+            raw_results = [result for group in grouped for result in group]
+        else:
+            tasks = []
+            for factor in factors:
+                for func_data in enriched_functions:
+                    tasks.append(self._review_function(factor, func_data))
 
-        # Todo: Same line can be reviewed multiple time, add duplicate remover.
-        raw_results = await asyncio.gather(*tasks)
+            # Todo: Same line can be reviewed multiple time, add duplicate remover.
+            raw_results = await asyncio.gather(*tasks)
+        raw_results = context_errors + list(raw_results)
+        if self.executor.review_cache is not None:
+            logger.info(f"event: review, msg: LLM review cache for Identifier: functions={len(enriched_functions)}, factors={len(factors)}, stats={self.executor.review_cache.stats}")
+        logger.info(f"event: review, msg: LLM concurrency for Identifier: functions={len(enriched_functions)}, stats={self.limiter.stats}")
+        logger.info(f"event: review, msg: LLM timeouts for Identifier: functions={len(enriched_functions)}, stats={self.timeouts.stats}")
+        if settings.LLM_HEDGING_ENABLED:
+            logger.info(f"event: review, msg: LLM hedging for Identifier: functions={len(enriched_functions)}, stats={self.hedger.stats}")
         return parse_pr_analysis_result_for_complicated_agent_raw_result(raw_results, factors)
 
-    def summarize_diff(self, diff: str) -> str:
-        result = self.executor.summarize_diff().invoke({"diff": diff})
-        return result.content
+    def summarize_diff(self, diff: Union[str, SpooledDiff]) -> str:
+        # The summary prompt gets a bounded head of the diff; function extraction streams all of it.
+        return self.executor.summarize(bounded_diff_text(diff))
 
     async def _review_function(self, factor: str, func_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._run_review(factor, func_data, lambda invoke: self.executor.run_chain(factor, func_data, invoke))
+
+    async def _review_function_all_factors(self, factors: List[str], func_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Review one function for all factors in a single call and split the issues by their `type` tag."""
+        result = await self._run_review(
+            ",".join(factors), func_data, lambda invoke: self.executor.run_multi_factor_chain(factors, func_data, invoke)
+        )
+        if "error_code" in result:
+            return [result]
+
+        by_factor: Dict[str, List[Dict[str, Any]]] = {factor: [] for factor in factors}
+        for issue in result["issues"]:
+            factor = issue.get("type") if isinstance(issue, dict) else None
+            if factor in by_factor:
+                by_factor[factor].append(issue)
+            else:
+                logger.warning(f"event: _review_function_all_factors, msg: Dropping issue with unrequested factor={factor} for {result['file']}")
+        return [{"factor": factor, "file": result["file"], "issues": issues} for factor, issues in by_factor.items()]
+
+    async def _review_batched(self, factor_groups: List[List[str]], enriched_functions: List[Dict[str, Any]], diff_summary: str) -> List[Dict[str, Any]]:
+        """Pack functions into token-budgeted batches and review each batch with one call per factor group."""
+        tasks = []
+        for group in factor_groups:
+            for batch in self._pack_functions(group, enriched_functions, diff_summary):
+                tasks.append(self._review_batch(group, batch, diff_summary))
+        grouped = await asyncio.gather(*tasks)
+
+        reviews = len(enriched_functions) * len(factor_groups)
+        logger.info(
+            f"event: _review_batched, msg: Batched review for Identifier: functions={len(enriched_functions)}, "
+            f"factor_groups={len(factor_groups)}, requests={len(tasks)}, "
+            f"functions_per_request={reviews / len(tasks) if tasks else 0:.2f}"
+        )
+        return [result for group in grouped for result in group]
+
+    def _pack_functions(self, factors: List[str], enriched_functions: List[Dict[str, Any]], diff_summary: str) -> List[Batch]:
+        """First-fit decreasing by estimated tokens, leaving room for the prompt frame and the expected completions."""
+        overhead = count_tokens(self.executor.render_batch_prompt(factors, "", diff_summary))
+        items = []
+        for i, func_data in enumerate(enriched_functions):
+            key = f"f{i}"
+            block = self.executor.format_batch_entry(key, func_data)
+            items.append(PackItem(key=key, tokens=count_tokens(block) + 1, payload=(func_data, block)))
+        max_items = max(1, MAX_COMPLETION_TOKENS // (COMPLETION_TOKENS_PER_REVIEW * len(factors)))
+        return pack_first_fit_decreasing(items, capacity=MAX_PROMPT_TOKENS - overhead, max_items=max_items)
+
+    async def _review_batch(self, factors: List[str], batch: Batch, diff_summary: str) -> List[Dict[str, Any]]:
+        files = {item.key: item.payload[0].get("function", {}).get("filename", "<unknown>") for item in batch.items}
+        functions = "\n\n".join(item.payload[1] for item in batch.items)
+        label = {"batch": [f"{item.key}={files[item.key]}" for item in batch.items]}
+
+        def split(result: Any) -> List[Dict[str, Any]]:
+            # Issues of each function id are split per factor; a single-factor batch owns every issue.
+            by_key = {key: {factor: [] for factor in factors} for key in files}
+            entries = result.get("functions", []) if isinstance(result, dict) else []
+            for entry in entries:
+                issues_by_factor = by_key.get(str(entry.get("id", "")).strip())
+                if issues_by_factor is None:
+                    logger.warning(f"event: _review_batch, msg: Dropping result for unknown function id={entry.get('id')}")
+                    continue
+                for issue in entry.get("issues") or []:
+                    factor = factors[0] if len(factors) == 1 else issue.get("type")
+                    if factor in issues_by_factor:
+                        issues_by_factor[factor].append({**issue, "type": factor})
+            return [
+                {"factor": factor, "file": files[key], "issues": issues}
+                for key, issues_by_factor in by_key.items()
+                for factor, issues in issues_by_factor.items()
+            ]
+
+        result = await self._run_review(
+            ",".join(factors), {"function": label},
+            lambda invoke: self.executor.run_batch_chain(factors, functions, diff_summary, invoke),
+            normalize=split,
+            tokens=(batch.tokens + count_tokens(diff_summary), COMPLETION_TOKENS_PER_REVIEW * len(batch.items) * len(factors)),
+        )
+        return [result] if "error_code" in result else result
+
+    async def _run_review(self, factor: str, func_data: Dict[str, Any], call: Callable[[ProviderInvoke], Awaitable[Any]], normalize: Optional[Callable[[Any], Any]] = None, tokens: Optional[Tuple[int, int]] = None) -> Any:
         fn = func_data.get("function", {})
         filename = fn.get("filename", fn.get("name", "<unknown>"))
+        # (input, output) token estimates for the timeout; `factor` is comma-joined for multi-factor calls.
+        if tokens is None:
+            tokens = (
+                count_tokens(func_data.get("context", "")) + count_tokens(func_data.get("diff_summary", "")),
+                COMPLETION_TOKENS_PER_REVIEW * len(factor.split(",")),
+            )
+        model = self.executor.llm.model_name
+
+        async def provider_call(compute: Callable[[], Awaitable[Any]]) -> Any:
+            # Only cache misses get here, so cached reviews take no slot and feed no latency history.
+            if settings.LLM_HEDGING_ENABLED:
+                attempt = lambda: self.hedger.run((model, factor), compute, slot=self.limiter.slot)
+            else:
+                attempt = compute
+            # The timeout covers each attempt, not the wait for a slot or a backoff.
+            return await self.limiter.run(lambda: self.timeouts.run(model, *tokens, attempt))
 
         try:
             logger.info(f"event: _review_function, msg: Reviewing {fn} for factor={factor}")
-            result = await asyncio.wait_for(
-                self.executor.run_chain(factor, func_data),
-                timeout=180
-            )
+            result = await call(provider_call)
+            if normalize is not None:
+                return normalize(result)
             # Normalize and extract issues robustly
             issues = []
 
@@ -101,7 +236,7 @@ class ComplicatedLLMPrReviewAgent:
                 error_code=ErrorCode.AGENT_TIMEOUT
             ).model_dump()
 
-        except ValueError as e:
+        except (ValueError, AgentPromptException) as e:
             logger.error(f"event: _review_function, msg: Prompt error for {fn} - factor={factor}: {str(e)}")
             return ErrorResult(
                 error=f"Prompt error for factor {factor} in {fn}: {str(e)}",
@@ -109,8 +244,7 @@ class ComplicatedLLMPrReviewAgent:
             ).model_dump()
 
         except Exception as e:
-            msg = str(e).lower()
-            if "rate limit" in msg or "429" in msg or "quota" in msg:
+            if is_rate_limit_error(e):
                 logger.error(f"event: _review_function, msg: Rate limit error for {fn} - factor={factor}: {str(e)}")
                 return ErrorResult(
                     error=f"Rate limit error for factor {factor} in {fn}: {str(e)}",
@@ -1,3 +1,5 @@
+import copy
+
 REVIEW_OUTPUT_SCHEMA = {
     "title": "CodeReviewResult",
     "description": "A structured code review result for a pull request.",
@@ -39,4 +41,33 @@ REVIEW_OUTPUT_SCHEMA = {
         }
     },
     "required": ["files", "summary"]
-}
\ No newline at end of file
+}
+
+# Same shape as REVIEW_OUTPUT_SCHEMA, for one call covering several factors: each issue's `type`
+# names the factor it was raised for, which is how the results are split back per factor.
+MULTI_FACTOR_REVIEW_OUTPUT_SCHEMA = copy.deepcopy(REVIEW_OUTPUT_SCHEMA)
+MULTI_FACTOR_REVIEW_OUTPUT_SCHEMA["title"] = "MultiFactorCodeReviewResult"
+MULTI_FACTOR_REVIEW_OUTPUT_SCHEMA["description"] = "A structured code review result covering several review factors in one pass."
+MULTI_FACTOR_REVIEW_OUTPUT_SCHEMA["properties"]["files"]["items"]["properties"]["issues"]["items"]["properties"]["type"]["description"] = "The review factor this issue belongs to."
+
+# One call reviewing a batch of functions: results are keyed by the id each function was given in
+# the prompt, so they can be split back out per function and file.
+BATCH_REVIEW_OUTPUT_SCHEMA = {
+    "title": "BatchCodeReviewResult",
+    "description": "Structured code review results for a batch of functions.",
+    "type": "object",
+    "properties": {
+        "functions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string", "description": "The id from the function's header in the prompt."},
+                    "issues": copy.deepcopy(MULTI_FACTOR_REVIEW_OUTPUT_SCHEMA["properties"]["files"]["items"]["properties"]["issues"]),
+                },
+                "required": ["id", "issues"]
+            }
+        }
+    },
+    "required": ["functions"]
+}
@@ -1,13 +1,17 @@
 import asyncio
 import json
 import logging
-from typing import List, Dict, Any
+from typing import Any, Awaitable, Callable, Dict, List, Union
 
 from review_agents.chains.simple_llm_chain import SimpleLLMChainExecutor
 from shared.models.enums import ErrorCode
 from shared.models.payloads import ErrorResult, Issue, FileResult, AnalysisResults, Summary
 from shared.exceptions.agent_exceptions import AgentOutputParseException
 from shared.utils.parse_llm_output import parse_review_result
+from shared.utils.spooled_diff import SpooledDiff, bounded_diff_text
+from shared.utils.llm_concurrency_limiter import get_llm_limiter, is_rate_limit_error
+from shared.utils.adaptive_timeout import get_adaptive_timeout, DEFAULT_COMPLETION_TOKENS
+from shared.utils.token_counter import count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +19,20 @@ logger = logging.getLogger(__name__)
 class SimpleLLMPrReviewAgent:
     def __init__(self):
         self.executor = SimpleLLMChainExecutor()
+        self.limiter = get_llm_limiter()
+        self.timeouts = get_adaptive_timeout()
 
-    async def _review_factor(self, factor: str, code: str) -> Dict[str, Any]:
+    async def _review_factor(self, factor: str, code: str, input_tokens: int) -> Dict[str, Any]:
         logger.info(f"event: _review_factor, msg: Starting for Identifier: factor={factor}")
+
+        async def provider_call(compute: Callable[[], Awaitable[Any]]) -> Any:
+            # Only cache misses get here, so cached reviews take no slot and feed no latency history.
+            return await self.limiter.run(lambda: self.timeouts.run(
+                self.executor.llm.model_name, input_tokens, DEFAULT_COMPLETION_TOKENS, compute,
+            ))
+
         try:
-            chain = self.executor.build_chain(factor)
-            result = await asyncio.wait_for(chain.ainvoke({"code": code}), timeout=180)
+            result = await self.executor.run_chain(factor, {"code": code}, provider_call)
             logger.info(f"event: _review_factor, msg: Returning for Identifier: factor={factor}")
             return {"factor": factor, "review": result}
         except asyncio.TimeoutError:
@@ -36,8 +48,7 @@ class SimpleLLMPrReviewAgent:
                 error_code=ErrorCode.AGENT_PROMPT_ERROR
             ).model_dump()
         except Exception as e:
-            msg = str(e).lower()
-            if "rate limit" in msg or "429" in msg or "quota" in msg:
+            if is_rate_limit_error(e):
                 logger.error(f"event: _review_factor, msg: Error for Identifier: factor={factor}, error=Rate limit error: {str(e)}")
                 return ErrorResult(
                     error=f"Rate limit error for factor {factor}: {str(e)}",
@@ -49,10 +60,17 @@ class SimpleLLMPrReviewAgent:
                 error_code=ErrorCode.AGENT_LLM_ERROR
             ).model_dump()
 
-    async def review(self, code_diff: str, files: List[Dict[str, Any]], factors: List[str]) -> AnalysisResults:
+    async def review(self, code_diff: Union[str, SpooledDiff], files: List[Dict[str, Any]], factors: List[str]) -> AnalysisResults:
         logger.info(f"event: review, msg: Starting Execution")
-        tasks = [self._review_factor(factor, code_diff) for factor in factors]
+        code = bounded_diff_text(code_diff)
+        # The whole diff is one prompt, so its size dominates the expected latency.
+        input_tokens = count_tokens(code)
+        tasks = [self._review_factor(factor, code, input_tokens) for factor in factors]
         raw_results = await asyncio.gather(*tasks)
+        if self.executor.review_cache is not None:
+            logger.info(f"event: review, msg: LLM review cache for Identifier: factors={len(factors)}, stats={self.executor.review_cache.stats}")
+        logger.info(f"event: review, msg: LLM concurrency for Identifier: factors={len(factors)}, stats={self.limiter.stats}")
+        logger.info(f"event: review, msg: LLM timeouts for Identifier: factors={len(factors)}, stats={self.timeouts.stats}")
 
         all_files: Dict[str, List[Issue]] = {}
         errors: List[ErrorResult] = []
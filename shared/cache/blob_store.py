@@ -0,0 +1,33 @@
+import os
+import hashlib
+from typing import Optional
+from shared.cache.disk_lru_store import DiskLRUStore
+from shared.config import settings
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Compute the git object id of a blob, i.e. sha1(b"blob <size>\\0" + data)."""
+    h = hashlib.sha1()
+    h.update(b"blob %d\0" % len(data))
+    h.update(data)
+    return h.hexdigest()
+
+
+class BlobStore(DiskLRUStore):
+    """
+    Content-addressed store of repository file contents keyed by git blob SHA.
+
+    Because keys are content hashes, entries never go stale and can be shared between repos,
+    branches and PRs: a file only has to be downloaded again when its content changes.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        super().__init__(
+            root=root or os.path.join(settings.CACHE_DIR, "blobs"),
+            max_bytes=max_bytes or settings.BLOB_CACHE_MAX_BYTES,
+        )
+
+    def put(self, key: str, data: bytes) -> None:
+        if git_blob_sha(data) != key:
+            raise ValueError(f"Blob content does not match sha {key}")
+        super().put(key, data)
@@ -0,0 +1,39 @@
+import os
+import json
+import hashlib
+from typing import Dict, List, Optional
+from shared.cache.disk_lru_store import DiskLRUStore
+from shared.config import settings
+
+CallGraphFragment = Dict[str, List[str]]
+
+
+class CallGraphStore:
+    """
+    Persisted per-file call-graph fragments ({function: [callees]}) keyed by file content hash.
+
+    A fragment depends only on a file's content, so for a repo reviewed again most fragments
+    are found here and only files whose blob SHA changed need to be parsed. Keys include the
+    language and the handler's fragment version, so a parser change invalidates old entries.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.store = DiskLRUStore(
+            root=root or os.path.join(settings.CACHE_DIR, "callgraph"),
+            max_bytes=max_bytes or settings.CALL_GRAPH_CACHE_MAX_BYTES,
+        )
+
+    @staticmethod
+    def key(language: str, version: int, content_sha: str) -> str:
+        return hashlib.sha256(f"{language}\n{version}\n{content_sha}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CallGraphFragment]:
+        data = self.store.get(key)
+        return json.loads(data) if data is not None else None
+
+    def put(self, key: str, fragment: CallGraphFragment) -> None:
+        self.store.put(key, json.dumps(fragment, separators=(",", ":")).encode())
+
+    @property
+    def stats(self) -> dict:
+        return self.store.stats
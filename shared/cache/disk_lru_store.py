@@ -0,0 +1,156 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+from typing import Dict, Optional, BinaryIO, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Size totals per store root, scanned once per process and shared by every instance on that root.
+_TOTALS: Dict[str, int] = {}
+_TOTALS_LOCK = threading.Lock()
+
+
+class DiskLRUStore:
+    """
+    Persistent key -> bytes store on local disk with size-bounded LRU eviction.
+
+    Entries are plain files fanned out under `root` (git style `ab/cdef...`), so every worker
+    process on the host can share the store. Recency is tracked through the file access time and
+    the write time through the modification time, which also backs the optional TTL.
+
+    The size total is scanned once per process and root, then shared by later instances; eviction
+    rescans to pick up writes from other processes.
+    """
+
+    def __init__(self, root: str, max_bytes: int, ttl_seconds: Optional[int] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.root, exist_ok=True)
+        self._key = os.path.realpath(self.root)
+        with _TOTALS_LOCK:
+            if self._key not in _TOTALS:
+                _TOTALS[self._key] = sum(size for _, size, _ in self._scan())
+
+    @property
+    def _total_bytes(self) -> int:
+        return _TOTALS[self._key]
+
+    @_total_bytes.setter
+    def _total_bytes(self, value: int) -> None:
+        _TOTALS[self._key] = value
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:])
+
+    def _scan(self) -> List[Tuple[str, int, float]]:
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.startswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, st.st_size, st.st_atime))
+        return entries
+
+    def _is_expired(self, path: str) -> bool:
+        if self.ttl_seconds is None:
+            return False
+        return time.time() - os.stat(path).st_mtime > self.ttl_seconds
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """Open an entry for streaming reads, or return None (and count a miss) if absent or expired."""
+        path = self._path(key)
+        try:
+            if self._is_expired(path):
+                self._remove(path)
+                self.misses += 1
+                return None
+            f = open(path, "rb")
+            st = os.fstat(f.fileno())
+            os.utime(path, (time.time(), st.st_mtime))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return f
+
+    def get(self, key: str) -> Optional[bytes]:
+        f = self.open(key)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def put(self, key: str, data: bytes) -> None:
+        self.put_stream(key, [data])
+
+    def put_stream(self, key: str, chunks) -> None:
+        """Atomically write an entry from an iterable of byte chunks."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp", dir=os.path.dirname(path))
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            # An overwritten entry's bytes leave the store with it.
+            try:
+                size -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with _TOTALS_LOCK:
+            self._total_bytes += size
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def __contains__(self, key: str) -> bool:
+        path = self._path(key)
+        return os.path.exists(path) and not self._is_expired(path)
+
+    def _remove(self, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            with _TOTALS_LOCK:
+                self._total_bytes -= size
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the store is back under 90% of max_bytes."""
+        # Rescan instead of trusting the in-memory total: other processes write to the same root.
+        entries = sorted(self._scan(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        self._total_bytes = total
+        logger.info(f"event: evict, msg: Evicted {evicted} entries from {self.root}, total_bytes={total}")
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "total_bytes": self._total_bytes}
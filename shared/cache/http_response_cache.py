@@ -0,0 +1,72 @@
+import os
+import json
+import hashlib
+import logging
+import itertools
+from typing import Optional, Dict, Tuple, Mapping, BinaryIO, Iterable
+from shared.cache.disk_lru_store import DiskLRUStore
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept alongside the body so a 304 can be served as if it were the original 200.
+STORED_HEADERS = ("ETag", "Last-Modified", "Link", "Content-Type")
+
+
+class HttpResponseCache:
+    """
+    Conditional-request cache for GitHub API responses.
+
+    Entries are keyed by URL, Accept header and a hash of the token (so one token never reads
+    another token's responses) and hold the validators plus body of the last 200. Callers send
+    the validators as If-None-Match / If-Modified-Since and replay the stored body on a 304,
+    which GitHub does not count against the rate limit.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.store = DiskLRUStore(
+            root=root or os.path.join(settings.CACHE_DIR, "http"),
+            max_bytes=max_bytes or settings.HTTP_CACHE_MAX_BYTES,
+        )
+        self.not_modified = 0
+
+    @staticmethod
+    def key(url: str, token: Optional[str], accept: Optional[str]) -> str:
+        token_scope = hashlib.sha256(token.encode()).hexdigest() if token else "anonymous"
+        return hashlib.sha256(f"{token_scope}\n{accept}\n{url}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, str], bytes]]:
+        """Return (stored headers, body) for a key, or None."""
+        data = self.store.get(key)
+        if data is None:
+            return None
+        meta, _, body = data.partition(b"\n")
+        return json.loads(meta), body
+
+    def open(self, key: str) -> Optional[Tuple[Dict[str, str], BinaryIO]]:
+        """Like get, but returns the body as an open file positioned after the headers, for streaming."""
+        f = self.store.open(key)
+        if f is None:
+            return None
+        return json.loads(f.readline()), f
+
+    def conditional_headers(self, stored_headers: Mapping[str, str]) -> Dict[str, str]:
+        headers = {}
+        if stored_headers.get("ETag"):
+            headers["If-None-Match"] = stored_headers["ETag"]
+        if stored_headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = stored_headers["Last-Modified"]
+        return headers
+
+    def put(self, key: str, response_headers: Mapping[str, str], body: bytes) -> None:
+        self.put_stream(key, response_headers, [body])
+
+    def put_stream(self, key: str, response_headers: Mapping[str, str], chunks: Iterable[bytes]) -> None:
+        stored = {name: response_headers[name] for name in STORED_HEADERS if response_headers.get(name)}
+        if "ETag" not in stored and "Last-Modified" not in stored:
+            return
+        self.store.put_stream(key, itertools.chain([json.dumps(stored).encode() + b"\n"], chunks))
+
+    @property
+    def stats(self) -> dict:
+        return {"not_modified": self.not_modified, **self.store.stats}
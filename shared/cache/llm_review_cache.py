@@ -0,0 +1,77 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+from shared.cache.disk_lru_store import DiskLRUStore
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored result format changes.
+CACHE_FORMAT_VERSION = 1
+
+# Wraps the provider call made on a cache miss (concurrency limit, timeout, hedging), so that
+# cache hits never pass through it.
+ProviderInvoke = Callable[[Callable[[], Awaitable[Any]]], Awaitable[Any]]
+
+
+class LLMReviewCache:
+    """
+    Shared cache of structured LLM review results, keyed by everything that determines the prompt.
+
+    The key hashes the model, the prompt template text and output schema (so editing either
+    invalidates old entries), the factor and all chain inputs, including the diff summary (itself
+    cached per diff, so it is stable for an identical diff). Identical requests from any task on the
+    host, e.g. a retried task or a re-review of the same PR head, are served from disk instead of
+    the LLM. Entries expire after LLM_REVIEW_CACHE_TTL_SECONDS and the store is
+    size-bounded with LRU eviction. Hit and miss counters are per instance, which is per task.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.store = DiskLRUStore(
+            root=root or os.path.join(settings.CACHE_DIR, "llm_reviews"),
+            max_bytes=max_bytes or settings.LLM_REVIEW_CACHE_MAX_BYTES,
+            ttl_seconds=ttl_seconds or settings.LLM_REVIEW_CACHE_TTL_SECONDS,
+        )
+
+    @staticmethod
+    def key(model: str, template: str, factor: str, inputs: Dict[str, Any], schema: Optional[Dict[str, Any]] = None) -> str:
+        """Content hash of a chain call."""
+        payload = {
+            "version": CACHE_FORMAT_VERSION,
+            "model": model,
+            "template": hashlib.sha256(template.encode()).hexdigest(),
+            "schema": schema,
+            "factor": factor,
+            "inputs": inputs,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        data = self.store.get(key)
+        return json.loads(data) if data is not None else None
+
+    def put(self, key: str, result: Any) -> None:
+        try:
+            data = json.dumps(result, separators=(",", ":")).encode()
+        except (TypeError, ValueError) as e:
+            logger.warning(f"event: put, msg: Result not cached for Identifier: key={key}, error={e}")
+            return
+        self.store.put(key, data)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached result for `key`, or await `compute()` and cache what it returns (None is not cached)."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        result = await compute()
+        if result is not None:
+            self.put(key, result)
+        return result
+
+    @property
+    def stats(self) -> dict:
+        stats = self.store.stats
+        lookups = stats["hits"] + stats["misses"]
+        return {**stats, "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0.0}
@@ -1,13 +1,78 @@
 from pydantic_settings import BaseSettings
 
 from pydantic import ConfigDict
+from typing import List, Optional
 
 class Settings(BaseSettings):
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
     DATABASE_URL: str
     WORKER_CONCURRENCY: int = 4
+    # Processes used to parse files for the call graph; 0 or 1 parses in the worker itself.
+    CALL_GRAPH_PARSE_PROCESSES: int = 0
     TASK_TIME_LIMIT: int = 300
+    CACHE_DIR: str = "/tmp/pr-reviewer-cache"
+    BLOB_CACHE_MAX_BYTES: int = 2 * 1024 ** 3
+    # Above this many uncached blobs a single tarball download beats per-blob requests.
+    BLOB_FETCH_SNAPSHOT_THRESHOLD: int = 50
+    # Download only the files the review touches instead of the whole branch.
+    LAZY_FILE_MAP: bool = True
+    # "api" uses the GitHub REST API, "git_mirror" fetches into local bare mirrors under CACHE_DIR.
+    PR_FETCH_MODE: str = "api"
+    HTTP_CACHE_MAX_BYTES: int = 256 * 1024 ** 2
+    # Diffs are streamed into a spool that moves to disk beyond this size.
+    DIFF_SPOOL_MAX_MEMORY: int = 4 * 1024 ** 2
+    # Upper bound on diff text placed into a single prompt (summaries, simple review).
+    DIFF_PROMPT_MAX_CHARS: int = 300_000
+    # Skip vendored, generated, binary and lock files before download and review.
+    FILE_FILTER_ENABLED: bool = True
+    FILE_FILTER_EXCLUDE_GLOBS: Optional[List[str]] = None  # defaults to file_filter.DEFAULT_EXCLUDE_GLOBS
+    FILE_FILTER_MAX_FILE_BYTES: int = 1024 ** 2
+    CALL_GRAPH_CACHE_MAX_BYTES: int = 256 * 1024 ** 2
+    # "per_factor" makes one LLM call per (factor, function); "multi_factor" one call per function for all factors.
+    COMPLICATED_REVIEW_MODE: str = "per_factor"
+    # Pack small functions into shared requests up to the chain's prompt/completion token budget.
+    COMPLICATED_REVIEW_BATCHING: bool = False
+    # In-flight LLM calls per worker process, adapted between MIN and MAX by AIMD on 429s and timeouts.
+    LLM_CONCURRENCY_INITIAL: int = 8
+    LLM_CONCURRENCY_MIN: int = 1
+    LLM_CONCURRENCY_MAX: int = 32
+    # Rate-limited LLM calls are retried with jittered exponential backoff before reporting AGENT_RATE_LIMIT.
+    LLM_RATE_LIMIT_RETRIES: int = 3
+    LLM_RETRY_BASE_SECONDS: float = 2.0
+    LLM_RETRY_MAX_SECONDS: float = 30.0
+    # Duplicate a complicated-review call once it outlives this latency percentile for its (model, factor),
+    # for at most LLM_HEDGE_MAX_EXTRA_RATIO extra calls.
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_MAX_EXTRA_RATIO: float = 0.05
+    # Recent LLM latencies kept per key, and how many are needed before they are trusted.
+    LLM_LATENCY_WINDOW: int = 200
+    LLM_LATENCY_MIN_SAMPLES: int = 20
+    # LLM call timeouts: LLM_TIMEOUT_MULTIPLIER x the latency predicted from token estimates and recent
+    # history per model, clamped to [MIN, MAX]; the fixed LLM_TIMEOUT_SECONDS when not adaptive.
+    LLM_TIMEOUT_ADAPTIVE: bool = True
+    LLM_TIMEOUT_SECONDS: float = 180.0
+    LLM_TIMEOUT_MULTIPLIER: float = 3.0
+    LLM_TIMEOUT_PERCENTILE: float = 95.0
+    LLM_TIMEOUT_MIN_SECONDS: float = 20.0
+    LLM_TIMEOUT_MAX_SECONDS: float = 600.0
+    # tiktoken encoding used to measure prompts, read from TIKTOKEN_CACHE_DIR (baked into the image).
+    # When that directory holds no tokenizer files, prompts are measured by a character estimate instead.
+    TOKENIZER_ENCODING: str = "o200k_base"
+    TIKTOKEN_CACHE_DIR: str = "/app/.tiktoken"
+    # Structured LLM review results, shared by all tasks on the host.
+    LLM_REVIEW_CACHE_ENABLED: bool = True
+    LLM_REVIEW_CACHE_MAX_BYTES: int = 256 * 1024 ** 2
+    LLM_REVIEW_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    GITHUB_MAX_CONCURRENCY: int = 16
+    GITHUB_REQUEST_TIMEOUT: float = 30.0
+    GITHUB_PAGE_PREFETCH: int = 4
+    GITHUB_RATE_LIMIT_REDIS_URL: Optional[str] = None  # defaults to CELERY_BROKER_URL
+    GITHUB_RATE_LIMIT_BURST: int = 20
+    # Pacing only starts once fewer than this many calls of the hourly quota remain.
+    GITHUB_RATE_LIMIT_RESERVE: int = 500
+    GITHUB_RATE_LIMIT_MAX_WAIT: float = 120.0
     model_config = ConfigDict(env_file=".env")
 
 settings = Settings() 
\ No newline at end of file
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import httpx
+from typing import Optional, Any, Dict, Iterable, AsyncIterator, List
+from shared.cache.http_response_cache import HttpResponseCache
+from shared.config import settings
+from shared.exceptions.fetcher_exceptions import RateLimitException, TokenInvalidException, PermissionDeniedException
+from shared.integrations.clients.github_client import PER_PAGE, page_number
+from shared.integrations.clients.github_rate_limiter import GitHubRateLimiter
+from shared.utils.github_errors_utils import handle_http_error
+from shared.utils.spooled_diff import SpooledDiff, CHUNK_SIZE as DIFF_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncGitHubClient:
+    """
+    Async client for GitHub API.
+
+    All requests go through one keep-alive connection pool and at most `max_concurrency` of them
+    are in flight at once, so callers can fan out with asyncio.gather without flooding GitHub.
+    Use as an async context manager so the pool is closed on the event loop that opened it.
+    """
+    def __init__(self, max_concurrency: Optional[int] = None, http_cache: Optional[HttpResponseCache] = None, rate_limiter: Optional[GitHubRateLimiter] = None):
+        self.base_url = "https://api.github.com"
+        self.http_cache = http_cache or HttpResponseCache()
+        self.rate_limiter = rate_limiter or GitHubRateLimiter()
+        self.request_count = 0
+        self.max_concurrency = max_concurrency or settings.GITHUB_MAX_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.session = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            timeout=httpx.Timeout(settings.GITHUB_REQUEST_TIMEOUT),
+            follow_redirects=True,
+        )
+
+    async def __aenter__(self) -> "AsyncGitHubClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.session.aclose()
+
+    def _make_headers(self, token: Optional[str], accept: str = "application/vnd.github.v3+json") -> dict:
+        headers = {"Accept": accept}
+        if token:
+            headers["Authorization"] = f"token {token}"
+        return headers
+
+    async def _send(self, url: str, headers: dict, token: Optional[str]) -> httpx.Response:
+        async with self._semaphore:
+            await self.rate_limiter.aacquire(token)
+            self.request_count += 1
+            resp = await self.session.get(url, headers=headers)
+        await self.rate_limiter.aupdate(token, resp.headers)
+        return resp
+
+    async def _get(self, url: str, headers: dict, token: Optional[str]) -> httpx.Response:
+        resp = await self._send(url, headers, token)
+        try:
+            resp.raise_for_status()
+            return resp
+        except httpx.HTTPStatusError as e:
+            logger.error(f"[GitHub API Error] | URL: {url} | HTTPError: {e}")
+            handle_http_error(e)
+
+    async def _get_conditional(self, url: str, headers: dict, token: Optional[str]) -> httpx.Response:
+        """Conditional GET backed by the shared HttpResponseCache, see GitHubClient._get_conditional."""
+        key = self.http_cache.key(url, token, headers.get("Accept"))
+        cached = self.http_cache.get(key)
+        request_headers = dict(headers)
+        if cached:
+            request_headers.update(self.http_cache.conditional_headers(cached[0]))
+
+        resp = await self._send(url, request_headers, token)
+        if resp.status_code == 304 and cached:
+            self.http_cache.not_modified += 1
+            return httpx.Response(200, headers=cached[0], content=cached[1], request=resp.request)
+
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"[GitHub API Error] | URL: {url} | HTTPError: {e}")
+            handle_http_error(e)
+        self.http_cache.put(key, resp.headers, resp.content)
+        return resp
+
+    async def get_pr(self, owner: str, repo: str, pr_number: int, token: Optional[str]) -> Dict[str, Any]:
+        url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}"
+        resp = await self._get_conditional(url, self._make_headers(token), token)
+        return resp.json()
+
+    async def get_pr_files(self, owner: str, repo: str, pr_number: int, token: Optional[str]) -> Any:
+        return [item async for item in self.iter_pr_files(owner, repo, pr_number, token)]
+
+    async def iter_pr_files(self, owner: str, repo: str, pr_number: int, token: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async counterpart of GitHubClient.iter_pr_files, collected by get_pr_files and consumed page by
+        page by GitHubPRFetcher.afetch_pr_data: once the first page reveals the page count, all
+        remaining pages are requested concurrently and yielded in order.
+        """
+        url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}/files?per_page={PER_PAGE}"
+        headers = self._make_headers(token)
+        resp = await self._get_conditional(url, headers, token)
+        for item in resp.json():
+            yield item
+
+        last_page = page_number(resp.links.get("last", {}).get("url"))
+        if last_page:
+            pages = [
+                asyncio.ensure_future(self._get_conditional(f"{url}&page={page}", headers, token))
+                for page in range(2, last_page + 1)
+            ]
+            try:
+                for page in pages:
+                    for item in (await page).json():
+                        yield item
+            finally:
+                for page in pages:
+                    page.cancel()
+            return
+
+        next_url = resp.links.get("next", {}).get("url")
+        while next_url:
+            resp = await self._get_conditional(next_url, headers, token)
+            for item in resp.json():
+                yield item
+            next_url = resp.links.get("next", {}).get("url")
+
+    async def get_pr_diff(self, owner: str, repo: str, pr_number: int, token: Optional[str], base_sha: Optional[str] = None, head_sha: Optional[str] = None) -> SpooledDiff:
+        """Stream the PR's unified diff into a SpooledDiff, pinned to base_sha...head_sha when given, see GitHubClient.get_pr_diff."""
+        if base_sha and head_sha:
+            url = f"{self.base_url}/repos/{owner}/{repo}/compare/{base_sha}...{head_sha}"
+        else:
+            url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}"
+        headers = self._make_headers(token, accept="application/vnd.github.v3.diff")
+        key = self.http_cache.key(url, token, headers["Accept"])
+        cached = self.http_cache.open(key)
+        request_headers = dict(headers)
+        if cached:
+            request_headers.update(self.http_cache.conditional_headers(cached[0]))
+        try:
+            async with self._semaphore:
+                await self.rate_limiter.aacquire(token)
+                self.request_count += 1
+                async with self.session.stream("GET", url, headers=request_headers) as resp:
+                    await self.rate_limiter.aupdate(token, resp.headers)
+                    if resp.status_code == 304 and cached:
+                        self.http_cache.not_modified += 1
+                        return SpooledDiff.from_chunks(iter(lambda: cached[1].read(DIFF_CHUNK_SIZE), b""))
+                    try:
+                        resp.raise_for_status()
+                    except httpx.HTTPStatusError as e:
+                        await resp.aread()
+                        logger.error(f"[GitHub API Error] | URL: {url} | HTTPError: {e}")
+                        handle_http_error(e)
+                    diff = SpooledDiff()
+                    async for chunk in resp.aiter_bytes(DIFF_CHUNK_SIZE):
+                        diff.write(chunk)
+            self.http_cache.put_stream(key, resp.headers, diff.iter_bytes())
+            return diff
+        finally:
+            if cached:
+                cached[1].close()
+
+    async def get_tree(self, owner: str, repo: str, ref: str, token: Optional[str]) -> Dict[str, Any]:
+        """Recursive git tree for `ref`; a truncated listing is completed subtree by subtree, see GitHubClient.get_tree."""
+        tree = await self._fetch_tree(owner, repo, ref, token, recursive=True)
+        if tree.get("truncated"):
+            logger.warning(f"[GitHub API Warning] | Tree truncated for {owner}/{repo}@{ref}, listing subtrees")
+            tree = {**tree, "tree": await self._walk_tree(owner, repo, tree["sha"], token), "truncated": False}
+        return tree
+
+    async def _walk_tree(self, owner: str, repo: str, sha: str, token: Optional[str], prefix: str = "") -> List[Dict[str, Any]]:
+        level = (await self._fetch_tree(owner, repo, sha, token, recursive=False)).get("tree", [])
+        subdirs = [item for item in level if item.get("type") == "tree"]
+        subtrees = await asyncio.gather(*(self._fetch_tree(owner, repo, item["sha"], token, recursive=True) for item in subdirs))
+
+        entries = [{**item, "path": prefix + item["path"]} for item in level]
+        for item, subtree in zip(subdirs, subtrees):
+            path = prefix + item["path"]
+            if subtree.get("truncated"):
+                entries.extend(await self._walk_tree(owner, repo, item["sha"], token, f"{path}/"))
+            else:
+                entries.extend({**sub, "path": f"{path}/{sub['path']}"} for sub in subtree.get("tree", []))
+        return entries
+
+    async def _fetch_tree(self, owner: str, repo: str, ref: str, token: Optional[str], recursive: bool) -> Dict[str, Any]:
+        url = f"{self.base_url}/repos/{owner}/{repo}/git/trees/{ref}" + ("?recursive=1" if recursive else "")
+        resp = await self._get(url, self._make_headers(token), token)
+        return resp.json()
+
+    async def get_blob(self, owner: str, repo: str, sha: str, token: Optional[str]) -> bytes:
+        url = f"{self.base_url}/repos/{owner}/{repo}/git/blobs/{sha}"
+        resp = await self._get(url, self._make_headers(token, accept="application/vnd.github.raw"), token)
+        return resp.content
+
+    async def get_blobs(self, owner: str, repo: str, shas: Iterable[str], token: Optional[str]) -> Dict[str, bytes]:
+        """
+        Download many blobs concurrently (bounded by max_concurrency).
+
+        Returns:
+            Dict[str, bytes]: Mapping of blob SHA to raw content. Blobs that failed are omitted and
+            logged; quota and credential errors are raised, since every other blob fails the same way.
+        """
+        unique_shas = list(dict.fromkeys(shas))
+        results = await asyncio.gather(
+            *(self.get_blob(owner, repo, sha, token) for sha in unique_shas),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, (RateLimitException, TokenInvalidException, PermissionDeniedException)):
+                raise result
+        blobs: Dict[str, bytes] = {}
+        for sha, result in zip(unique_shas, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"[GitHub API Warning] | Skipping blob: {sha} | Error: {result}")
+                continue
+            blobs[sha] = result
+        return blobs
@@ -1,17 +1,61 @@
 import logging
+import tarfile
 import requests
-from typing import Optional, Any, Dict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Dict, Iterator, List, Tuple
+from urllib.parse import urlparse, parse_qs
+from requests.structures import CaseInsensitiveDict
+from shared.cache.http_response_cache import HttpResponseCache
+from shared.config import settings
+from shared.integrations.clients.github_rate_limiter import GitHubRateLimiter
+from shared.exceptions.fetcher_exceptions import FetcherException
 from shared.utils.github_errors_utils import handle_http_error
+from shared.utils.spooled_diff import SpooledDiff, CHUNK_SIZE as DIFF_CHUNK_SIZE
 
 logger = logging.getLogger(__name__)
 
+SYMLINK_MODE = "120000"
+PER_PAGE = 100
+
+
+def page_number(url: Optional[str]) -> Optional[int]:
+    """Extract the `page` query parameter from a pagination Link URL."""
+    if not url:
+        return None
+    pages = parse_qs(urlparse(url).query).get("page")
+    return int(pages[0]) if pages else None
+
+
+def decode_content(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+def tree_blobs(tree: Dict[str, Any]) -> Dict[str, str]:
+    """Map each regular file path in a Git Trees API payload to its blob SHA (symlinks and submodules excluded)."""
+    return {
+        item["path"]: item["sha"]
+        for item in tree.get("tree", [])
+        if item.get("type") == "blob" and item.get("mode") != SYMLINK_MODE
+    }
+
+
+def tree_blob_sizes(tree: Dict[str, Any]) -> Dict[str, int]:
+    """Map each blob path in a Git Trees API payload to its size in bytes."""
+    return {item["path"]: item["size"] for item in tree.get("tree", []) if item.get("type") == "blob" and "size" in item}
+
 
 class GitHubClient:
     """
     Client for GitHub API.
     """
-    def __init__(self):
+    def __init__(self, http_cache: Optional[HttpResponseCache] = None, rate_limiter: Optional[GitHubRateLimiter] = None):
         self.base_url = "https://api.github.com"
+        # Shared session so consecutive requests reuse keep-alive connections instead of a new TCP+TLS handshake each.
+        self.session = requests.Session()
+        self.http_cache = http_cache or HttpResponseCache()
+        self.rate_limiter = rate_limiter or GitHubRateLimiter()
+        self.request_count = 0
 
     def _make_headers(self, token: Optional[str], accept: str = "application/vnd.github.v3+json") -> dict:
         headers = {"Accept": accept}
@@ -19,77 +63,247 @@ class GitHubClient:
             headers["Authorization"] = f"token {token}"
         return headers
 
+    def _send(self, url: str, headers: dict, token: Optional[str], **kwargs) -> requests.Response:
+        """Every GitHub request goes through here so it is paced by, and reports quota to, the shared rate limiter."""
+        self.rate_limiter.acquire(token)
+        self.request_count += 1
+        resp = self.session.get(url, headers=headers, **kwargs)
+        self.rate_limiter.update(token, resp.headers)
+        return resp
+
+    def _get_conditional(self, url: str, headers: dict, token: Optional[str]) -> requests.Response:
+        """
+        GET `url` with If-None-Match / If-Modified-Since from the response cache. A 304 is turned
+        back into the stored 200 response, so callers can use .json()/.text/.links unchanged.
+        """
+        key = self.http_cache.key(url, token, headers.get("Accept"))
+        cached = self.http_cache.get(key)
+        request_headers = dict(headers)
+        if cached:
+            request_headers.update(self.http_cache.conditional_headers(cached[0]))
+
+        resp = self._send(url, request_headers, token)
+        if resp.status_code == 304 and cached:
+            self.http_cache.not_modified += 1
+            replay = requests.Response()
+            replay.status_code = 200
+            replay.url = url
+            replay.headers = CaseInsensitiveDict(cached[0])
+            replay.encoding = "utf-8"
+            replay._content = cached[1]
+            return replay
+
+        resp.raise_for_status()
+        self.http_cache.put(key, resp.headers, resp.content)
+        return resp
+
     def get_pr_files(self, owner: str, repo: str, pr_number: int, token: Optional[str]) -> Any:
-        url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}/files"
+        return list(self.iter_pr_files(owner, repo, pr_number, token))
+
+    def iter_pr_files(self, owner: str, repo: str, pr_number: int, token: Optional[str], prefetch: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the changed files of a PR page by page (per_page=100); get_pr_files collects them.
+
+        The first page's `Link: rel="last"` tells us how many pages exist; up to `prefetch` of the
+        following pages are then requested concurrently while earlier ones are being consumed.
+        Without a "last" link the paginator simply follows rel="next".
+        """
+        prefetch = prefetch or settings.GITHUB_PAGE_PREFETCH
+        url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}/files?per_page={PER_PAGE}"
         headers = self._make_headers(token)
+
+        resp = self._get_pr_files_page(url, headers, token, owner, repo, pr_number)
+        yield from resp.json()
+
+        last_page = page_number(resp.links.get("last", {}).get("url"))
+        if last_page:
+            page_urls = [f"{url}&page={page}" for page in range(2, last_page + 1)]
+            with ThreadPoolExecutor(max_workers=prefetch) as pool:
+                pending: deque = deque()
+                for page_url in page_urls:
+                    pending.append(pool.submit(self._get_pr_files_page, page_url, headers, token, owner, repo, pr_number))
+                    if len(pending) >= prefetch:
+                        yield from pending.popleft().result().json()
+                while pending:
+                    yield from pending.popleft().result().json()
+            return
+
+        next_url = resp.links.get("next", {}).get("url")
+        while next_url:
+            resp = self._get_pr_files_page(next_url, headers, token, owner, repo, pr_number)
+            yield from resp.json()
+            next_url = resp.links.get("next", {}).get("url")
+
+    def _get_pr_files_page(self, url: str, headers: dict, token: Optional[str], owner: str, repo: str, pr_number: int) -> requests.Response:
         try:
-            resp = requests.get(url, headers=headers)
-            resp.raise_for_status()
-            return resp.json()
+            return self._get_conditional(url, headers, token)
         except requests.HTTPError as e:
             logger.error(
                 f"[GitHub API Error] | repos: {repo} | owner: {owner} | pr_number: {pr_number} | URL: {url} | HTTPError: {e}"
             )
             handle_http_error(e)
 
-    def get_pr_diff(self, owner: str, repo: str, pr_number: int, token: Optional[str]) -> str:
-        url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}"
+    def get_pr_diff(self, owner: str, repo: str, pr_number: int, token: Optional[str], base_sha: Optional[str] = None, head_sha: Optional[str] = None) -> SpooledDiff:
+        """
+        Fetch the PR's unified diff. With base_sha/head_sha the diff is taken from the compare
+        endpoint between those commits, pinning it to a known revision of the PR.
+
+        The response body is streamed into a SpooledDiff (and from there into the response cache),
+        so the diff is never held in memory as one string however large it is.
+        """
+        if base_sha and head_sha:
+            url = f"{self.base_url}/repos/{owner}/{repo}/compare/{base_sha}...{head_sha}"
+        else:
+            url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}"
         headers = self._make_headers(token, accept="application/vnd.github.v3.diff")
+        key = self.http_cache.key(url, token, headers["Accept"])
+        cached = self.http_cache.open(key)
+        request_headers = dict(headers)
+        if cached:
+            request_headers.update(self.http_cache.conditional_headers(cached[0]))
         try:
-            resp = requests.get(url, headers=headers)
-            resp.raise_for_status()
-            return resp.text
+            with self._send(url, request_headers, token, stream=True) as resp:
+                if resp.status_code == 304 and cached:
+                    self.http_cache.not_modified += 1
+                    return SpooledDiff.from_chunks(iter(lambda: cached[1].read(DIFF_CHUNK_SIZE), b""))
+                resp.raise_for_status()
+                diff = SpooledDiff.from_chunks(resp.iter_content(DIFF_CHUNK_SIZE))
+            self.http_cache.put_stream(key, resp.headers, diff.iter_bytes())
+            return diff
         except requests.HTTPError as e:
             logger.error(
                 f"[GitHub API Error] | repos: {repo} | owner: {owner} | pr_number: {pr_number} | URL: {url} | HTTPError: {e}"
             )
             handle_http_error(e)
+        finally:
+            if cached:
+                cached[1].close()
+
+    def get_pr(self, owner: str, repo: str, pr_number: int, token: Optional[str]) -> Dict[str, Any]:
+        url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}"
+        headers = self._make_headers(token)
+        try:
+            resp = self._get_conditional(url, headers, token)
+            return resp.json()
+        except requests.HTTPError as e:
+            logger.error(
+                f"[GitHub API Error] | repos: {repo} | owner: {owner} | pr_number: {pr_number} | URL: {url} | HTTPError: {e}"
+            )
+            handle_http_error(e)
+
+    def get_tree(self, owner: str, repo: str, ref: str, token: Optional[str]) -> Dict[str, Any]:
+        """
+        Fetch the recursive git tree for a commit, branch or tree SHA, in a single request unless
+        GitHub truncates it; a truncated listing is completed subtree by subtree.
+
+        Returns:
+            Dict[str, Any]: Git Trees API payload ({"sha", "tree": [...], "truncated"}) listing every entry.
+        """
+        tree = self._fetch_tree(owner, repo, ref, token, recursive=True)
+        if tree.get("truncated"):
+            logger.warning(f"[GitHub API Warning] | Tree truncated for {owner}/{repo}@{ref}, listing subtrees")
+            tree = {**tree, "tree": self._walk_tree(owner, repo, tree["sha"], token), "truncated": False}
+        return tree
+
+    def _walk_tree(self, owner: str, repo: str, sha: str, token: Optional[str], prefix: str = "") -> List[Dict[str, Any]]:
+        """Entries under tree `sha` with full paths: one level at a time, each subtree recursively in one request unless it is truncated too."""
+        entries = []
+        for item in self._fetch_tree(owner, repo, sha, token, recursive=False).get("tree", []):
+            path = prefix + item["path"]
+            entries.append({**item, "path": path})
+            if item.get("type") != "tree":
+                continue
+            subtree = self._fetch_tree(owner, repo, item["sha"], token, recursive=True)
+            if subtree.get("truncated"):
+                entries.extend(self._walk_tree(owner, repo, item["sha"], token, f"{path}/"))
+            else:
+                entries.extend({**sub, "path": f"{path}/{sub['path']}"} for sub in subtree.get("tree", []))
+        return entries
+
+    def _fetch_tree(self, owner: str, repo: str, ref: str, token: Optional[str], recursive: bool) -> Dict[str, Any]:
+        url = f"{self.base_url}/repos/{owner}/{repo}/git/trees/{ref}" + ("?recursive=1" if recursive else "")
+        headers = self._make_headers(token)
+        try:
+            resp = self._send(url, headers, token)
+            resp.raise_for_status()
+            return resp.json()
+        except requests.HTTPError as e:
+            logger.error(f"[GitHub API Error] | Fetching tree | ref: {ref} | URL: {url} | HTTPError: {e}")
+            handle_http_error(e)
+
+    def get_blob(self, owner: str, repo: str, sha: str, token: Optional[str]) -> bytes:
+        url = f"{self.base_url}/repos/{owner}/{repo}/git/blobs/{sha}"
+        headers = self._make_headers(token, accept="application/vnd.github.raw")
+        try:
+            resp = self._send(url, headers, token)
+            resp.raise_for_status()
+            return resp.content
+        except requests.HTTPError as e:
+            logger.error(f"[GitHub API Error] | Fetching blob | sha: {sha} | URL: {url} | HTTPError: {e}")
+            handle_http_error(e)
+
+    def iter_snapshot_files(self, owner: str, repo: str, ref: str, token: Optional[str]) -> Iterator[Tuple[str, bytes]]:
+        """
+        Stream the repository tarball for `ref` and yield (path, raw bytes) for every regular file.
+
+        The archive is unpacked on the fly from the HTTP response, so only one member is held in
+        memory at a time and the cost grows with bytes downloaded rather than with the file count.
+        """
+        url = f"{self.base_url}/repos/{owner}/{repo}/tarball/{ref}"
+        headers = self._make_headers(token)
+        try:
+            with self._send(url, headers, token, stream=True) as resp:
+                resp.raise_for_status()
+                resp.raw.decode_content = True
+                with tarfile.open(fileobj=resp.raw, mode="r|*") as archive:
+                    for member in archive:
+                        if not member.isfile():
+                            continue
+                        # Archive entries are prefixed with a single "<owner>-<repo>-<sha>/" directory.
+                        _, _, path = member.name.partition("/")
+                        if not path:
+                            continue
+                        extracted = archive.extractfile(member)
+                        if extracted is None:
+                            continue
+                        yield path, extracted.read()
+        except requests.HTTPError as e:
+            logger.error(f"[GitHub API Error] | Fetching snapshot | ref: {ref} | URL: {url} | HTTPError: {e}")
+            handle_http_error(e)
 
     def get_all_files_by_branch(self, owner: str, repo: str, token: Optional[str], branch: str) -> Dict[str, str]:
         """
-        Recursively fetch all files and their contents from a specific branch using the GitHub Contents API.
+        Fetch all files and their contents for a branch or commit as a single bulk snapshot.
+
+        The recursive git tree lists every blob in one request and the tarball supplies the
+        contents in one streamed download. Blobs listed in the tree but absent from the archive
+        (e.g. `export-ignore` paths) are fetched individually so the result matches the tree.
 
         Args:
             owner (str): Repository owner.
             repo (str): Repository name.
             token (Optional[str]): GitHub token.
-            branch (str): Branch name to fetch files from.
+            branch (str): Branch name or commit SHA to fetch files from.
 
         Returns:
             Dict[str, str]: Mapping of file paths to their decoded contents.
         """
-        headers = self._make_headers(token)
-        base_contents_url = f"{self.base_url}/repos/{owner}/{repo}/contents"
+        tree = self.get_tree(owner, repo, branch, token)
+        blobs = tree_blobs(tree)
+
         file_contents: Dict[str, str] = {}
+        for path, data in self.iter_snapshot_files(owner, repo, branch, token):
+            if path in blobs:
+                file_contents[path] = decode_content(data)
 
-        def fetch_directory(path: str):
-            url = f"{base_contents_url}/{path}?ref={branch}" if path else f"{base_contents_url}?ref={branch}"
+        for path, sha in blobs.items():
+            if path in file_contents:
+                continue
             try:
-                resp = requests.get(url, headers=headers)
-                resp.raise_for_status()
-                items = resp.json()
-
-                if not isinstance(items, list):  # It's a file, not a directory
-                    items = [items]
-
-                for item in items:
-                    if item["type"] == "file":
-                        try:
-                            file_resp = requests.get(item["download_url"], headers=headers)
-                            file_resp.raise_for_status()
-                            file_contents[item["path"]] = file_resp.text
-                        except requests.HTTPError as e:
-                            logger.warning(f"[GitHub API Warning] | Skipping file: {item['path']} | HTTPError: {e}")
-                            continue
-
-                    elif item["type"] == "dir":
-                        fetch_directory(item["path"])
-
-            except requests.HTTPError as e:
-                logger.error(f"[GitHub API Error] | Fetching path: {path} | URL: {url} | HTTPError: {e}")
-                handle_http_error(e)
+                file_contents[path] = decode_content(self.get_blob(owner, repo, sha, token))
+            except FetcherException as e:
+                logger.warning(f"[GitHub API Warning] | Skipping file: {path} | Error: {e}")
 
-        fetch_directory("")  # Start from the root
         return file_contents
 
 
@@ -106,18 +320,9 @@ class GitHubClient:
         Returns:
             Dict[str, str]: Mapping from file path to file content in the PR branch.
         """
-        headers = self._make_headers(token)
-
-        # Step 1: Get the PR metadata to extract the head branch
-        pr_url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}"
-        try:
-            pr_resp = requests.get(pr_url, headers=headers)
-            pr_resp.raise_for_status()
-            pr_data = pr_resp.json()
-            branch = pr_data["head"]["ref"]
-        except requests.HTTPError as e:
-            logger.error(f"[GitHub API Error] | Could not get PR metadata | URL: {pr_url} | HTTPError: {e}")
-            handle_http_error(e)
+        # Step 1: Get the PR metadata to extract the head commit
+        pr_data = self.get_pr(owner, repo, pr_number, token)
+        head_sha = pr_data["head"]["sha"]
 
-        # Step 2: Use the branch to fetch all files
-        return self.get_all_files_by_branch(owner, repo, token, branch)
\ No newline at end of file
+        # Step 2: Snapshot the head commit
+        return self.get_all_files_by_branch(owner, repo, token, head_sha)
\ No newline at end of file
@@ -0,0 +1,140 @@
+import time
+import asyncio
+import hashlib
+import logging
+import redis
+from typing import Optional, Mapping
+from shared.config import settings
+from shared.exceptions.fetcher_exceptions import RateLimitException
+
+logger = logging.getLogger(__name__)
+
+# Requests flow freely while more than `reserve` calls of the GitHub quota remain. Below that,
+# a token bucket refilled at the rate that spreads the rest evenly until the reset time paces
+# them. State lives in one Redis hash per token scope so every worker paces against the same
+# budget. Returns "0" when a request may go now, otherwise the seconds to wait.
+RESERVE_SCRIPT = """
+local key = KEYS[1]
+local burst = tonumber(ARGV[1])
+local reserve = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', key, 'tokens', 'ts', 'remaining', 'reset')
+local remaining = tonumber(state[3])
+local reset = tonumber(state[4])
+if not remaining or not reset or now >= reset then
+    return '0'
+end
+if remaining > reserve then
+    redis.call('HSET', key, 'remaining', remaining - 1)
+    return '0'
+end
+local rate = remaining / math.max(reset - now, 1)
+local tokens = tonumber(state[1]) or math.min(burst, remaining)
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+if tokens >= 1 and remaining >= 1 then
+    redis.call('HSET', key, 'tokens', tokens - 1, 'ts', now, 'remaining', remaining - 1)
+    return '0'
+end
+redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+if remaining < 1 or rate <= 0 then
+    return tostring(reset - now)
+end
+return tostring((1 - tokens) / rate)
+"""
+
+
+class GitHubRateLimiter:
+    """
+    Cluster-wide GitHub request pacer shared by all Celery workers through Redis.
+
+    Every GitHub response feeds X-RateLimit-Remaining / X-RateLimit-Reset into the shared state
+    (`update`), and every request first reserves a token (`acquire` / `aacquire`). Requests are
+    not delayed while more than `reserve` calls remain; once the quota drains into the reserve,
+    workers sleep when the bucket is empty and so slow down smoothly instead of failing with
+    403/429. If Redis is unreachable the limiter fails open for a cool-down period.
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None, burst: Optional[int] = None, max_wait: Optional[float] = None, reserve: Optional[int] = None):
+        self._redis = redis_client
+        self._script = None
+        self.burst = burst or settings.GITHUB_RATE_LIMIT_BURST
+        self.reserve_calls = reserve if reserve is not None else settings.GITHUB_RATE_LIMIT_RESERVE
+        self.max_wait = max_wait if max_wait is not None else settings.GITHUB_RATE_LIMIT_MAX_WAIT
+        self._disabled_until = 0.0
+        self.waited_seconds = 0.0
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(
+                settings.GITHUB_RATE_LIMIT_REDIS_URL or settings.CELERY_BROKER_URL,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+            )
+        return self._redis
+
+    @staticmethod
+    def _key(token: Optional[str]) -> str:
+        scope = hashlib.sha256(token.encode()).hexdigest() if token else "anonymous"
+        return f"github:ratelimit:{scope}"
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _fail_open(self, e: Exception) -> None:
+        logger.warning(f"event: github_rate_limiter, msg: Redis unavailable, pacing disabled for 30s, error={e}")
+        self._disabled_until = time.monotonic() + 30
+
+    def reserve(self, token: Optional[str]) -> float:
+        """Try to take one request token. Returns 0 if granted, else the seconds to wait before retrying."""
+        if not self._available():
+            return 0.0
+        try:
+            if self._script is None:
+                self._script = self.redis.register_script(RESERVE_SCRIPT)
+            return float(self._script(keys=[self._key(token)], args=[self.burst, self.reserve_calls]))
+        except redis.RedisError as e:
+            self._fail_open(e)
+            return 0.0
+
+    def _check_wait(self, wait: float, waited: float) -> None:
+        if waited + wait > self.max_wait:
+            raise RateLimitException(f"GitHub quota exhausted, next request allowed in {wait:.0f}s")
+
+    def acquire(self, token: Optional[str]) -> None:
+        waited = 0.0
+        while (wait := self.reserve(token)) > 0:
+            self._check_wait(wait, waited)
+            time.sleep(wait)
+            waited += wait
+        self.waited_seconds += waited
+
+    async def aacquire(self, token: Optional[str]) -> None:
+        # reserve() is a blocking Redis round trip (up to socket_timeout), so it runs off the event loop.
+        waited = 0.0
+        while (wait := await asyncio.to_thread(self.reserve, token)) > 0:
+            self._check_wait(wait, waited)
+            await asyncio.sleep(wait)
+            waited += wait
+        self.waited_seconds += waited
+
+    def update(self, token: Optional[str], headers: Mapping[str, str]) -> None:
+        """Record the authoritative quota reported by GitHub on a response."""
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None or not self._available():
+            return
+        key = self._key(token)
+        try:
+            pipe = self.redis.pipeline()
+            pipe.hset(key, mapping={"remaining": int(remaining), "reset": int(reset)})
+            pipe.expireat(key, int(reset) + 60)
+            pipe.execute()
+        except redis.RedisError as e:
+            self._fail_open(e)
+
+    async def aupdate(self, token: Optional[str], headers: Mapping[str, str]) -> None:
+        # Same blocking Redis pipeline as update(), kept off the event loop.
+        await asyncio.to_thread(self.update, token, headers)
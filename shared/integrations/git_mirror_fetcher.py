@@ -0,0 +1,292 @@
+import os
+import base64
+import fcntl
+import hashlib
+import logging
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from .platform_pr_fetcher import PlatformPRFetcher
+from .lazy_file_map import LazyFileMap
+from .packed_file_map import PackedFileMap
+from .pr_snapshot import PRSnapshot
+from .clients.github_client import SYMLINK_MODE
+from shared.utils.spooled_diff import SpooledDiff, CHUNK_SIZE as DIFF_CHUNK_SIZE
+from shared.services.file_filter import FileFilter
+from shared.config import settings
+from shared.exceptions.fetcher_exceptions import FetcherException, InvalidRepoException, RepoNotFoundException, PRNotFoundException, TokenInvalidException
+
+logger = logging.getLogger(__name__)
+
+BASE_REF = "refs/remotes/origin/HEAD"
+
+
+class GitMirrorPRFetcher(PlatformPRFetcher):
+    """
+    PR fetcher backed by persistent bare git mirrors instead of the REST API.
+
+    Each repository gets one bare mirror under `<CACHE_DIR>/mirrors`. A task only runs an
+    incremental `git fetch` of the PR refs (`refs/pull/<n>/head` and, when the PR merges cleanly,
+    `refs/pull/<n>/merge`) and the remote default branch, then computes the diff, changed files
+    and file contents from local git objects. The base is the first parent of the merge ref, i.e.
+    the PR's own base branch; remotes without a merge ref fall back to the default branch. Works
+    with any git remote, including `file://` URLs.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.path.join(settings.CACHE_DIR, "mirrors")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.request_count = 0
+
+    def fetch_pr_data(self, repo_url: str, pr_number: int, token: str | None = None) -> Dict[str, Any]:
+        """
+            Fetch PR data from the local mirror after an incremental fetch.
+
+            Returns:
+                Dict[str, Any]: {
+                    "files": [...],    # Changed files, shaped like GitHub's /pulls/{n}/files entries
+                    "diff": "...",     # Unified diff as string
+                    "snapshot": PRSnapshot,
+                }
+        """
+        snapshot = self.fetch_pr_snapshot(repo_url, pr_number, token)
+        return {
+            "files": snapshot.files,
+            "diff": snapshot.diff,
+            "snapshot": snapshot,
+        }
+
+    def fetch_pr_snapshot(self, repo_url: str, pr_number: int, token: str | None = None) -> PRSnapshot:
+        mirror = self._sync(repo_url, pr_number, token)
+        head_sha = self._head_sha(mirror, pr_number)
+        base_sha = self._base_sha(mirror, pr_number)
+        merge_base = self._git(mirror, "merge-base", base_sha, head_sha).decode().strip()
+        file_filter = FileFilter()
+
+        return PRSnapshot(
+            repo_url=repo_url,
+            pr_number=pr_number,
+            head_sha=head_sha,
+            base_sha=base_sha,
+            load_diff=lambda: self._stream_diff(mirror, merge_base, head_sha),
+            load_files=lambda: self._changed_files(mirror, merge_base, head_sha),
+            load_tree=lambda: self._tree(mirror, head_sha, file_filter),
+            load_file_map=lambda blobs: LazyFileMap(blobs, self._make_blob_loader(mirror)) if settings.LAZY_FILE_MAP else self._file_map(mirror, blobs),
+            request_counter=lambda: self.request_count,
+            file_filter=file_filter,
+        )
+
+    def fetch_entire_code_for_branch(self, repo_url: str, pr_number: int, token: str | None = None) -> Mapping[str, str]:
+        mirror = self._sync(repo_url, pr_number, token)
+        return self._file_map(mirror, self._tree(mirror, self._head_sha(mirror, pr_number), FileFilter()))
+
+    def fetch_lazy_code_for_branch(self, repo_url: str, pr_number: int, token: str | None = None) -> Mapping[str, str]:
+        mirror = self._sync(repo_url, pr_number, token)
+        blobs = self._tree(mirror, self._head_sha(mirror, pr_number), FileFilter())
+        return LazyFileMap(blobs, self._make_blob_loader(mirror))
+
+    def _head_sha(self, mirror: str, pr_number: int) -> str:
+        head_sha = self._rev_parse(mirror, f"refs/pull/{pr_number}/head")
+        if head_sha is None:
+            raise PRNotFoundException(f"refs/pull/{pr_number}/head not found")
+        return head_sha
+
+    def _base_sha(self, mirror: str, pr_number: int) -> str:
+        """Tip of the PR's base branch: the first parent of GitHub's test merge commit."""
+        base_sha = self._rev_parse(mirror, f"refs/pull/{pr_number}/merge^1")
+        if base_sha is None:
+            # No merge ref (conflicting PR, or a remote that does not publish one).
+            logger.warning(f"event: _base_sha, msg: No merge ref, diffing against the default branch for Identifier: mirror={os.path.basename(mirror)}, pr_number={pr_number}")
+            base_sha = self._git(mirror, "rev-parse", BASE_REF).decode().strip()
+        return base_sha
+
+    @staticmethod
+    def _rev_parse(mirror: str, ref: str) -> Optional[str]:
+        proc = subprocess.run(["git", "--git-dir", mirror, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"], capture_output=True)
+        return proc.stdout.decode().strip() if proc.returncode == 0 else None
+
+    def _make_blob_loader(self, mirror: str) -> Callable[[str, str], bytes]:
+        return lambda path, sha: self._git(mirror, "cat-file", "blob", sha)
+
+    @staticmethod
+    def _remote_url(repo_url: str) -> str:
+        url = repo_url.rstrip("/")
+        if not url:
+            raise InvalidRepoException("Invalid repo URL")
+        if url.startswith("https://") and not url.endswith(".git"):
+            url += ".git"
+        return url
+
+    def _mirror_path(self, remote: str) -> str:
+        name = remote.rsplit("/", 1)[-1].removesuffix(".git") or "repo"
+        return os.path.join(self.cache_dir, f"{name}-{hashlib.sha256(remote.encode()).hexdigest()[:16]}.git")
+
+    @contextmanager
+    def _locked(self, mirror: str) -> Iterator[None]:
+        # Serialise fetches into the same mirror across worker processes.
+        with open(f"{mirror}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _sync(self, repo_url: str, pr_number: int, token: Optional[str]) -> str:
+        """Create the bare mirror if needed and incrementally fetch the PR refs and default branch."""
+        remote = self._remote_url(repo_url)
+        mirror = self._mirror_path(remote)
+        with self._locked(mirror):
+            if not os.path.isdir(mirror):
+                self._git(None, "init", "--bare", "--quiet", mirror)
+            self.request_count += 1
+            # A pattern refspec does not fail when the merge ref is missing, and --prune drops a
+            # stale merge ref once the PR stops merging cleanly; a missing head is caught on rev-parse.
+            self._git(
+                mirror, "fetch", "--quiet", "--no-tags", "--prune", remote,
+                f"+refs/pull/{pr_number}/*:refs/pull/{pr_number}/*",
+                f"+HEAD:{BASE_REF}",
+                token=token,
+            )
+        return mirror
+
+    def _git(self, mirror: Optional[str], *args: str, token: Optional[str] = None) -> bytes:
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        if token:
+            # Passed through the environment so the token never shows up in argv.
+            credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+            env.update({
+                "GIT_CONFIG_COUNT": "1",
+                "GIT_CONFIG_KEY_0": "http.extraHeader",
+                "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+            })
+        cmd = ["git"] + (["--git-dir", mirror] if mirror else []) + list(args)
+        proc = subprocess.run(cmd, env=env, capture_output=True)
+        if proc.returncode != 0:
+            stderr = proc.stderr.decode(errors="replace").strip()
+            logger.error(f"[Git Mirror Error] | Command: git {args[0]} | Error: {stderr}")
+            self._raise_for_git_error(stderr)
+        return proc.stdout
+
+    @staticmethod
+    def _raise_for_git_error(stderr: str) -> None:
+        lowered = stderr.lower()
+        if "couldn't find remote ref refs/pull" in lowered:
+            raise PRNotFoundException(stderr)
+        if "authentication failed" in lowered or "could not read username" in lowered:
+            raise TokenInvalidException(stderr)
+        if "not found" in lowered or "does not appear to be a git repository" in lowered:
+            raise RepoNotFoundException(stderr)
+        raise FetcherException(f"git failed: {stderr}")
+
+    def _stream_diff(self, mirror: str, base: str, head: str) -> SpooledDiff:
+        """Pipe `git diff` straight into a SpooledDiff instead of buffering its output."""
+        cmd = ["git", "--git-dir", mirror, "diff", "--no-color", "--no-ext-diff", "-M", base, head]
+        # stderr goes to a file so a chatty git cannot block on a full pipe while stdout is drained.
+        with tempfile.TemporaryFile() as err, subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err) as proc:
+            diff = SpooledDiff.from_chunks(iter(lambda: proc.stdout.read(DIFF_CHUNK_SIZE), b""))
+            proc.wait()
+            err.seek(0)
+            stderr = err.read().decode(errors="replace").strip()
+        if proc.returncode != 0:
+            logger.error(f"[Git Mirror Error] | Command: git diff | Error: {stderr}")
+            self._raise_for_git_error(stderr)
+        return diff
+
+    def _tree(self, mirror: str, ref: str, file_filter: Optional[FileFilter] = None) -> Dict[str, str]:
+        """{path: blob sha} for regular files at `ref`, minus those `file_filter` skips by path or size."""
+        blobs: Dict[str, str] = {}
+        sizes: Dict[str, int] = {}
+        for entry in self._git(mirror, "ls-tree", "-r", "-l", "-z", ref).split(b"\0"):
+            if not entry:
+                continue
+            meta, _, path = entry.partition(b"\t")
+            mode, obj_type, sha, size = meta.decode().split()
+            if obj_type == "blob" and mode != SYMLINK_MODE:
+                name = path.decode(errors="replace")
+                blobs[name] = sha
+                sizes[name] = int(size)
+        if file_filter is None:
+            return blobs
+        kept = file_filter.filter_tree(blobs, sizes)
+        logger.info(f"event: _tree, msg: File filter for Identifier: mirror={os.path.basename(mirror)}, ref={ref}, stats={file_filter.stats.as_dict()}")
+        return kept
+
+    def _file_map(self, mirror: str, blobs: Dict[str, str]) -> PackedFileMap:
+        """Stream all blobs from one `git cat-file --batch` process into a packed file map."""
+        file_map = PackedFileMap()
+        if not blobs:
+            return file_map
+        paths = list(blobs)
+        cmd = ["git", "--git-dir", mirror, "cat-file", "--batch"]
+        with tempfile.TemporaryFile() as err, subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=err) as proc:
+            # Requests are written from a thread so neither pipe can fill up while the other waits.
+            writer = threading.Thread(target=self._write_batch, args=(proc.stdin, (blobs[path] for path in paths)), daemon=True)
+            writer.start()
+            for path in paths:
+                header = proc.stdout.readline()
+                if not header:
+                    break
+                fields = header.split()
+                if len(fields) != 3:
+                    logger.warning(f"event: _file_map, msg: Blob missing from mirror for Identifier: path={path}, sha={blobs[path]}")
+                    continue
+                file_map.add(path, proc.stdout.read(int(fields[2])), blobs[path])
+                proc.stdout.read(1)
+            writer.join()
+            proc.wait()
+            err.seek(0)
+            stderr = err.read().decode(errors="replace").strip()
+        if proc.returncode != 0:
+            logger.error(f"[Git Mirror Error] | Command: git cat-file | Error: {stderr}")
+            self._raise_for_git_error(stderr)
+        return file_map
+
+    @staticmethod
+    def _write_batch(stdin: IO[bytes], shas: Iterable[str]) -> None:
+        try:
+            for sha in shas:
+                stdin.write(f"{sha}\n".encode())
+            stdin.close()
+        except BrokenPipeError:
+            # git exited early; its return code and stderr are reported by the reader.
+            pass
+
+    def _changed_files(self, mirror: str, base: str, head: str) -> List[Dict[str, Any]]:
+        """Changed files in the shape of GitHub's /pulls/{n}/files entries."""
+        statuses = {"A": "added", "M": "modified", "D": "removed", "R": "renamed", "C": "copied", "T": "changed"}
+        raw = self._git(mirror, "diff", "--raw", "-z", "-M", "--no-abbrev", base, head).split(b"\0")
+        files: Dict[str, Dict[str, Any]] = {}
+        i = 0
+        while i < len(raw) - 1:
+            _, _, _, new_sha, status = raw[i].decode().lstrip(":").split()
+            if status[0] in ("R", "C"):
+                previous, filename = raw[i + 1].decode(), raw[i + 2].decode()
+                i += 3
+            else:
+                previous, filename = None, raw[i + 1].decode()
+                i += 2
+            entry = {"filename": filename, "status": statuses.get(status[0], "modified"), "sha": new_sha,
+                     "additions": 0, "deletions": 0, "changes": 0}
+            if previous:
+                entry["previous_filename"] = previous
+            files[filename] = entry
+
+        for added, deleted, filename in self._numstat(mirror, base, head):
+            if filename in files and added != "-":
+                files[filename].update(additions=int(added), deletions=int(deleted), changes=int(added) + int(deleted))
+        return list(files.values())
+
+    def _numstat(self, mirror: str, base: str, head: str) -> Iterator[Tuple[str, str, str]]:
+        parts = self._git(mirror, "diff", "--numstat", "-z", "-M", base, head).split(b"\0")
+        i = 0
+        while i < len(parts) - 1:
+            added, deleted, path = parts[i].decode().split("\t", 2)
+            if path:
+                i += 1
+            else:
+                # Renames: "<added>\t<deleted>\t\0<old path>\0<new path>\0"
+                path = parts[i + 2].decode()
+                i += 3
+            yield added, deleted, path
@@ -1,15 +1,24 @@
+import asyncio
 import requests
 import logging
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Mapping, Tuple
 from .platform_pr_fetcher import PlatformPRFetcher
-from .clients.github_client import GitHubClient
+from .clients.github_client import GitHubClient, tree_blobs, tree_blob_sizes
+from .clients.async_github_client import AsyncGitHubClient
+from .lazy_file_map import LazyFileMap
+from .packed_file_map import PackedFileMap
+from .pr_snapshot import PRSnapshot
+from shared.cache.blob_store import BlobStore, git_blob_sha
+from shared.services.file_filter import FileFilter
+from shared.config import settings
 from shared.exceptions.fetcher_exceptions import FetcherException, InvalidRepoException, RepoNotFoundException, PermissionDeniedException, PRNotFoundException, RateLimitException, TokenInvalidException, GitHubAPIException
 
 logger = logging.getLogger(__name__)
 
 class GitHubPRFetcher(PlatformPRFetcher):
-    def __init__(self):
+    def __init__(self, blob_store: BlobStore | None = None):
         self.client = GitHubClient()
+        self.blob_store = blob_store or BlobStore()
 
     def fetch_pr_data(self, repo_url: str, pr_number: int, token: str) -> Dict[str, Any]:
         """
@@ -19,18 +28,15 @@ class GitHubPRFetcher(PlatformPRFetcher):
                 Dict[str, Any]: {
                     "files": [...],    # Changed files with metadata
                     "diff": "...",     # Unified diff as string
+                    "snapshot": PRSnapshot,  # Pinned PR view to hand to strategies
                 }
         """
         try:
-            parts = repo_url.rstrip('/').split('/')
-            owner, repo = parts[-2], parts[-1]
-        except Exception:
-            raise InvalidRepoException("Invalid GitHub repo URL")
-
-        try:
-            files = self.client.get_pr_files(owner, repo, pr_number, token)
-            diff = self.client.get_pr_diff(owner, repo, pr_number, token)
+            snapshot = self.fetch_pr_snapshot(repo_url, pr_number, token)
+            files = snapshot.files
+            diff = snapshot.diff
         except (
+            InvalidRepoException,
             TokenInvalidException,
             PermissionDeniedException,
             RepoNotFoundException,
@@ -42,29 +48,58 @@ class GitHubPRFetcher(PlatformPRFetcher):
             raise FetcherException(f"Unexpected error while fetching PR: {str(e)}")
 
         logger.debug(f"Files: {files}")
-        logger.debug(f"Diff: {diff}")
+        logger.debug(f"Diff: {len(diff)} bytes")
 
         return {
             "files": files,
-            "diff": diff
+            "diff": diff,
+            "snapshot": snapshot,
         }
 
+    def fetch_pr_snapshot(self, repo_url: str, pr_number: int, token: str) -> PRSnapshot:
+        """
+            Fetch the PR metadata once and pin its head/base commits. Diff, changed files, tree and
+            file contents are loaded lazily through the returned PRSnapshot and never re-resolve
+            the PR, so they stay consistent if the branch moves mid-task.
+        """
+        owner, repo = self._parse_repo_url(repo_url)
+        pr = self.client.get_pr(owner, repo, pr_number, token)
+        head_sha = pr["head"]["sha"]
+        base_sha = pr["base"]["sha"]
+        file_filter = FileFilter()
+
+        def load_file_map(blobs: Dict[str, str]) -> Mapping[str, str]:
+            if settings.LAZY_FILE_MAP:
+                return LazyFileMap(blobs, self._make_blob_loader(owner, repo, token))
+            return self._fetch_files_via_blob_store(owner, repo, head_sha, token, blobs)
+
+        return PRSnapshot(
+            repo_url=repo_url,
+            pr_number=pr_number,
+            head_sha=head_sha,
+            base_sha=base_sha,
+            load_diff=lambda: self.client.get_pr_diff(owner, repo, pr_number, token, base_sha=base_sha, head_sha=head_sha),
+            load_files=lambda: self.client.get_pr_files(owner, repo, pr_number, token),
+            load_tree=lambda: self._head_blobs(self.client.get_tree(owner, repo, head_sha, token), file_filter),
+            load_file_map=load_file_map,
+            request_counter=lambda: self.client.request_count,
+            file_filter=file_filter,
+        )
+
     def fetch_entire_code_for_branch(self, repo_url: str, pr_number: int, token: str) -> Dict[str, Any]:
         """
             Fetch all full file tree from GitHub using GitHubClient.
 
             Returns:
-               "all_files": {...} # Full repo files mapping {path: content}
+               "all_files": {...} # Full repo files mapping {path: content}, packed in a memory-mapped PackedFileMap
 
         """
-        try:
-            parts = repo_url.rstrip('/').split('/')
-            owner, repo = parts[-2], parts[-1]
-        except Exception:
-            raise InvalidRepoException("Invalid GitHub repo URL")
+        owner, repo = self._parse_repo_url(repo_url)
 
         try:
-            all_files = self.client.get_all_files(owner, repo, pr_number, token)
+            # Same PR lookup, head commit and filtered tree as the task's snapshot would use.
+            snapshot = self.fetch_pr_snapshot(repo_url, pr_number, token)
+            all_files = self._fetch_files_via_blob_store(owner, repo, snapshot.head_sha, token, snapshot.tree)
         except (
             TokenInvalidException,
             PermissionDeniedException,
@@ -77,5 +112,208 @@ class GitHubPRFetcher(PlatformPRFetcher):
             raise FetcherException(f"Unexpected error while fetching PR: {str(e)}")
 
         logger.debug(f"Total Repo Files: {len(all_files)}")
+        self._log_filter_stats(owner, repo, snapshot.head_sha, snapshot.file_filter)
 
         return all_files
+
+    def fetch_lazy_code_for_branch(self, repo_url: str, pr_number: int, token: str) -> LazyFileMap:
+        """
+            Resolve the PR head tree (two requests) and return a LazyFileMap over it. File contents
+            are served from the blob store or downloaded individually the first time they are read.
+        """
+        owner, repo = self._parse_repo_url(repo_url)
+
+        try:
+            snapshot = self.fetch_pr_snapshot(repo_url, pr_number, token)
+            blobs = snapshot.tree
+        except FetcherException:
+            raise
+        except Exception as e:
+            raise FetcherException(f"Unexpected error while fetching PR: {str(e)}")
+
+        logger.debug(f"Total Repo Files: {len(blobs)}")
+        self._log_filter_stats(owner, repo, snapshot.head_sha, snapshot.file_filter)
+        return LazyFileMap(blobs, self._make_blob_loader(owner, repo, token))
+
+    async def afetch_pr_data(self, repo_url: str, pr_number: int, token: str) -> Dict[str, Any]:
+        """
+            Async variant of fetch_pr_data: after the PR is pinned, the file listing and the diff are
+            requested concurrently over a shared AsyncGitHubClient connection pool and seeded into
+            the returned snapshot. Listing entries are filtered page by page as they arrive, so
+            excluded files are dropped while the diff is still streaming.
+        """
+        owner, repo = self._parse_repo_url(repo_url)
+
+        try:
+            snapshot = await asyncio.to_thread(self.fetch_pr_snapshot, repo_url, pr_number, token)
+            async with AsyncGitHubClient() as client:
+                files, diff = await asyncio.gather(
+                    self._acollect_pr_files(client, owner, repo, pr_number, token, snapshot.file_filter),
+                    client.get_pr_diff(owner, repo, pr_number, token, base_sha=snapshot.base_sha, head_sha=snapshot.head_sha),
+                )
+                snapshot.prime(diff, files, client.request_count)
+        except (
+            TokenInvalidException,
+            PermissionDeniedException,
+            RepoNotFoundException,
+            RateLimitException,
+            GitHubAPIException,
+        ) as known_exc:
+            raise known_exc
+        except Exception as e:
+            raise FetcherException(f"Unexpected error while fetching PR: {str(e)}")
+
+        logger.debug(f"Files: {files}")
+        logger.debug(f"Diff: {len(diff)} bytes")
+
+        return {
+            "files": files,
+            "diff": diff,
+            "snapshot": snapshot,
+        }
+
+    @staticmethod
+    async def _acollect_pr_files(client: AsyncGitHubClient, owner: str, repo: str, pr_number: int, token: str, file_filter: FileFilter) -> List[Dict[str, Any]]:
+        """Consume the paginated file listing as pages arrive, keeping only entries the file filter passes."""
+        files = []
+        async for item in client.iter_pr_files(owner, repo, pr_number, token):
+            if not file_filter.skip_reason(item.get("filename", "")):
+                files.append(item)
+        return files
+
+    async def afetch_entire_code_for_branch(self, repo_url: str, pr_number: int, token: str) -> Mapping[str, str]:
+        """
+            Async variant of fetch_entire_code_for_branch: same pinned snapshot and blob store, but
+            blobs still missing after the store (and tarball) are downloaded concurrently.
+        """
+        owner, repo = self._parse_repo_url(repo_url)
+
+        try:
+            snapshot = await asyncio.to_thread(self.fetch_pr_snapshot, repo_url, pr_number, token)
+            ref = snapshot.head_sha
+            blobs = await asyncio.to_thread(lambda: snapshot.tree)
+            all_files, missing, downloaded_bytes = await asyncio.to_thread(self._serve_cached_blobs, owner, repo, ref, token, blobs)
+
+            remaining = {path: sha for path, sha in missing.items() if path not in all_files}
+            async with AsyncGitHubClient() as client:
+                fetched = await client.get_blobs(owner, repo, remaining.values(), token)
+            for path, sha in remaining.items():
+                if sha in fetched:
+                    downloaded_bytes += len(fetched[sha])
+                    self._store_blob(sha, fetched[sha])
+                    all_files.add(path, fetched[sha], sha)
+        except (
+            TokenInvalidException,
+            PermissionDeniedException,
+            RepoNotFoundException,
+            RateLimitException,
+            GitHubAPIException,
+        ) as known_exc:
+            raise known_exc
+        except Exception as e:
+            raise FetcherException(f"Unexpected error while fetching PR: {str(e)}")
+
+        self._log_blob_cache_usage(owner, repo, ref, len(blobs), len(missing), downloaded_bytes)
+        self._log_filter_stats(owner, repo, ref, snapshot.file_filter)
+        return all_files
+
+    @staticmethod
+    def _parse_repo_url(repo_url: str) -> Tuple[str, str]:
+        try:
+            parts = repo_url.rstrip('/').split('/')
+            return parts[-2], parts[-1]
+        except Exception:
+            raise InvalidRepoException("Invalid GitHub repo URL")
+
+    @staticmethod
+    def _head_blobs(tree: Dict[str, Any], file_filter: FileFilter) -> Dict[str, str]:
+        """{path: sha} of the tree's blobs minus those the file filter skips, decided before any download."""
+        return file_filter.filter_tree(tree_blobs(tree), tree_blob_sizes(tree))
+
+    def _make_blob_loader(self, owner: str, repo: str, token: str) -> Callable[[str, str], bytes]:
+        """Loader for LazyFileMap: blob store first, then a single-blob download that is cached."""
+        def load_blob(path: str, sha: str) -> bytes:
+            data = self.blob_store.get(sha)
+            if data is None:
+                data = self.client.get_blob(owner, repo, sha, token)
+                self._store_blob(sha, data)
+            return data
+        return load_blob
+
+    def _fetch_files_via_blob_store(self, owner: str, repo: str, ref: str, token: str, blobs: Dict[str, str]) -> PackedFileMap:
+        """
+        Serve every blob of the `ref` tree ({path: sha}) from the local blob store, downloading
+        only blobs that are missing: individually when there are few, as one tarball otherwise.
+        """
+        all_files, missing, downloaded_bytes = self._serve_cached_blobs(owner, repo, ref, token, blobs)
+
+        for path, sha in missing.items():
+            if path in all_files:
+                continue
+            try:
+                data = self.client.get_blob(owner, repo, sha, token)
+            except FetcherException as e:
+                logger.warning(f"event: fetch_entire_code_for_branch, msg: Skipping file: {path}, error={e}")
+                continue
+            downloaded_bytes += len(data)
+            self._store_blob(sha, data)
+            all_files.add(path, data, sha)
+
+        self._log_blob_cache_usage(owner, repo, ref, len(blobs), len(missing), downloaded_bytes)
+        return all_files
+
+    def _serve_cached_blobs(self, owner: str, repo: str, ref: str, token: str, blobs: Dict[str, str]) -> Tuple[PackedFileMap, Dict[str, str], int]:
+        """
+        Contents from the blob store plus, when more than BLOB_FETCH_SNAPSHOT_THRESHOLD blobs are
+        missing, the tarball of `ref`. Returns the file map, the {path: sha} that missed the store
+        (paths already filled from the tarball included) and the bytes downloaded.
+        """
+        all_files, missing = self._load_cached_blobs(blobs)
+        downloaded_bytes = 0
+        if len(missing) > settings.BLOB_FETCH_SNAPSHOT_THRESHOLD:
+            downloaded_bytes += self._download_snapshot(owner, repo, ref, token, missing, all_files)
+        return all_files, missing, downloaded_bytes
+
+    def _load_cached_blobs(self, blobs: Dict[str, str]) -> Tuple[PackedFileMap, Dict[str, str]]:
+        """Split {path: sha} into contents served from the blob store and the {path: sha} still missing."""
+        all_files = PackedFileMap()
+        missing: Dict[str, str] = {}
+        for path, sha in blobs.items():
+            data = self.blob_store.get(sha)
+            if data is None:
+                missing[path] = sha
+            else:
+                all_files.add(path, data, sha)
+        return all_files, missing
+
+    def _download_snapshot(self, owner: str, repo: str, ref: str, token: str, missing: Dict[str, str], all_files: PackedFileMap) -> int:
+        """Stream the tarball for `ref`, filling `all_files` for missing paths. Returns bytes downloaded."""
+        downloaded_bytes = 0
+        for path, data in self.client.iter_snapshot_files(owner, repo, ref, token):
+            if path not in missing:
+                continue
+            downloaded_bytes += len(data)
+            exact = self._store_blob(missing[path], data)
+            all_files.add(path, data, missing[path] if exact else None)
+        return downloaded_bytes
+
+    def _log_blob_cache_usage(self, owner: str, repo: str, ref: str, total: int, misses: int, downloaded_bytes: int) -> None:
+        logger.info(
+            f"event: fetch_entire_code_for_branch, msg: Blob cache for Identifier: repo={owner}/{repo}, ref={ref}, "
+            f"hits={total - misses}, misses={misses}, downloaded_bytes={downloaded_bytes}, "
+            f"store_stats={self.blob_store.stats}"
+        )
+
+    @staticmethod
+    def _log_filter_stats(owner: str, repo: str, ref: str, file_filter: FileFilter) -> None:
+        logger.info(
+            f"event: fetch_entire_code_for_branch, msg: File filter for Identifier: repo={owner}/{repo}, ref={ref}, "
+            f"stats={file_filter.stats.as_dict()}"
+        )
+
+    def _store_blob(self, sha: str, data: bytes) -> bool:
+        # Archive contents can differ from the blob (export-subst, eol attributes); only cache exact blobs.
+        if git_blob_sha(data) != sha:
+            return False
+        self.blob_store.put(sha, data)
+        return True
@@ -0,0 +1,54 @@
+import logging
+from typing import Callable, Dict, Iterator, Mapping, Optional
+from shared.exceptions.fetcher_exceptions import FetcherException
+
+logger = logging.getLogger(__name__)
+
+
+class LazyFileMap(Mapping[str, str]):
+    """
+    Read-only {path: content} mapping over a repository tree that downloads a file only the first
+    time its content is read.
+
+    Membership, iteration and len() are answered from the tree listing, so code that only needs
+    paths never triggers a download. `loader(path, blob_sha)` supplies the raw bytes of a file and
+    is called at most once per path; files whose download fails behave as missing keys.
+    """
+
+    def __init__(self, blobs: Dict[str, str], loader: Callable[[str, str], bytes]):
+        self._blobs = blobs
+        self._loader = loader
+        self._contents: Dict[str, Optional[str]] = {}
+        self.fetched_bytes = 0
+
+    def __getitem__(self, path: str) -> str:
+        if path not in self._contents:
+            sha = self._blobs[path]
+            try:
+                data = self._loader(path, sha)
+                self.fetched_bytes += len(data)
+                self._contents[path] = data.decode("utf-8", errors="replace")
+            except FetcherException as e:
+                logger.warning(f"event: lazy_file_map, msg: Skipping file: {path}, error={e}")
+                self._contents[path] = None
+        content = self._contents[path]
+        if content is None:
+            raise KeyError(path)
+        return content
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._blobs)
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._blobs
+
+    def blob_sha(self, path: str) -> Optional[str]:
+        """Git blob SHA of a path, known without downloading the file."""
+        return self._blobs.get(path)
+
+    @property
+    def stats(self) -> dict:
+        return {"files": len(self._blobs), "fetched_files": len(self._contents), "fetched_bytes": self.fetched_bytes}
@@ -0,0 +1,90 @@
+import os
+import mmap
+import tempfile
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+from shared.config import settings
+
+# Upper bound on file bytes read through the mapping before its pages are released again.
+RELEASE_EVERY_BYTES = 16 * 1024 ** 2
+
+
+class PackedFileMap(Mapping[str, str]):
+    """
+    Read-only {path: content} mapping that keeps file contents as raw bytes in one anonymous
+    temporary file, memory-mapped for reads, plus an in-memory {path: (offset, length)} index.
+
+    Contents are decoded only when a file is read and the decoded string is not retained. Mapped
+    pages are released again after each read, so a whole-repository map costs roughly its index in
+    RSS while the bytes stay in the (reclaimable) page cache. The arena lives under CACHE_DIR, which
+    should be disk-backed rather than tmpfs. Files are appended with `add` while the map is being
+    filled.
+    """
+
+    def __init__(self, spool_dir: Optional[str] = None):
+        spool_dir = spool_dir or settings.CACHE_DIR
+        os.makedirs(spool_dir, exist_ok=True)
+        self._file = tempfile.TemporaryFile(prefix=".file-map-", dir=spool_dir)
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._shas: Dict[str, str] = {}
+        self._size = 0
+        self._mmap: Optional[mmap.mmap] = None
+        self._mapped_bytes = 0
+
+    def add(self, path: str, data: bytes, sha: Optional[str] = None) -> None:
+        """Append a file's raw bytes; `sha` (its git blob SHA) lets callers key caches without reading it."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.seek(self._size)
+        self._file.write(data)
+        self._index[path] = (self._size, len(data))
+        self._size += len(data)
+        if sha:
+            self._shas[path] = sha
+
+    def raw(self, path: str) -> bytes:
+        offset, length = self._index[path]
+        if length == 0:
+            return b""
+        if self._mmap is None:
+            self._file.flush()
+            self._mmap = mmap.mmap(self._file.fileno(), self._size, access=mmap.ACCESS_READ)
+        data = self._mmap[offset:offset + length]
+        # Periodically drop the mapped pages from this process; later reads fault them back in from
+        # the page cache. The whole mapping is released because page faults also map neighbours.
+        self._mapped_bytes += length
+        if self._mapped_bytes > RELEASE_EVERY_BYTES:
+            self._mmap.madvise(mmap.MADV_DONTNEED)
+            self._mapped_bytes = 0
+        return data
+
+    def __getitem__(self, path: str) -> str:
+        return self.raw(path).decode("utf-8", errors="replace")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._index
+
+    def blob_sha(self, path: str) -> Optional[str]:
+        return self._shas.get(path)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    @property
+    def stats(self) -> dict:
+        return {"files": len(self._index), "packed_bytes": self._size}
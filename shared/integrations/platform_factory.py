@@ -1,5 +1,7 @@
+from shared.config import settings
 from shared.models.enums import PlatformType
 from .github_fetcher import GitHubPRFetcher
+from .git_mirror_fetcher import GitMirrorPRFetcher
 # from .gitlab_fetcher import GitLabPRFetcher  # For future
 # from .bitbucket_fetcher import BitbucketPRFetcher  # For future
 
@@ -10,10 +12,12 @@ class PlatformFetcherFactory:
     @staticmethod
     def get_fetcher(platform_type: PlatformType):
         if platform_type == PlatformType.GITHUB:
+            if settings.PR_FETCH_MODE == "git_mirror":
+                return GitMirrorPRFetcher()
             return GitHubPRFetcher()
         # elif platform_type == PlatformType.GITLAB:
         #     return GitLabPRFetcher()
         # elif platform_type == PlatformType.BITBUCKET:
         #     return BitbucketPRFetcher()
         else:
-            raise NotImplementedError(f"Platform {platform_type} not supported yet.") 
\ No newline at end of file
+            raise NotImplementedError(f"Platform {platform_type} not supported yet.")
@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Mapping
 
 class PlatformPRFetcher(ABC):
     """
@@ -16,4 +17,37 @@ class PlatformPRFetcher(ABC):
         Returns:
             Dict[str, Any]: PR data (should be standardized for analysis)
         """
-        pass 
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def fetch_entire_code_for_branch(self, repo_url: str, pr_number: int, token: str | None = None) -> Mapping[str, str]:
+        """
+        Fetch every file of the PR head as a {path: content} mapping.
+        """
+        pass
+
+    def fetch_lazy_code_for_branch(self, repo_url: str, pr_number: int, token: str | None = None) -> Mapping[str, str]:
+        """
+        Like fetch_entire_code_for_branch, but platforms that can list the tree cheaply may return a
+        mapping that downloads each file on first access. Defaults to the eager mapping.
+        """
+        return self.fetch_entire_code_for_branch(repo_url, pr_number, token)
+
+    async def afetch_pr_data(self, repo_url: str, pr_number: int, token: str | None = None) -> Dict[str, Any]:
+        """
+        Awaitable fetch_pr_data. Platforms with a native async client should override this;
+        the default runs the blocking implementation in a worker thread.
+        """
+        return await asyncio.to_thread(self.fetch_pr_data, repo_url, pr_number, token)
+
+    async def afetch_entire_code_for_branch(self, repo_url: str, pr_number: int, token: str | None = None) -> Mapping[str, str]:
+        """
+        Awaitable fetch_entire_code_for_branch, see afetch_pr_data.
+        """
+        return await asyncio.to_thread(self.fetch_entire_code_for_branch, repo_url, pr_number, token)
+
+    async def afetch_lazy_code_for_branch(self, repo_url: str, pr_number: int, token: str | None = None) -> Mapping[str, str]:
+        """
+        Awaitable fetch_lazy_code_for_branch, see afetch_pr_data.
+        """
+        return await asyncio.to_thread(self.fetch_lazy_code_for_branch, repo_url, pr_number, token)
@@ -0,0 +1,71 @@
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Mapping, Optional
+from shared.services.file_filter import FileFilter
+
+
+class PRSnapshot:
+    """
+    Fetch-once view of a pull request for the duration of a task.
+
+    The head and base commits are pinned when the snapshot is built, so every later read (diff,
+    tree, file contents) describes the same revision even if someone pushes mid-task. Each part
+    is loaded on first access and then reused, so no stage has to go back to the platform for
+    data another stage already fetched.
+    """
+
+    def __init__(
+        self,
+        repo_url: str,
+        pr_number: int,
+        head_sha: str,
+        base_sha: str,
+        load_diff: Callable[[], Any],
+        load_files: Callable[[], List[Dict[str, Any]]],
+        load_tree: Callable[[], Dict[str, str]],
+        load_file_map: Callable[[Dict[str, str]], Mapping[str, str]],
+        request_counter: Callable[[], int] = lambda: 0,
+        file_filter: Optional[FileFilter] = None,
+    ):
+        self.repo_url = repo_url
+        self.pr_number = pr_number
+        self.head_sha = head_sha
+        self.base_sha = base_sha
+        self._load_diff = load_diff
+        self._load_files = load_files
+        self._load_tree = load_tree
+        self._load_file_map = load_file_map
+        self._request_counter = request_counter
+        self._primed_requests = 0
+        # Applied by the fetcher to the tree and by the task to the diff; its stats are per task.
+        self.file_filter = file_filter or FileFilter()
+
+    @cached_property
+    def diff(self) -> Any:
+        """Unified diff between the pinned base and head commits."""
+        return self._load_diff()
+
+    @cached_property
+    def files(self) -> List[Dict[str, Any]]:
+        """Changed files with platform metadata."""
+        return self._load_files()
+
+    @cached_property
+    def tree(self) -> Dict[str, str]:
+        """{path: blob sha} for every file at the pinned head commit that passes the file filter."""
+        return self._load_tree()
+
+    @cached_property
+    def file_map(self) -> Mapping[str, str]:
+        """{path: content} for the pinned head commit."""
+        return self._load_file_map(self.tree)
+
+    def prime(self, diff: Any, files: List[Dict[str, Any]], request_count: int = 0) -> None:
+        """Seed the diff and changed files fetched outside the snapshot (e.g. concurrently by an async client)."""
+        self.__dict__["diff"] = diff
+        self.__dict__["files"] = files
+        self._primed_requests += request_count
+
+    @property
+    def request_count(self) -> int:
+        """Number of platform requests issued so far on behalf of this snapshot."""
+        return self._request_counter() + self._primed_requests
@@ -1,9 +1,12 @@
 from http.cookiejar import request_port
 
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, TYPE_CHECKING
 from .enums import PlatformType, TaskStatus, ReviewStrategyName, ReviewFactor, ErrorCode, ReviewFactor
 
+if TYPE_CHECKING:
+    from shared.integrations.pr_snapshot import PRSnapshot
+
 class AnalyzePRRequest(BaseModel):
     platformType: PlatformType
     repo_url: str
@@ -81,10 +84,11 @@ class SimpleLLMReviewStrategyContext(ReviewStrategyContext):
         self.factors = factors
 
 class ComplicatedLLMReviewStrategyContext(ReviewStrategyContext):
-    def __init__(self, factors: List[ReviewFactor], repo_url: str, pr_number: int, platform: PlatformType, token: Optional[str]):
+    def __init__(self, factors: List[ReviewFactor], repo_url: str, pr_number: int, platform: PlatformType, token: Optional[str], snapshot: Optional["PRSnapshot"] = None):
         super().__init__(strategy_name=ReviewStrategyName.COMPLICATED_LLM_STRATEGY)
         self.factors = factors
         self.repo_url = repo_url
         self.pr_number = pr_number
         self.platform = platform
-        self.token = token
\ No newline at end of file
+        self.token = token
+        self.snapshot = snapshot
\ No newline at end of file
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Mapping, Callable
 import re
 import ast
 import logging
 from collections import defaultdict
+from shared.utils.diff_parser import FileDiff
+from shared.utils.context_budget import ContextBlock
 
 logger = logging.getLogger(__name__)
 
@@ -11,15 +13,41 @@ class LanguageHandler(ABC):
     """
     Strategy interface for language-specific implementations.
     """
+    # Bump when the shape or content of call_graph_fragment changes so persisted fragments are rebuilt.
+    CALL_GRAPH_VERSION = 1
 
     @abstractmethod
-    def extract_functions_from_diff(self, diff: str, file_map: Dict[str, str]) -> List[Dict[str, str]]:
-        """Return list of {"filename": ..., "function_name": ...} for functions touched by the diff."""
+    def extract_functions_from_diff(self, file_diffs: List[FileDiff], file_map: Mapping[str, str]) -> List[Dict[str, str]]:
+        """Return list of {"filename": ..., "function_name": ...} for functions touched by the parsed file diffs."""
 
     @abstractmethod
-    def get_call_graph(self, file_map: Dict[str, str]) -> Dict[str, List[str]]:
+    def get_call_graph(self, file_map: Mapping[str, str]) -> Dict[str, List[str]]:
         """Return a mapping full_fn_name -> list of called function names."""
 
+    def call_graph_fragment(self, filename: str, content: str) -> Dict[str, Any]:
+        """
+        JSON-serializable call-graph data of a single file that depends only on its content, so it
+        can be persisted by content hash. The default is {in-file function name: [callees]}.
+        """
+        prefix = f"{filename}:"
+        return {name[len(prefix):]: calls for name, calls in self.get_call_graph({filename: content}).items()}
+
+    def link_call_graph(self, fragments: Dict[str, Dict[str, Any]], file_map: Mapping[str, str], load_fragment: Callable[[str], Optional[Dict[str, Any]]]) -> Dict[str, List[str]]:
+        """
+        Merge per-file fragments ({filename: fragment}) into `filename:function -> [callees]`.
+        `load_fragment(filename)` returns the fragment of any other file for cross-file resolution.
+        The default keeps callees as recorded in the fragments.
+        """
+        return {f"{filename}:{name}": calls for filename, fragment in fragments.items() for name, calls in fragment.items()}
+
     @abstractmethod
-    def fetch_function_context(self, fn: Dict[str, str], file_map: Dict[str, str], call_graph: Dict[str, List[str]]) -> str:
-        """Return source + context string for the given function reference."""
\ No newline at end of file
+    def fetch_function_context(self, fn: Dict[str, str], file_map: Mapping[str, str], call_graph: Dict[str, List[str]]) -> str:
+        """Return source + context string for the given function reference."""
+
+    def fetch_function_context_blocks(self, fn: Dict[str, str], file_map: Mapping[str, str], call_graph: Dict[str, List[str]]) -> List[ContextBlock]:
+        """
+        The context as separate blocks (the function, then each callee) so it can be trimmed to a
+        token budget. The default is one block holding fetch_function_context's output.
+        """
+        context = self.fetch_function_context(fn, file_map, call_graph)
+        return [ContextBlock("function", f"{fn.get('filename')}:{fn.get('function_name')}", f"# Function: {fn}", context)]
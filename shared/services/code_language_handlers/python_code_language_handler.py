@@ -1,135 +1,149 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Mapping, Tuple, Callable
 import re
 import ast
 import logging
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from .code_language_handler import LanguageHandler
+from .python_module_index import PythonModuleIndex
+from .python_symbol_index import PythonSymbolIndex
+from shared.utils.diff_parser import FileDiff
+from shared.utils.context_budget import ContextBlock, join_blocks
 
 logger = logging.getLogger(__name__)
 
+# Parsed modules kept per handler; entries are keyed by content, so a stale file is never served.
+MAX_INDEXED_MODULES = 512
+
+
 class PythonHandler(LanguageHandler):
-    def extract_functions_from_diff(self, diff: str, file_map: Dict[str, str]) -> List[str]:
+    CALL_GRAPH_VERSION = 2
+    def __init__(self):
+        self._indexes: "OrderedDict[Tuple[str, str], PythonModuleIndex]" = OrderedDict()
+
+    def module_index(self, filename: str, source: str) -> PythonModuleIndex:
+        """Parse `source` once and reuse the index for every later call with the same content."""
+        key = (filename, source)
+        index = self._indexes.get(key)
+        if index is None:
+            index = PythonModuleIndex(filename, source)
+            self._indexes[key] = index
+            if len(self._indexes) > MAX_INDEXED_MODULES:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(key)
+        return index
+
+    def extract_functions_from_diff(self, file_diffs: List[FileDiff], file_map: Mapping[str, str]) -> List[Dict[str, str]]:
         """
         Extracts modified function definitions from full source using AST and diff line tracking.
         Only returns functions that were touched by the diff (added/deleted lines).
         """
         functions = []
 
-        file_diffs = re.split(r'diff --git a/(.+?) b/\1\n', diff)[1:]
-        file_chunks = list(zip(file_diffs[::2], file_diffs[1::2]))
-
-        for filename, chunk in file_chunks:
+        for file_diff in file_diffs:
+            filename = file_diff.path
             if not filename.endswith(".py"):
                 logger.info(f"Skipping non-Python file: {filename}")
                 continue
+            if file_diff.status == "removed" or file_diff.is_binary:
+                continue
 
             full_source = file_map.get(filename)
             if not full_source:
                 logger.warning(f"Missing full source for file: {filename}")
                 continue
 
-            # Collect modified line numbers from diff
-            modified_lines = set()
-            current_new_line = 0
-
-            for line in chunk.splitlines():
-                if line.startswith('@@'):
-                    match = re.match(r'@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@', line)
-                    if match:
-                        current_new_line = int(match.group(1))
-                        span = int(match.group(2) or 1)
-                        current_hunk_line = current_new_line
-                elif line.startswith('+') and not line.startswith('+++'):
-                    modified_lines.add(current_new_line)
-                    current_new_line += 1
-                elif line.startswith(' ') or line.startswith('-'):
-                    current_new_line += 1
-
-            # Parse AST and filter functions by line range
-            try:
-                tree = ast.parse(full_source)
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.FunctionDef):
-                        start = node.lineno
-                        end = getattr(node, 'end_lineno', start)  # Python 3.8+ provides end_lineno
-                        if any(start <= line <= end for line in modified_lines):
-                            functions.append({
-                                "filename": filename,
-                                "function_name": node.name
-                            })
-            except SyntaxError as e:
-                logger.warning(f"AST parsing failed for {filename}: {e}")
+            modified_lines = file_diff.modified_lines
+
+            # Filter indexed functions by line range
+            index = self.module_index(filename, full_source)
+            if index.error:
+                logger.warning(f"AST parsing failed for {filename}: {index.error}")
+                continue
+            for info in index.functions_containing(modified_lines):
+                functions.append({
+                    "filename": filename,
+                    "function_name": info.qualname
+                })
 
         return functions
 
-    def get_call_graph(self, file_map: Dict[str, str]) -> Dict[str, List[str]]:
+    def get_call_graph(self, file_map: Mapping[str, str]) -> Dict[str, List[str]]:
         """
         Parses all Python files to build a call graph mapping each function
         to the functions it calls. Assumes file_map contains Python code.
+        Callees defined in the repo are resolved to `path:qualname`; others keep their dotted name.
         """
+        fragments = {filename: self.call_graph_fragment(filename, content) for filename, content in file_map.items()}
+        return self.link_call_graph(fragments, file_map, lambda filename: self._fragment_from_map(filename, file_map))
+
+    def _fragment_from_map(self, filename: str, file_map: Mapping[str, str]) -> Optional[Dict[str, Any]]:
+        content = file_map.get(filename)
+        return self.call_graph_fragment(filename, content) if content is not None else None
+
+    def call_graph_fragment(self, filename: str, content: str) -> Dict[str, Any]:
+        """{"functions": {qualname: {"span": [start, end], "calls": [dotted targets]}}, "classes": [qualname], "imports": {name: dotted path}}"""
+        index = self.module_index(filename, content)
+        if index.error:
+            logger.warning(f"Skipping {filename} due to parse error: {index.error}")
+        return {
+            "functions": {q: {"span": [info.start, info.end], "calls": info.calls} for q, info in index.by_qualname.items()},
+            "classes": index.classes,
+            "imports": index.imports,
+        }
+
+    def link_call_graph(self, fragments: Dict[str, Dict[str, Any]], file_map: Mapping[str, str], load_fragment: Callable[[str], Optional[Dict[str, Any]]]) -> Dict[str, List[str]]:
+        symbols = PythonSymbolIndex(file_map, load_fragment, fragments)
         call_graph = {}
-
-        for filename, content in file_map.items():
-            try:
-                tree = ast.parse(content)
-                func_defs = {node.name: node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)}
-
-                for func_name, func_node in func_defs.items():
-                    calls = []
-                    for node in ast.walk(func_node):
-                        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
-                            calls.append(node.func.id)
-                    full_name = f"{filename}:{func_name}"
-                    call_graph[full_name] = calls
-
-            except Exception as e:
-                print(f"Skipping {filename} due to parse error: {e}")
-                continue
-
+        for filename, fragment in fragments.items():
+            for qualname, function in fragment["functions"].items():
+                # Different spellings of one callee (`helper`, `u.helper`) resolve to a single entry.
+                call_graph[f"{filename}:{qualname}"] = list(dict.fromkeys(
+                    symbols.resolve(filename, qualname, target) or target for target in function["calls"]
+                ))
         return call_graph
 
-    def fetch_function_context(self, fn: dict, file_map: Dict[str, str], call_graph: Dict[str, List[str]]) -> str:
+    def fetch_function_context(self, fn: dict, file_map: Mapping[str, str], call_graph: Dict[str, List[str]]) -> str:
         """
         Given a function full name like 'file.py:func', extract its source code,
-        along with basic context from its callers and callees if available.
+        along with the bodies of the callees the call graph resolved, from any file in the repo.
         """
+        return join_blocks(self.fetch_function_context_blocks(fn, file_map, call_graph))
 
+    def fetch_function_context_blocks(self, fn: dict, file_map: Mapping[str, str], call_graph: Dict[str, List[str]]) -> List[ContextBlock]:
         try:
             filename = fn["filename"]
             func_name = fn["function_name"]
             content = file_map.get(filename)
             if not content:
-                return f"# Source not found for {fn}"
+                return [ContextBlock("error", f"{filename}:{func_name}", f"# Source not found for {fn}", "")]
 
-            tree = ast.parse(content)
-            source_lines = content.splitlines()
+            index = self.module_index(filename, content)
+            if index.error:
+                raise index.error
             context_blocks = []
 
             # Extract target function's code
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef) and node.name == func_name:
-                    start_line = node.lineno - 1
-                    end_line = max([n.lineno for n in ast.walk(node) if hasattr(n, "lineno")], default=start_line + 1)
-                    func_code = "\n".join(source_lines[start_line:end_line])
-                    context_blocks.append(f"# Function: {fn}\n{func_code}")
-                    break
-
-            # Add callees (functions this function calls)
-            callees = call_graph.get(f"{filename}:{func_name}", [])
-            for callee_name in callees:
-                # Try to find the function definition in the same file
-                callee_fn = f"{filename}:{callee_name}"
-                if callee_fn in call_graph:
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.FunctionDef) and node.name == callee_name:
-                            start = node.lineno - 1
-                            end = max([n.lineno for n in ast.walk(node) if hasattr(n, "lineno")], default=start + 1)
-                            callee_code = "\n".join(source_lines[start:end])
-                            context_blocks.append(f"# Callee: {callee_fn}\n{callee_code}")
-                            break
-
-            return "\n\n".join(context_blocks)
+            info = index.lookup(func_name)
+            if info:
+                context_blocks.append(ContextBlock("function", f"{filename}:{info.qualname}", f"# Function: {fn}", index.source(info)))
+
+            # Add callees (functions this function calls) resolved to `path:qualname`
+            callees = call_graph.get(f"{filename}:{info.qualname if info else func_name}", [])
+            for callee_fn in callees:
+                callee_file, sep, callee_name = callee_fn.rpartition(":")
+                if not sep or callee_fn == f"{filename}:{func_name}":
+                    continue
+                callee_source = file_map.get(callee_file)
+                if not callee_source:
+                    continue
+                callee_index = self.module_index(callee_file, callee_source)
+                callee = callee_index.by_qualname.get(callee_name)
+                if callee:
+                    context_blocks.append(ContextBlock("callee", callee_fn, f"# Callee: {callee_fn}", callee_index.source(callee)))
+
+            return context_blocks
 
         except Exception as e:
-            return f"# Failed to extract function context for {fn}: {e}"
\ No newline at end of file
+            return [ContextBlock("error", f"{fn.get('filename')}:{fn.get('function_name')}", f"# Failed to extract function context for {fn}: {e}", "")]
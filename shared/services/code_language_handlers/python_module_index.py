@@ -0,0 +1,148 @@
+import ast
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Union
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+
+@dataclass
+class FunctionInfo:
+    name: str
+    qualname: str   # e.g. "Class.method", "outer.<locals>.inner"
+    start: int      # 1-based line of the `def`
+    end: int        # 1-based last line (ast end_lineno)
+    calls: List[str] = field(default_factory=list)     # dotted call targets as written: "f", "mod.f", "self.m"
+    parent: Optional[int] = None    # position of the enclosing function in `functions`
+
+
+def dotted_name(node: ast.expr) -> Optional[str]:
+    """"a.b.c" for a Name/Attribute chain, None for anything else (calls on call results, subscripts...)."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+class PythonModuleIndex:
+    """
+    Everything the Python handler needs from one source file, computed by a single parse.
+
+    Holds each function's span and the names it calls; source slices are cut from the split
+    lines on demand. Functions (sync and async, methods and nested ones) are kept sorted by
+    start line with a link to their enclosing function, which makes the spans an interval
+    index: the innermost function around a line is found by bisection. Files that fail to
+    parse produce an empty index with `error` set.
+    """
+
+    def __init__(self, filename: str, source: str):
+        self.filename = filename
+        self.error: Optional[SyntaxError] = None
+        self.functions: List[FunctionInfo] = []
+        self.by_qualname: Dict[str, FunctionInfo] = {}
+        self.by_name: Dict[str, FunctionInfo] = {}
+        self.classes: List[str] = []    # qualified class names
+        # Local name -> imported dotted path; relative imports keep their leading dots.
+        self.imports: Dict[str, str] = {}
+        self._starts: List[int] = []
+        self._lines: Optional[List[str]] = None
+        self._source = source
+
+        try:
+            tree = ast.parse(source)
+        except SyntaxError as e:
+            self.error = e
+            return
+
+        self._collect(tree.body, prefix="", parent=None)
+        self._collect_imports(tree)
+        # Pre-order traversal already yields ascending starts; sort defensively and remap parents.
+        order = sorted(range(len(self.functions)), key=lambda i: self.functions[i].start)
+        if order != list(range(len(order))):
+            position = {old: new for new, old in enumerate(order)}
+            self.functions = [self.functions[i] for i in order]
+            for info in self.functions:
+                if info.parent is not None:
+                    info.parent = position[info.parent]
+        self._starts = [info.start for info in self.functions]
+        for info in self.functions:
+            self.by_qualname.setdefault(info.qualname, info)
+            self.by_name.setdefault(info.name, info)
+
+    def _collect(self, body: List[ast.stmt], prefix: str, parent: Optional[int]) -> None:
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._add_function(node, prefix, parent)
+            elif isinstance(node, ast.ClassDef):
+                self.classes.append(f"{prefix}{node.name}")
+                self._collect(node.body, f"{prefix}{node.name}.", parent)
+            else:
+                # Functions defined under if/try/with/for/match blocks keep the enclosing prefix.
+                for child in ast.iter_child_nodes(node):
+                    if isinstance(child, ast.stmt):
+                        self._collect([child], prefix, parent)
+                    elif isinstance(child, (ast.ExceptHandler, ast.match_case)):
+                        # except / except* clauses and match cases hold statements but are not stmts.
+                        self._collect(child.body, prefix, parent)
+
+    def _collect_imports(self, tree: ast.Module) -> None:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname:
+                        self.imports[alias.asname] = alias.name
+                    else:
+                        # `import a.b` binds `a`; attribute access resolves the rest.
+                        head = alias.name.split(".", 1)[0]
+                        self.imports[head] = head
+            elif isinstance(node, ast.ImportFrom):
+                base = "." * node.level + (node.module or "")
+                for alias in node.names:
+                    if alias.name == "*":
+                        continue
+                    sep = "" if base.endswith(".") or not base else "."
+                    self.imports[alias.asname or alias.name] = f"{base}{sep}{alias.name}"
+
+    def _add_function(self, node: FunctionNode, prefix: str, parent: Optional[int]) -> None:
+        calls = list(dict.fromkeys(
+            target for n in ast.walk(node) if isinstance(n, ast.Call) and (target := dotted_name(n.func))
+        ))
+        qualname = f"{prefix}{node.name}"
+        self.functions.append(FunctionInfo(node.name, qualname, node.lineno, node.end_lineno or node.lineno, calls, parent))
+        self._collect(node.body, f"{qualname}.<locals>.", len(self.functions) - 1)
+
+    def innermost_function(self, line: int) -> Optional[FunctionInfo]:
+        """Innermost function whose span contains `line`, in O(log n + nesting depth)."""
+        i: Optional[int] = bisect_right(self._starts, line) - 1
+        if i < 0:
+            return None
+        # Function spans are nested or disjoint, so if the latest function starting at or before
+        # `line` ends too early, only its enclosing functions can still contain the line.
+        while i is not None:
+            info = self.functions[i]
+            if info.end >= line:
+                return info
+            i = info.parent
+        return None
+
+    def functions_containing(self, lines: Iterable[int]) -> List[FunctionInfo]:
+        """Innermost enclosing function of each line, de-duplicated, in source order."""
+        found: Dict[int, FunctionInfo] = {}
+        for line in sorted(set(lines)):
+            info = self.innermost_function(line)
+            if info is not None:
+                found.setdefault(info.start, info)
+        return [found[start] for start in sorted(found)]
+
+    def lookup(self, name: str) -> Optional[FunctionInfo]:
+        """Resolve a qualified name, falling back to the first function with that bare name."""
+        return self.by_qualname.get(name) or self.by_name.get(name)
+
+    def source(self, info: FunctionInfo) -> str:
+        if self._lines is None:
+            self._lines = self._source.splitlines()
+        return "\n".join(self._lines[info.start - 1:info.end])
@@ -0,0 +1,91 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+
+Fragment = Dict[str, Any]
+
+# How many `from x import y` re-export hops (e.g. through package __init__ files) are followed.
+MAX_REEXPORT_DEPTH = 3
+
+
+def module_name(path: str) -> str:
+    """Dotted module name of a repository path: "pkg/sub/mod.py" -> "pkg.sub.mod", "pkg/__init__.py" -> "pkg"."""
+    name = path[:-3].replace("/", ".")
+    return name[:-9] if name.endswith(".__init__") else name
+
+
+class PythonSymbolIndex:
+    """
+    Repository-level symbol table that resolves call targets recorded in call-graph fragments
+    ("helper", "mod.func", "self.method") to the `path:qualname` that defines them.
+
+    Module names come from the file listing alone. A file's fragment (its definitions and
+    imports) is only loaded when a call actually resolves into it, so resolution touches exactly
+    the callee files. Every step is a dictionary lookup.
+    """
+
+    def __init__(self, paths: Iterable[str], load_fragment: Callable[[str], Optional[Fragment]], fragments: Optional[Dict[str, Fragment]] = None):
+        self.modules: Dict[str, str] = {}
+        for path in paths:
+            if path.endswith(".py"):
+                name = module_name(path)
+                self.modules[name] = path
+                if name.startswith("src."):
+                    self.modules.setdefault(name[4:], path)
+        self._load_fragment = load_fragment
+        self._fragments: Dict[str, Optional[Fragment]] = dict(fragments or {})
+
+    def fragment(self, path: str) -> Optional[Fragment]:
+        if path not in self._fragments:
+            self._fragments[path] = self._load_fragment(path)
+        return self._fragments[path]
+
+    def resolve(self, path: str, caller: str, target: str) -> Optional[str]:
+        """Resolve a call `target` made inside function `caller` of `path`; None if it is not defined in the repo."""
+        head, _, rest = target.partition(".")
+        if head in ("self", "cls") and rest:
+            owner, _, _ = caller.rpartition(".")
+            if owner and not owner.endswith("<locals>"):
+                return self._find_in_module(path, f"{owner}.{rest}", depth=MAX_REEXPORT_DEPTH)
+            return None
+        # Names defined in the file itself, then names bound by its imports.
+        return self._find_in_module(path, target, depth=MAX_REEXPORT_DEPTH)
+
+    def _find_in_module(self, path: str, name: str, depth: int) -> Optional[str]:
+        fragment = self.fragment(path)
+        if fragment is None:
+            return None
+        functions = fragment["functions"]
+        if name in functions:
+            return f"{path}:{name}"
+        if f"{name}.__init__" in functions:
+            return f"{path}:{name}.__init__"
+        if name in fragment["classes"]:
+            return f"{path}:{name}"
+
+        head, _, rest = name.partition(".")
+        imported = fragment["imports"].get(head)
+        if imported is None or depth <= 0:
+            return None
+        dotted = self._absolute(path, imported) + (f".{rest}" if rest else "")
+        return self._resolve_dotted(dotted, depth - 1)
+
+    def _resolve_dotted(self, dotted: str, depth: int) -> Optional[str]:
+        # Longest importable prefix is the module, the remainder is the qualname inside it.
+        parts = dotted.split(".")
+        for i in range(len(parts) - 1, 0, -1):
+            path = self.modules.get(".".join(parts[:i]))
+            if path:
+                return self._find_in_module(path, ".".join(parts[i:]), depth)
+        return None
+
+    def _absolute(self, path: str, imported: str) -> str:
+        """Resolve a relative import ("..pkg.name") against the package of `path`."""
+        level = len(imported) - len(imported.lstrip("."))
+        if level == 0:
+            return imported
+        package = module_name(path).split(".")
+        if not path.endswith("__init__.py"):
+            package = package[:-1]
+        if level > 1:
+            package = package[:len(package) - (level - 1)]
+        remainder = imported[level:]
+        return ".".join(package + ([remainder] if remainder else []))
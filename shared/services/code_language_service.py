@@ -1,20 +1,43 @@
-from typing import Dict, List, Any, Optional
-import re
+from typing import Dict, List, Any, Optional, Mapping, Iterable, Union, Tuple, Type
 import ast
 import logging
 from collections import defaultdict
+from billiard import Pool
 from .code_language_handlers.code_language_handler import LanguageHandler
 from .code_language_handlers.python_code_language_handler import PythonHandler
+from shared.utils.diff_parser import FileDiff, parse_unified_diff
+from shared.utils.spooled_diff import SpooledDiff
+from shared.utils.context_budget import ContextBlock
+from shared.cache.call_graph_store import CallGraphStore
+from shared.cache.blob_store import git_blob_sha
+from shared.config import settings
 
 
 logger = logging.getLogger(__name__)
 
+# Below this many files to parse, process start-up and pickling cost more than they save.
+PARALLEL_PARSE_MIN_FILES = 64
+
+_worker_handlers: Dict[type, LanguageHandler] = {}
+
+
+def _parse_chunk(items: List[Tuple[Type[LanguageHandler], str, str]]) -> List[Dict[str, List[str]]]:
+    """Process-pool work unit: parse a chunk of files with one handler instance per class."""
+    fragments = []
+    for handler_cls, filename, content in items:
+        handler = _worker_handlers.get(handler_cls)
+        if handler is None:
+            handler = _worker_handlers[handler_cls] = handler_cls()
+        fragments.append(handler.call_graph_fragment(filename, content))
+    return fragments
+
 class LanguageService:
     """
     Registry + dispatcher that routes requests to the appropriate LanguageHandler.
     """
-    def __init__(self):
+    def __init__(self, call_graph_store: Optional[CallGraphStore] = None):
         self._registry: Dict[str, LanguageHandler] = {}
+        self.call_graph_store = call_graph_store or CallGraphStore()
         # register default handlers
         self.register_handler("py", PythonHandler())
 
@@ -43,57 +66,139 @@ class LanguageService:
         raise ValueError("Either filename or language must be provided to select handler")
 
     # convenience methods that delegate to the handler
-    def extract_functions_from_diff(self, diff: str, file_map: Dict[str, str]) -> List[Dict[str, str]]:
+    def extract_functions_from_diff(self, diff: Union[str, SpooledDiff, List[FileDiff]], file_map: Mapping[str, str]) -> List[Dict[str, str]]:
         # We assume diff may contain multiple files possibly of different languages.
-        # We'll group files by ext and call the appropriate handler for each subset.
+        # The diff is parsed once (a SpooledDiff line by line); each handler gets the parsed files for its extension.
         functions: List[Dict[str, str]] = []
+        file_diffs = parse_unified_diff(diff) if isinstance(diff, (str, SpooledDiff)) else diff
 
-        # cheap split to identify file names in diff (reuse same regex you had)
-        file_diffs = re.split(r'diff --git a/(.+?) b/\1\n', diff)[1:]
-        file_chunks = list(zip(file_diffs[::2], file_diffs[1::2]))
-
-        # group chunks by extension and call handlers per-language
-        by_ext: Dict[str, List[tuple]] = defaultdict(list)
-        for filename, chunk in file_chunks:
+        # group parsed files by extension and call handlers per-language
+        by_ext: Dict[str, List[FileDiff]] = defaultdict(list)
+        for file_diff in file_diffs:
+            filename = file_diff.path
             ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
-            by_ext[ext].append((filename, chunk))
+            by_ext[ext].append(file_diff)
 
-        for ext, chunks in by_ext.items():
+        for ext, ext_diffs in by_ext.items():
             handler = self._registry.get(ext)
             if not handler:
-                logger.debug("No handler for extension %s, skipping %s files", ext, [f for f, _ in chunks])
+                logger.debug("No handler for extension %s, skipping %s files", ext, [d.path for d in ext_diffs])
                 continue
 
-            # construct a mini-diff string per-language to reuse handler logic
-            mini_diff = ""
             local_file_map = {}
-            for filename, chunk in chunks:
-                mini_diff += f"diff --git a/{filename} b/{filename}\n{chunk}\n"
-                if filename in file_map:
-                    local_file_map[filename] = file_map[filename]
+            for file_diff in ext_diffs:
+                content = file_map.get(file_diff.path)
+                if content is not None:
+                    local_file_map[file_diff.path] = content
 
-            functions.extend(handler.extract_functions_from_diff(mini_diff, local_file_map))
+            functions.extend(handler.extract_functions_from_diff(ext_diffs, local_file_map))
 
         return functions
 
-    def get_call_graph(self, file_map: Dict[str, str]) -> Dict[str, List[str]]:
-        # Merge call graphs from different handlers
-        overall: Dict[str, List[str]] = {}
-        # group by extension
-        files_by_ext: Dict[str, Dict[str,str]] = defaultdict(dict)
-        for fname, content in file_map.items():
+    def get_call_graph(self, file_map: Mapping[str, str], filenames: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """
+        Build the call graph for `filenames` (default: every file in file_map).
+        Per-file fragments are persisted by content hash, so only files whose content changed since
+        any earlier task are parsed. With a lazy or packed file_map the blob SHA is known from the tree, so
+        files with a stored fragment are not even downloaded.
+        """
+        fragments_by_ext: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        misses: List[Tuple[str, str, str, str]] = []   # (filename, ext, store key, content)
+        for fname in (file_map if filenames is None else filenames):
             ext = fname.rsplit(".", 1)[-1].lower() if "." in fname else ""
-            files_by_ext[ext][fname] = content
-
-        for ext, fm in files_by_ext.items():
-            handler = self._registry.get(ext)
-            if not handler:
-                logger.debug("No handler for ext %s; skipping", ext)
+            if ext not in self._registry:
+                logger.debug("No handler for ext %s; skipping %s", ext, fname)
+                continue
+            lookup = self._lookup_fragment(file_map, fname, ext)
+            if lookup is None:
                 continue
-            overall.update(handler.get_call_graph(fm))
+            key, fragment, content = lookup
+            if fragment is None:
+                misses.append((fname, ext, key, content))
+            else:
+                fragments_by_ext[ext][fname] = fragment
+
+        for (fname, ext, key, _), fragment in zip(misses, self._parse_fragments(misses)):
+            self.call_graph_store.put(key, fragment)
+            fragments_by_ext[ext][fname] = fragment
+
+        # Linking resolves callees across files; fragments of files outside `filenames` are
+        # loaded through the same store only when a call points into them.
+        overall: Dict[str, List[str]] = {}
+        for ext, fragments in fragments_by_ext.items():
+            overall.update(self._registry[ext].link_call_graph(fragments, file_map, lambda fname: self.load_fragment(file_map, fname)))
+
+        logger.info(f"event: get_call_graph, msg: Built call graph, parsed_files={len(misses)}, cache={self.call_graph_store.stats}")
         return overall
 
-    def fetch_function_context(self, fn: Dict[str, str], file_map: Dict[str, str], call_graph: Dict[str, List[str]]) -> str:
+    def _lookup_fragment(self, file_map: Mapping[str, str], fname: str, ext: str) -> Optional[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """(store key, stored fragment or None, content if it had to be read); None if the file is unavailable."""
+        handler = self._registry[ext]
+        content = None
+        # Lazy and packed file maps know blob SHAs from the tree, which avoids reading the file.
+        blob_sha = getattr(file_map, "blob_sha", None)
+        content_sha = blob_sha(fname) if blob_sha else None
+        if content_sha is None:
+            content = file_map.get(fname)
+            if content is None:
+                return None
+            content_sha = git_blob_sha(content.encode())
+        key = self.call_graph_store.key(ext, handler.CALL_GRAPH_VERSION, content_sha)
+        fragment = self.call_graph_store.get(key)
+        if fragment is None and content is None:
+            content = file_map.get(fname)
+            if content is None:
+                return None
+        return key, fragment, content
+
+    def load_fragment(self, file_map: Mapping[str, str], fname: str) -> Optional[Dict[str, Any]]:
+        """Call-graph fragment of a single file, from the store or parsed (and stored) on a miss."""
+        ext = fname.rsplit(".", 1)[-1].lower() if "." in fname else ""
+        if ext not in self._registry:
+            return None
+        lookup = self._lookup_fragment(file_map, fname, ext)
+        if lookup is None:
+            return None
+        key, fragment, content = lookup
+        if fragment is None:
+            fragment = self._registry[ext].call_graph_fragment(fname, content)
+            self.call_graph_store.put(key, fragment)
+        return fragment
+
+    def _parse_fragments(self, misses: List[Tuple[str, str, str, str]]) -> List[Dict[str, List[str]]]:
+        """
+        Parse call-graph fragments for files not found in the store, in input order.
+        Large batches are spread over a process pool of CALL_GRAPH_PARSE_PROCESSES workers in
+        chunks; workers send back plain {function: [callees]} dicts, never AST objects. The pool
+        is billiard's (Celery's multiprocessing fork), which unlike multiprocessing may be started
+        from the daemonic children of a prefork worker.
+        """
+        processes = settings.CALL_GRAPH_PARSE_PROCESSES
+        if processes <= 1 or len(misses) < PARALLEL_PARSE_MIN_FILES:
+            return [self._registry[ext].call_graph_fragment(fname, content) for fname, ext, _, content in misses]
+
+        chunk_size = max(1, -(-len(misses) // (processes * 4)))
+        chunks = [
+            [(type(self._registry[ext]), fname, content) for fname, ext, _, content in misses[i:i + chunk_size]]
+            for i in range(0, len(misses), chunk_size)
+        ]
+        # One apply_async per chunk rather than map: billiard only credits a map job's first worker
+        # with delivered results, and the others then wait out a 30s guard before exiting.
+        pool = Pool(processes)
+        try:
+            results = [pool.apply_async(_parse_chunk, (chunk,)) for chunk in chunks]
+            fragments = [fragment for result in results for fragment in result.get()]
+        finally:
+            pool.close()
+            pool.join()
+        return fragments
+
+    def fetch_function_context(self, fn: Dict[str, str], file_map: Mapping[str, str], call_graph: Dict[str, List[str]]) -> str:
+        filename = fn.get("filename")
+        handler = self.get_handler(filename=filename)
+        return handler.fetch_function_context(fn, file_map, call_graph)
+
+    def fetch_function_context_blocks(self, fn: Dict[str, str], file_map: Mapping[str, str], call_graph: Dict[str, List[str]]) -> List[ContextBlock]:
         filename = fn.get("filename")
         handler = self.get_handler(filename=filename)
-        return handler.fetch_function_context(fn, file_map, call_graph)
\ No newline at end of file
+        return handler.fetch_function_context_blocks(fn, file_map, call_graph)
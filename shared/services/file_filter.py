@@ -0,0 +1,217 @@
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Union
+from shared.config import settings
+from shared.utils.diff_parser import FileDiff, Hunk, iter_file_diffs
+from shared.utils.spooled_diff import SpooledDiff
+
+# Vendored trees, build output, lockfiles, minified bundles and binary formats.
+DEFAULT_EXCLUDE_GLOBS = [
+    "node_modules", "bower_components", "vendor", "third_party", "site-packages", ".venv", "venv",
+    "/dist/", "/build/", "__pycache__", ".git",
+    "*.min.js", "*.min.css", "*.bundle.js", "*.map",
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock", "Pipfile.lock", "Cargo.lock",
+    "Gemfile.lock", "composer.lock", "go.sum", "*.lock",
+    "*_pb2.py", "*_pb2_grpc.py", "*.pb.go", "*.pb.cc", "*.pb.h",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.ico", "*.bmp", "*.webp", "*.pdf", "*.svgz",
+    "*.zip", "*.gz", "*.tgz", "*.bz2", "*.xz", "*.7z", "*.tar", "*.jar", "*.war", "*.whl",
+    "*.so", "*.dylib", "*.dll", "*.exe", "*.bin", "*.o", "*.a", "*.class", "*.pyc",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.mp3", "*.mp4", "*.mov", "*.wav",
+    "*.sqlite", "*.db", "*.parquet", "*.pkl", "*.npy",
+]
+
+# Markers generated files carry in their first lines (after GitHub linguist's generated-file rules).
+GENERATED_MARKER = re.compile(
+    r"@generated|DO NOT EDIT|<auto-generated|"
+    r"(?i:generated by the protocol buffer compiler|this file (?:is|was) (?:automatically |auto-?)generated|autogenerated file)"
+)
+GENERATED_HEADER_LINES = 10
+# Like linguist, a .js/.css file whose lines average more than this many characters is minified.
+MINIFIED_AVG_LINE_LENGTH = 110
+MINIFIED_EXTENSIONS = (".js", ".mjs", ".cjs", ".css")
+# Rough bytes-per-token ratio of code for the token estimate in the counters.
+BYTES_PER_TOKEN = 4
+
+
+def compile_globs(patterns: Iterable[str]) -> Optional["re.Pattern[str]"]:
+    """
+    Compile exclude globs into one regex over repository paths. A pattern without "/" matches any
+    single path component ("node_modules", "*.min.js"); a pattern with "/" matches the whole path
+    from the repository root, with "*" staying inside one component and "**" spanning several.
+    """
+    parts = []
+    for pattern in patterns:
+        anchored = "/" in pattern
+        regex = (
+            re.escape(pattern.strip("/"))
+            .replace(r"\*\*/", "(?:.*/)?")
+            .replace(r"\*\*", ".*")
+            .replace(r"\*", "[^/]*")
+            .replace(r"\?", "[^/]")
+        )
+        parts.append(f"^{regex}(?:/|$)" if anchored else f"(?:^|/){regex}(?:/|$)")
+    return re.compile("|".join(parts)) if parts else None
+
+
+@dataclass
+class FilterStats:
+    files_skipped: int = 0
+    bytes_saved: int = 0
+    # "<stage>.<reason>" -> files, e.g. "tree.glob", "diff.generated"
+    skipped: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.bytes_saved // BYTES_PER_TOKEN
+
+    def record(self, stage: str, reason: str, size: int) -> None:
+        self.files_skipped += 1
+        self.bytes_saved += size
+        key = f"{stage}.{reason}"
+        self.skipped[key] = self.skipped.get(key, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "files_skipped": self.files_skipped,
+            "bytes_saved": self.bytes_saved,
+            "tokens_saved": self.tokens_saved,
+            "skipped": dict(self.skipped),
+        }
+
+
+class FileFilter:
+    """
+    Decides which repository files are worth downloading and reviewing.
+
+    Files are skipped when their path matches an exclude glob (which also covers binary formats),
+    when they exceed the size limit, or, in diffs, when git marks them binary or their leading
+    lines carry a generated-file marker or look minified. Tree filtering only needs paths and
+    sizes, so it runs before any file content is downloaded; diff filtering drops whole file
+    sections before the diff reaches an agent, and the changed-files listing then drops the same
+    paths. One instance is meant to live for one task and accumulates what it skipped in `stats`.
+    """
+
+    def __init__(self, exclude_globs: Optional[List[str]] = None, max_file_bytes: Optional[int] = None, enabled: Optional[bool] = None):
+        self.enabled = settings.FILE_FILTER_ENABLED if enabled is None else enabled
+        if exclude_globs is None:
+            exclude_globs = settings.FILE_FILTER_EXCLUDE_GLOBS if settings.FILE_FILTER_EXCLUDE_GLOBS is not None else DEFAULT_EXCLUDE_GLOBS
+        self._excluded = compile_globs(exclude_globs)
+        self.max_file_bytes = max_file_bytes if max_file_bytes is not None else settings.FILE_FILTER_MAX_FILE_BYTES
+        self.stats = FilterStats()
+        # Paths filter_diff dropped on their content, so filter_files can drop them as well.
+        self._diff_skipped: Set[str] = set()
+
+    def skip_reason(self, path: str, size: Optional[int] = None) -> Optional[str]:
+        """Why `path` is skipped on path and size alone, or None to keep it."""
+        if not self.enabled:
+            return None
+        if self._excluded is not None and self._excluded.search(path):
+            return "glob"
+        if size is not None and self.max_file_bytes and size > self.max_file_bytes:
+            return "size"
+        return None
+
+    def filter_tree(self, blobs: Mapping[str, str], sizes: Optional[Mapping[str, int]] = None) -> Dict[str, str]:
+        """Drop skipped paths from a {path: blob sha} tree before anything is downloaded."""
+        if not self.enabled:
+            return dict(blobs)
+        sizes = sizes or {}
+        kept: Dict[str, str] = {}
+        for path, sha in blobs.items():
+            size = sizes.get(path)
+            reason = self.skip_reason(path, size)
+            if reason:
+                self.stats.record("tree", reason, size or 0)
+            else:
+                kept[path] = sha
+        return kept
+
+    def filter_files(self, files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop skipped entries from a changed-files listing: glob matches, plus every path filter_diff
+        dropped as binary, generated or minified, so call it after filter_diff to keep the listing
+        and the diff in agreement. Their bytes are already counted by filter_diff.
+        """
+        if not self.enabled:
+            return files
+        return [
+            f for f in files
+            if f.get("filename", "") not in self._diff_skipped and not self.skip_reason(f.get("filename", ""))
+        ]
+
+    def filter_diff(self, diff: Union[str, SpooledDiff]) -> Union[str, SpooledDiff]:
+        """
+        Drop the sections of skipped files from a unified diff, returning it in the form it came in.
+
+        The diff is read twice: once through the shared diff parser to classify each file section
+        (path, size, binary marker, leading lines, added line lengths) and once to copy the kept
+        sections, so a spooled diff is never materialised.
+        """
+        if not self.enabled:
+            return diff
+        skipped = set()
+        for index, section in enumerate(self._scan_sections(diff)):
+            reason = self._section_skip_reason(section)
+            if reason:
+                skipped.add(index)
+                self._diff_skipped.add(section["file"].path or "")
+                self.stats.record("diff", reason, section["bytes"])
+        if not skipped:
+            return diff
+
+        kept_lines = self._kept_lines(diff, skipped)
+        if isinstance(diff, SpooledDiff):
+            return SpooledDiff.from_chunks(line.encode("utf-8") for line in kept_lines)
+        return "".join(kept_lines)
+
+    @staticmethod
+    def _iter_lines(diff: Union[str, SpooledDiff]) -> Iterator[str]:
+        if isinstance(diff, SpooledDiff):
+            return diff.iter_lines()
+        # Split on "\n" only and keep line endings, so kept sections are copied byte for byte.
+        return iter(io.StringIO(diff, newline="\n"))
+
+    def _scan_sections(self, diff: Union[str, SpooledDiff]) -> Iterator[Dict[str, Any]]:
+        # The parser yields a file once it has read the next file's header, so at most two
+        # sections are pending here at a time.
+        pending: List[Dict[str, Any]] = []
+
+        def collect(file_diff: FileDiff, hunk: Optional[Hunk], line: str) -> None:
+            if not pending or pending[-1]["file"] is not file_diff:
+                pending.append({"file": file_diff, "bytes": 0, "head": [], "added_chars": 0, "added_lines": 0})
+            section = pending[-1]
+            section["bytes"] += len(line)
+            if hunk is None or line.startswith("\\"):
+                return
+            # Markers are only meaningful when the diff shows the start of the file.
+            if hunk is file_diff.hunks[0] and min(hunk.old_start, hunk.new_start) <= 1 and len(section["head"]) < GENERATED_HEADER_LINES:
+                section["head"].append(line[1:])
+            if line.startswith("+"):
+                section["added_chars"] += len(line.rstrip("\n")) - 1
+                section["added_lines"] += 1
+
+        for _ in iter_file_diffs(self._iter_lines(diff), on_line=collect):
+            yield pending.pop(0)
+
+    def _section_skip_reason(self, section: Dict[str, Any]) -> Optional[str]:
+        file_diff: FileDiff = section["file"]
+        path = file_diff.path or ""
+        reason = self.skip_reason(path, section["bytes"])
+        if reason:
+            return reason
+        if file_diff.is_binary:
+            return "binary"
+        if GENERATED_MARKER.search("".join(section["head"])):
+            return "generated"
+        if path.endswith(MINIFIED_EXTENSIONS) and section["added_lines"] and section["added_chars"] / section["added_lines"] > MINIFIED_AVG_LINE_LENGTH:
+            return "minified"
+        return None
+
+    def _kept_lines(self, diff: Union[str, SpooledDiff], skipped: set) -> Iterator[str]:
+        index = -1
+        for line in self._iter_lines(diff):
+            if line.startswith("diff --git "):
+                index += 1
+            if index not in skipped:
+                yield line
@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
 from shared.models.payloads import ReviewStrategyContext
+from shared.utils.spooled_diff import SpooledDiff
 
 class PRReviewStrategy(ABC):
     @abstractmethod
-    async def review(self, code_diff: str, files: List[Dict[str, Any]], metadata: ReviewStrategyContext) -> Dict[str, Any]:
+    async def review(self, code_diff: Union[str, SpooledDiff], files: List[Dict[str, Any]], metadata: ReviewStrategyContext) -> Dict[str, Any]:
         ...
\ No newline at end of file
@@ -3,18 +3,35 @@ from shared.strategies.review_strategies.base import PRReviewStrategy
 from shared.models.payloads import SimpleLLMReviewStrategyContext, ComplicatedLLMReviewStrategyContext
 from review_agents.simple_llm_review_agent import SimpleLLMPrReviewAgent
 from shared.integrations.platform_factory import PlatformFetcherFactory
+from shared.integrations.lazy_file_map import LazyFileMap
+from shared.config import settings
+from shared.utils.spooled_diff import SpooledDiff
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 class ComplicatedLLMReviewStrategy(PRReviewStrategy):
     def __init__(self):
         self.agent = ComplicatedLLMPrReviewAgent()
 
-    async def review(self, code_diff: str, files: List[Dict[str, Any]], metadata: ComplicatedLLMReviewStrategyContext) -> Dict[str, Any]:
+    async def review(self, code_diff: Union[str, SpooledDiff], files: List[Dict[str, Any]], metadata: ComplicatedLLMReviewStrategyContext) -> Dict[str, Any]:
 
-        # Fetch Entire file tree for repo and given branch
-        fetcher = PlatformFetcherFactory.get_fetcher(metadata.platform)
-        file_map = fetcher.fetch_entire_code_for_branch(repo_url=metadata.repo_url, pr_number=metadata.pr_number, token=metadata.token)
+        # Fetch file tree for repo and given branch (contents on demand when LAZY_FILE_MAP is set)
+        if metadata.snapshot is not None:
+            # Reuse the task's pinned snapshot: no second PR lookup, same head commit as the diff.
+            file_map = await asyncio.to_thread(lambda: metadata.snapshot.file_map)
+        elif settings.LAZY_FILE_MAP:
+            fetcher = PlatformFetcherFactory.get_fetcher(metadata.platform)
+            file_map = await fetcher.afetch_lazy_code_for_branch(repo_url=metadata.repo_url, pr_number=metadata.pr_number, token=metadata.token)
+        else:
+            fetcher = PlatformFetcherFactory.get_fetcher(metadata.platform)
+            file_map = await fetcher.afetch_entire_code_for_branch(repo_url=metadata.repo_url, pr_number=metadata.pr_number, token=metadata.token)
         factors = [f.value for f in metadata.factors]
 
-        return await self.agent.review(code_diff, files, file_map, factors)
\ No newline at end of file
+        result = await self.agent.review(code_diff, files, file_map, factors)
+        if isinstance(file_map, LazyFileMap):
+            logger.info(f"event: review, msg: Lazy file map usage for Identifier: repo={metadata.repo_url}, pr={metadata.pr_number}, stats={file_map.stats}")
+        return result
\ No newline at end of file
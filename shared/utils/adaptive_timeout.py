@@ -0,0 +1,88 @@
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+from shared.config import settings
+from shared.utils.request_hedging import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+# Prior latency model for a chat completion: fixed overhead plus prefill and decode time per token.
+# History scales it per model, so these only need to be the right order of magnitude.
+BASE_SECONDS = 2.0
+SECONDS_PER_INPUT_TOKEN = 0.0002
+SECONDS_PER_OUTPUT_TOKEN = 0.02
+# Expected completion when a caller has no better estimate (e.g. a whole-diff review).
+DEFAULT_COMPLETION_TOKENS = 1000
+
+
+class AdaptiveTimeout:
+    """
+    Per-call LLM timeouts from a latency prediction instead of a fixed LLM_TIMEOUT_SECONDS.
+
+    The prediction is the prior model above scaled by a recent percentile of observed/prior latency
+    ratios for the model; the timeout is LLM_TIMEOUT_MULTIPLIER times that, clamped to
+    [LLM_TIMEOUT_MIN_SECONDS, LLM_TIMEOUT_MAX_SECONDS]. Timed-out calls are recorded at their
+    timeout so a slowing provider lengthens later timeouts.
+
+    `stats` reports `max_seconds_recovered`, an upper bound on the wait saved against the fixed
+    timeout: it assumes every call that timed out would have hung until the fixed timeout. Calls
+    that succeeded after the fixed timeout would have abandoned them are counted separately in
+    `beyond_fixed_timeout`.
+    """
+
+    def __init__(self, tracker: Optional[LatencyTracker] = None, enabled: Optional[bool] = None):
+        self.tracker = tracker or LatencyTracker()
+        self.enabled = settings.LLM_TIMEOUT_ADAPTIVE if enabled is None else enabled
+        self.counters = {"calls": 0, "timeouts": 0, "max_seconds_recovered": 0.0, "beyond_fixed_timeout": 0}
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "max_seconds_recovered": round(self.counters["max_seconds_recovered"], 1)}
+
+    @staticmethod
+    def prior(input_tokens: int, output_tokens: int) -> float:
+        return BASE_SECONDS + input_tokens * SECONDS_PER_INPUT_TOKEN + output_tokens * SECONDS_PER_OUTPUT_TOKEN
+
+    def predict(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        """Expected latency in seconds; the prior alone until the model has enough history."""
+        ratio = self.tracker.percentile(model, settings.LLM_TIMEOUT_PERCENTILE) or 1.0
+        return self.prior(input_tokens, output_tokens) * ratio
+
+    def timeout_for(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        if not self.enabled:
+            return settings.LLM_TIMEOUT_SECONDS
+        timeout = settings.LLM_TIMEOUT_MULTIPLIER * self.predict(model, input_tokens, output_tokens)
+        return min(settings.LLM_TIMEOUT_MAX_SECONDS, max(settings.LLM_TIMEOUT_MIN_SECONDS, timeout))
+
+    async def run(self, model: str, input_tokens: int, output_tokens: int, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `call()` under the predicted timeout; raises asyncio.TimeoutError like asyncio.wait_for."""
+        timeout = self.timeout_for(model, input_tokens, output_tokens)
+        prior = self.prior(input_tokens, output_tokens)
+        self.counters["calls"] += 1
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(call(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            self.counters["max_seconds_recovered"] += max(0.0, settings.LLM_TIMEOUT_SECONDS - timeout)
+            self.tracker.record(model, timeout / prior)
+            logger.warning(f"event: adaptive_timeout, msg: Timed out for Identifier: model={model}, timeout={timeout:.1f}s, input_tokens={input_tokens}")
+            raise
+        elapsed = time.monotonic() - start
+        self.tracker.record(model, elapsed / prior)
+        if elapsed > settings.LLM_TIMEOUT_SECONDS:
+            # The fixed timeout would have failed this call; no time is saved, a result is.
+            self.counters["beyond_fixed_timeout"] += 1
+        return result
+
+
+_adaptive_timeout: Optional[AdaptiveTimeout] = None
+
+
+def get_adaptive_timeout() -> AdaptiveTimeout:
+    """The timeout model shared by every agent in this worker process."""
+    global _adaptive_timeout
+    if _adaptive_timeout is None:
+        _adaptive_timeout = AdaptiveTimeout()
+    return _adaptive_timeout
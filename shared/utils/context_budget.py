@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from typing import List
+from shared.exceptions.agent_exceptions import AgentPromptException
+from shared.utils.token_counter import count_tokens
+
+# Lines repeated at the start of each window so code around a window boundary is seen whole once.
+WINDOW_OVERLAP_LINES = 20
+BLOCK_SEPARATOR = "\n\n"
+
+
+@dataclass
+class ContextBlock:
+    kind: str       # "function" (the code under review) or "callee"
+    name: str       # "path:qualname"
+    header: str     # e.g. "# Function: ..." / "# Callee: path:qualname"
+    source: str
+
+    @property
+    def path(self) -> str:
+        return self.name.rpartition(":")[0]
+
+    @property
+    def text(self) -> str:
+        return f"{self.header}\n{self.source}"
+
+
+def join_blocks(blocks: List[ContextBlock]) -> str:
+    return BLOCK_SEPARATOR.join(block.text for block in blocks)
+
+
+def fit_context(blocks: List[ContextBlock], budget: int, overlap_lines: int = WINDOW_OVERLAP_LINES) -> List[str]:
+    """
+    Context strings for reviewing one function within `budget` tokens.
+
+    If everything fits, the single full context is returned. Otherwise callee blocks are dropped
+    lowest priority first (callees from other files before those in the function's own file, later
+    calls before earlier ones). If the function alone still does not fit, its source is split into
+    windows of whole lines that overlap by `overlap_lines`, each reviewed on its own; their results
+    are merged per file downstream. Raises AgentPromptException if not even one line fits.
+    """
+    if count_tokens(join_blocks(blocks)) <= budget:
+        return [join_blocks(blocks)]
+
+    targets = [b for b in blocks if b.kind != "callee"]
+    callees = [b for b in blocks if b.kind == "callee"]
+    own_path = targets[0].path if targets else ""
+    # Stable sort: own-file callees first, each group in call order.
+    callees.sort(key=lambda b: b.path != own_path)
+
+    used = count_tokens(join_blocks(targets))
+    if used <= budget:
+        kept = list(targets)
+        for callee in callees:
+            tokens = count_tokens(BLOCK_SEPARATOR + callee.text)
+            if used + tokens <= budget:
+                kept.append(callee)
+                used += tokens
+        return [join_blocks(kept)]
+
+    return [window for target in targets for window in _windows(target, budget, overlap_lines)]
+
+
+def _windows(block: ContextBlock, budget: int, overlap_lines: int) -> List[str]:
+    lines = block.source.splitlines(keepends=True)
+    line_tokens = [count_tokens(line) for line in lines]
+    # Headers name the line range; reserve room for the longest one.
+    header_tokens = count_tokens(f"{block.header} (lines {len(lines)}-{len(lines)} of {len(lines)})\n")
+    room = budget - header_tokens
+
+    windows = []
+    start = 0
+    while start < len(lines):
+        end, used = start, 0
+        while end < len(lines) and used + line_tokens[end] <= room:
+            used += line_tokens[end]
+            end += 1
+        if end == start:
+            raise AgentPromptException(f"Line {start + 1} of {block.name} does not fit in a {budget}-token prompt")
+        windows.append(f"{block.header} (lines {start + 1}-{end} of {len(lines)})\n" + "".join(lines[start:end]))
+        if end == len(lines):
+            break
+        # Step back for the overlap, but always advance by at least half a window.
+        start = max(end - overlap_lines, start + (end - start + 1) // 2)
+    return windows
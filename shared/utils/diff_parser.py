@@ -0,0 +1,201 @@
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Union
+
+DEV_NULL = "/dev/null"
+
+
+@dataclass
+class Hunk:
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    added: List[int] = field(default_factory=list)       # line numbers in the new file
+    removed: List[int] = field(default_factory=list)     # line numbers in the old file
+    # New-file line each removal sits after, so pure deletions still point at the code around them.
+    removal_anchors: List[int] = field(default_factory=list)
+
+
+@dataclass
+class FileDiff:
+    old_path: Optional[str]
+    new_path: Optional[str]
+    status: str = "modified"    # added | removed | modified | renamed | copied
+    is_binary: bool = False
+    hunks: List[Hunk] = field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        """Path the change should be reported against: the new path, or the old one for deletions."""
+        return self.new_path or self.old_path
+
+    @property
+    def added_lines(self) -> Set[int]:
+        return {n for h in self.hunks for n in h.added}
+
+    @property
+    def removed_lines(self) -> Set[int]:
+        return {n for h in self.hunks for n in h.removed}
+
+    @property
+    def modified_lines(self) -> Set[int]:
+        """New-file lines touched by the change: added lines plus the anchors of removed lines."""
+        return {n for h in self.hunks for n in (*h.added, *h.removal_anchors)}
+
+
+def _strip_prefix(path: str) -> Optional[str]:
+    path = path.rstrip("\t")
+    if path.startswith('"') and path.endswith('"'):
+        path = path[1:-1].encode("latin-1", "backslashreplace").decode("unicode_escape").encode("latin-1").decode("utf-8", "replace")
+    if path == DEV_NULL:
+        return None
+    if path[:2] in ("a/", "b/"):
+        return path[2:]
+    return path
+
+
+def _header_paths(rest: str) -> tuple:
+    """Split the `a/<old> b/<new>` part of a `diff --git` line; exact when both sides are equal."""
+    half = (len(rest) - 5) // 2
+    if half > 0 and rest[2:2 + half] == rest[5 + half:] and rest[2 + half:5 + half] == " b/":
+        return rest[2:2 + half], rest[5 + half:]
+    old, sep, new = rest.partition(" b/")
+    return _strip_prefix(old), (new if sep else _strip_prefix(rest))
+
+
+def diff_header_path(line: str) -> Optional[str]:
+    """Path a `diff --git a/<old> b/<new>` line refers to: the new path, or the old one if it has none."""
+    old_path, new_path = _header_paths(line[11:])
+    return new_path or old_path
+
+
+def _parse_hunk_header(line: str) -> Optional[Hunk]:
+    # "@@ -<old>[,<count>] +<new>[,<count>] @@[ section]"
+    parts = line.split(" ", 3)
+    if len(parts) < 3 or parts[1][:1] != "-" or parts[2][:1] != "+":
+        return None
+    try:
+        old_start, _, old_count = parts[1][1:].partition(",")
+        new_start, _, new_count = parts[2][1:].partition(",")
+        return Hunk(int(old_start), int(old_count or 1), int(new_start), int(new_count or 1))
+    except ValueError:
+        return None
+
+
+def iter_file_diffs(
+    lines: Iterable[str],
+    on_line: Optional[Callable[[FileDiff, Optional[Hunk], str], None]] = None,
+) -> Iterator[FileDiff]:
+    """
+    Single-pass parser over the lines of a git unified diff, yielding one FileDiff per file.
+
+    Hunk bodies are consumed by their line counts, so content lines that look like headers
+    (a removed "-- comment" shows up as "--- comment") are never misread. Renames, copies,
+    mode-only changes, binary files and "\\ No newline at end of file" markers are handled.
+    Lines may carry their trailing newline.
+
+    `on_line`, when given, is called with every line of a file section as it is read, exactly
+    as passed in, together with the FileDiff it belongs to and the Hunk whose body it is part of
+    (None for header lines), for callers that need the content the parser itself discards.
+    """
+    current: Optional[FileDiff] = None
+    hunk: Optional[Hunk] = None
+    old_left = new_left = 0
+    old_line = new_line = 0
+    lines = iter(lines)
+
+    for raw in lines:
+        line = raw[:-1] if raw.endswith("\n") else raw
+
+        if hunk is not None:
+            # Consume the hunk body in a tight inner loop; it ends when both line counts are used up.
+            added, removed, anchors = hunk.added, hunk.removed, hunk.removal_anchors
+            while True:
+                tag = line[:1]
+                if tag == "+":
+                    added.append(new_line)
+                    new_line += 1
+                    new_left -= 1
+                elif tag == "-":
+                    removed.append(old_line)
+                    # Deleted files have new_start 0, so clamp to line 1.
+                    anchors.append(max(new_line - 1, 1))
+                    old_line += 1
+                    old_left -= 1
+                elif tag == " " or not line:
+                    old_line += 1
+                    new_line += 1
+                    old_left -= 1
+                    new_left -= 1
+                elif tag != "\\":
+                    # Truncated hunk: treat the line as a header.
+                    break
+                if on_line is not None:
+                    on_line(current, hunk, raw)
+                if old_left <= 0 and new_left <= 0:
+                    line = None
+                    break
+                raw = next(lines, None)
+                if raw is None:
+                    line = None
+                    break
+                line = raw[:-1] if raw.endswith("\n") else raw
+            hunk = None
+            if line is None:
+                continue
+
+        if line.startswith("diff --git "):
+            if current is not None:
+                yield current
+            old_path, new_path = _header_paths(line[11:])
+            current = FileDiff(old_path=old_path, new_path=new_path)
+            hunk = None
+            if on_line is not None:
+                on_line(current, None, raw)
+            continue
+        if current is None:
+            continue
+        if on_line is not None:
+            on_line(current, None, raw)
+
+        if line.startswith("@@"):
+            hunk = _parse_hunk_header(line)
+            if hunk is not None:
+                current.hunks.append(hunk)
+                old_left, new_left = hunk.old_count, hunk.new_count
+                old_line, new_line = hunk.old_start, hunk.new_start
+        elif line.startswith("--- "):
+            path = _strip_prefix(line[4:])
+            current.old_path = path
+            if path is None:
+                current.status = "added"
+        elif line.startswith("+++ "):
+            path = _strip_prefix(line[4:])
+            current.new_path = path
+            if path is None:
+                current.status = "removed"
+        elif line.startswith("new file mode"):
+            current.status = "added"
+        elif line.startswith("deleted file mode"):
+            current.status = "removed"
+        elif line.startswith("rename from "):
+            current.old_path, current.status = line[12:], "renamed"
+        elif line.startswith("rename to "):
+            current.new_path, current.status = line[10:], "renamed"
+        elif line.startswith("copy from "):
+            current.old_path, current.status = line[10:], "copied"
+        elif line.startswith("copy to "):
+            current.new_path, current.status = line[8:], "copied"
+        elif line.startswith("Binary files ") or line == "GIT binary patch":
+            current.is_binary = True
+
+    if current is not None:
+        yield current
+
+
+def parse_unified_diff(diff: Union[str, Iterable[str]]) -> List[FileDiff]:
+    """Parse a unified diff given as text or as an iterable of lines."""
+    if isinstance(diff, str):
+        # str.splitlines() would also split on form feeds and other separators inside content.
+        diff = diff.split("\n")
+    return list(iter_file_diffs(diff))
@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional
+
+
+@dataclass
+class PackItem:
+    key: str        # id the batched response refers to the item by
+    tokens: int     # estimated prompt tokens of the item's rendered block
+    payload: Any = None
+
+
+@dataclass
+class Batch:
+    items: List[PackItem]
+    tokens: int = 0
+
+
+def pack_first_fit_decreasing(items: Iterable[PackItem], capacity: int, max_items: Optional[int] = None) -> List[Batch]:
+    """
+    Group items into as few batches as possible with at most `capacity` tokens and `max_items`
+    items each, using first-fit decreasing: largest items first, each into the first batch that
+    still has room. An item larger than `capacity` gets a batch of its own.
+
+    Batches come back in creation order (largest first); items keep their decreasing order.
+    """
+    batches: List[Batch] = []
+    for item in sorted(items, key=lambda i: i.tokens, reverse=True):
+        for batch in batches:
+            if batch.tokens + item.tokens <= capacity and (max_items is None or len(batch.items) < max_items):
+                batch.items.append(item)
+                batch.tokens += item.tokens
+                break
+        else:
+            batches.append(Batch(items=[item], tokens=item.tokens))
+    return batches
@@ -1,4 +1,5 @@
 import logging
+import httpx
 from requests import HTTPError
 
 from shared.exceptions.fetcher_exceptions import (
@@ -12,12 +13,15 @@ from shared.exceptions.fetcher_exceptions import (
 logger = logging.getLogger(__name__)
 
 
-def handle_http_error(e: HTTPError) -> None:
+def handle_http_error(e: HTTPError | httpx.HTTPStatusError) -> None:
     resp = e.response
     if resp is not None:
         status_code = resp.status_code
         if status_code == 401:
             raise TokenInvalidException(resp.text)
+        elif status_code == 403 and resp.headers.get("X-RateLimit-Remaining") == "0":
+            # GitHub reports an exhausted primary quota as 403, not 429.
+            raise RateLimitException(resp.text)
         elif status_code == 403:
             raise PermissionDeniedException(resp.text)
         elif status_code == 404:
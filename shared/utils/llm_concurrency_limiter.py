@@ -0,0 +1,164 @@
+import asyncio
+import random
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    """Whether a provider error is a 429 / rate-limit / quota signal."""
+    if getattr(e, "status_code", None) == 429:
+        return True
+    msg = str(e).lower()
+    return "rate limit" in msg or "429" in msg or "quota" in msg
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class AIMDLimiter:
+    """
+    Bounds in-flight LLM calls with an additive-increase / multiplicative-decrease window.
+
+    Each success grows the window by 1/limit (about one slot per window of completed calls); a
+    rate-limit or timeout halves it, at most once per window: calls started before the last
+    decrease do not shrink it again. Rate-limited calls are retried with jittered exponential
+    backoff, honouring Retry-After, outside of their slot.
+
+    asyncio primitives belong to one event loop and each Celery task runs its own `asyncio.run`,
+    so the waiting state is rebound when the limiter is used from a new loop; the learned limit
+    carries over between tasks of the worker process.
+    """
+
+    def __init__(
+        self,
+        initial: Optional[int] = None,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        decrease_factor: float = 0.5,
+    ):
+        self.min_limit = min_limit or settings.LLM_CONCURRENCY_MIN
+        self.max_limit = max_limit or settings.LLM_CONCURRENCY_MAX
+        self.limit = float(initial or settings.LLM_CONCURRENCY_INITIAL)
+        self.retries = retries if retries is not None else settings.LLM_RATE_LIMIT_RETRIES
+        self.backoff_base = backoff_base if backoff_base is not None else settings.LLM_RETRY_BASE_SECONDS
+        self.backoff_max = backoff_max if backoff_max is not None else settings.LLM_RETRY_MAX_SECONDS
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._epoch = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cond: Optional[asyncio.Condition] = None
+        self.counters = {"calls": 0, "rate_limited": 0, "timeouts": 0, "retries": 0, "decreases": 0, "max_in_flight": 0}
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "limit": round(self.limit, 2), "in_flight": self.in_flight}
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Slots held on a previous loop died with it.
+            self._loop, self._cond, self.in_flight = loop, asyncio.Condition(), 0
+        return self._cond
+
+    async def _acquire(self) -> int:
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            self.counters["max_in_flight"] = max(self.counters["max_in_flight"], self.in_flight)
+            return self._epoch
+
+    async def _release(self) -> None:
+        cond = self._condition()
+        async with cond:
+            self.in_flight -= 1
+            cond.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def on_congestion(self, epoch: int) -> None:
+        if epoch != self._epoch:
+            return
+        self._epoch += 1
+        self.counters["decreases"] += 1
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        logger.warning(f"event: llm_concurrency_limiter, msg: Congestion signal, window shrunk for Identifier: limit={self.limit:.2f}")
+
+    def _backoff(self, attempt: int, e: Exception) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = _retry_after(e)
+        return max(delay, min(retry_after, self.backoff_max)) if retry_after else delay
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold one slot for a single attempt, without retries: leaving normally grows the window, a
+        rate-limit error or timeout shrinks it. For calls that bring their own retry policy, e.g.
+        hedged duplicates.
+        """
+        epoch = await self._acquire()
+        self.counters["calls"] += 1
+        try:
+            yield
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            self.on_congestion(epoch)
+            raise
+        except Exception as e:
+            if is_rate_limit_error(e):
+                self.counters["rate_limited"] += 1
+                self.on_congestion(epoch)
+            raise
+        else:
+            self.on_success()
+        finally:
+            await self._release()
+
+    async def run(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `call` (a fresh awaitable per attempt) within a slot. Rate-limit errors are retried up to
+        `retries` times and then re-raised; timeouts shrink the window and are re-raised.
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self.slot():
+                    return await call()
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                # An exhausted quota does not recover within a review.
+                if not is_rate_limit_error(e) or attempt >= self.retries or "insufficient_quota" in str(e).lower():
+                    raise
+                error = e
+
+            delay = self._backoff(attempt, error)
+            attempt += 1
+            self.counters["retries"] += 1
+            logger.info(f"event: llm_concurrency_limiter, msg: Rate limited, retrying for Identifier: attempt={attempt}, delay={delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+_limiter: Optional[AIMDLimiter] = None
+
+
+def get_llm_limiter() -> AIMDLimiter:
+    """The limiter shared by every agent in this worker process."""
+    global _limiter
+    if _limiter is None:
+        _limiter = AIMDLimiter()
+    return _limiter
@@ -0,0 +1,116 @@
+import time
+import asyncio
+import logging
+from collections import defaultdict, deque
+from typing import Any, AsyncContextManager, Awaitable, Callable, Deque, Dict, Hashable, Optional
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies per key (e.g. (model, factor)) with percentile queries."""
+
+    def __init__(self, window: Optional[int] = None, min_samples: Optional[int] = None):
+        self.window = window or settings.LLM_LATENCY_WINDOW
+        self.min_samples = min_samples if min_samples is not None else settings.LLM_LATENCY_MIN_SAMPLES
+        self._samples: Dict[Hashable, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, key: Hashable, seconds: float) -> None:
+        self._samples[key].append(seconds)
+
+    def samples(self, key: Hashable) -> int:
+        return len(self._samples.get(key, ()))
+
+    def percentile(self, key: Hashable, p: float) -> Optional[float]:
+        """The `p`th percentile (0-100) of recent latencies for `key`; None until `min_samples` are recorded."""
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class RequestHedger:
+    """
+    Issues a duplicate of a slow idempotent call once it has run past the latency percentile for its
+    key; the first successful response wins and the other call is cancelled.
+
+    Duplicates are capped at `max_extra_ratio` of all calls, so hedging stays within a fixed cost
+    budget however slow the provider gets. Keys without enough history are never hedged. A `slot`
+    (e.g. AIMDLimiter.slot) makes the duplicate wait for concurrency of its own instead of riding
+    on the slot the caller holds for the primary.
+    """
+
+    def __init__(self, tracker: Optional[LatencyTracker] = None, percentile: Optional[float] = None, max_extra_ratio: Optional[float] = None):
+        self.tracker = tracker or LatencyTracker()
+        self.percentile = percentile or settings.LLM_HEDGE_PERCENTILE
+        self.max_extra_ratio = max_extra_ratio if max_extra_ratio is not None else settings.LLM_HEDGE_MAX_EXTRA_RATIO
+        self.counters = {"calls": 0, "hedged": 0, "hedge_wins": 0, "over_budget": 0}
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        calls = self.counters["calls"]
+        return {**self.counters, "extra_call_ratio": round(self.counters["hedged"] / calls, 4) if calls else 0.0}
+
+    def _within_budget(self) -> bool:
+        return self.counters["hedged"] + 1 <= self.max_extra_ratio * self.counters["calls"]
+
+    async def _timed(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.monotonic()
+        result = await call()
+        self.tracker.record(key, time.monotonic() - start)
+        return result
+
+    async def _hedge(self, key: Hashable, call: Callable[[], Awaitable[Any]], slot: Optional[Callable[[], AsyncContextManager[Any]]]) -> Any:
+        if slot is None:
+            return await self._timed(key, call)
+        # Timed inside the slot, so waiting for one does not count as provider latency.
+        async with slot():
+            return await self._timed(key, call)
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]], slot: Optional[Callable[[], AsyncContextManager[Any]]] = None) -> Any:
+        """Await `call()` (a fresh awaitable per invocation), hedging it if it outlives the key's percentile."""
+        self.counters["calls"] += 1
+        delay = self.tracker.percentile(key, self.percentile)
+        if delay is None:
+            return await self._timed(key, call)
+
+        primary = asyncio.ensure_future(self._timed(key, call))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            if not self._within_budget():
+                self.counters["over_budget"] += 1
+                return await primary
+
+            self.counters["hedged"] += 1
+            logger.info(f"event: request_hedger, msg: Hedging slow call for Identifier: key={key}, after={delay:.2f}s")
+            hedge = asyncio.ensure_future(self._hedge(key, call, slot))
+            pending.add(hedge)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.counters["hedge_wins"] += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+_hedger: Optional[RequestHedger] = None
+
+
+def get_request_hedger() -> RequestHedger:
+    """The hedger shared by every agent in this worker process, so latency history outlives a task."""
+    global _hedger
+    if _hedger is None:
+        _hedger = RequestHedger()
+    return _hedger
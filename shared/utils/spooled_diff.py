@@ -0,0 +1,103 @@
+import os
+import tempfile
+from typing import Iterable, Iterator, Optional, Union
+from shared.config import settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+class SpooledDiff:
+    """
+    Unified diff held in a SpooledTemporaryFile: in memory up to DIFF_SPOOL_MAX_MEMORY bytes,
+    on disk under CACHE_DIR beyond that.
+
+    The diff is written once from a stream (HTTP response, git stdout) and then read by each
+    consumer independently, line by line for parsing or as bounded text for prompts, so no
+    consumer ever needs the whole diff as a single string.
+    """
+
+    def __init__(self, max_memory: Optional[int] = None):
+        os.makedirs(settings.CACHE_DIR, exist_ok=True)
+        self._file = tempfile.SpooledTemporaryFile(
+            max_size=max_memory if max_memory is not None else settings.DIFF_SPOOL_MAX_MEMORY,
+            mode="w+b",
+            dir=settings.CACHE_DIR,
+        )
+        self.size = 0
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[bytes], max_memory: Optional[int] = None) -> "SpooledDiff":
+        diff = cls(max_memory)
+        for chunk in chunks:
+            diff.write(chunk)
+        return diff
+
+    def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self._file.seek(self.size)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def iter_bytes(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        # Track the position per iterator so several readers can interleave on the same file.
+        pos = 0
+        while pos < self.size:
+            self._file.seek(pos)
+            chunk = self._file.read(min(chunk_size, self.size - pos))
+            if not chunk:
+                return
+            pos += len(chunk)
+            yield chunk
+
+    def iter_lines(self) -> Iterator[str]:
+        """Decoded lines including their trailing newline, split on b"\\n" only."""
+        pending = b""
+        for chunk in self.iter_bytes():
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line.decode("utf-8", errors="replace") + "\n"
+        if pending:
+            yield pending.decode("utf-8", errors="replace")
+
+    def read_text(self, limit: Optional[int] = None) -> str:
+        """The diff as text; with `limit`, at most that many bytes cut at a line boundary plus a truncation note."""
+        if limit is None or self.size <= limit:
+            return b"".join(self.iter_bytes()).decode("utf-8", errors="replace")
+        self._file.seek(0)
+        head = self._file.read(limit)
+        cut = head.rfind(b"\n")
+        head = head[:cut + 1] if cut >= 0 else head
+        return head.decode("utf-8", errors="replace") + f"\n... [diff truncated: {len(head)} of {self.size} bytes shown]\n"
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_lines()
+
+    def __str__(self) -> str:
+        return self.read_text()
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def bounded_diff_text(diff: Union[str, SpooledDiff], limit: Optional[int] = None) -> str:
+    """Prompt-ready diff text of at most `limit` (default DIFF_PROMPT_MAX_CHARS) characters/bytes."""
+    limit = limit if limit is not None else settings.DIFF_PROMPT_MAX_CHARS
+    if isinstance(diff, SpooledDiff):
+        return diff.read_text(limit)
+    if len(diff) <= limit:
+        return diff
+    cut = diff.rfind("\n", 0, limit)
+    head = diff[:cut + 1] if cut >= 0 else diff[:limit]
+    return head + f"\n... [diff truncated: {len(head)} of {len(diff)} characters shown]\n"
+
+
+def iter_diff_lines(diff: Union[str, SpooledDiff]) -> Iterable[str]:
+    """Lines of a diff for the streaming parser, whichever form it is held in."""
+    if isinstance(diff, SpooledDiff):
+        return diff.iter_lines()
+    return diff.split("\n")
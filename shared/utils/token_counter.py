@@ -0,0 +1,59 @@
+import math
+import logging
+import os
+from shared.config import settings
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken ships with langchain-openai
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Average characters per token for source code and English prose with OpenAI tokenizers; used
+# when the tokenizer is unavailable.
+CHARS_PER_TOKEN = 4
+# Budget checks only tokenize this many characters per allowed token before deciding.
+MAX_CHARS_PER_TOKEN = 16
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    """The tokenizer baked into TIKTOKEN_CACHE_DIR, loaded once. None (and the estimate is used) if it is not there."""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            if tiktoken is None:
+                raise ImportError("tiktoken is not installed")
+            # tiktoken downloads encodings missing from its cache, so only load from a populated cache.
+            cache_dir = settings.TIKTOKEN_CACHE_DIR
+            if not os.path.isdir(cache_dir) or not os.listdir(cache_dir):
+                raise FileNotFoundError(f"no tokenizer files in TIKTOKEN_CACHE_DIR={cache_dir}")
+            os.environ["TIKTOKEN_CACHE_DIR"] = cache_dir
+            _encoding = tiktoken.get_encoding(settings.TOKENIZER_ENCODING)
+        except Exception as e:
+            _encoding_failed = True
+            logger.warning(f"event: _get_encoding, msg: Tokenizer unavailable, estimating tokens for Identifier: encoding={settings.TOKENIZER_ENCODING}, error={e}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Number of prompt tokens in `text`: exact with the local tokenizer, otherwise estimated."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def fits_token_budget(text: str, limit: int) -> bool:
+    """Whether `text` is at most `limit` tokens, without tokenizing more than needed to decide."""
+    # Every token covers at least one character.
+    if len(text) <= limit:
+        return True
+    head = text[:limit * MAX_CHARS_PER_TOKEN]
+    if count_tokens(head) > limit:
+        return False
+    return len(head) == len(text) or count_tokens(text) <= limit
+
@@ -0,0 +1,10 @@
+import pytest
+from shared.config import settings
+
+
+@pytest.fixture(autouse=True)
+def offline_llm_and_cache(monkeypatch, tmp_path):
+    # Agents and chain executors build a real ChatOpenAI client (no request is sent, but the client
+    # insists on a key) and default call-graph, review and diff caches under CACHE_DIR.
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path / "cache"))
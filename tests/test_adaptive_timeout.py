@@ -0,0 +1,109 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from review_agents.simple_llm_review_agent import SimpleLLMPrReviewAgent
+from shared.models.enums import ErrorCode
+from shared.cache.llm_review_cache import LLMReviewCache
+from shared.utils.adaptive_timeout import AdaptiveTimeout
+from shared.utils.llm_concurrency_limiter import AIMDLimiter
+from shared.utils.request_hedging import LatencyTracker
+
+
+def make_timeouts():
+    return AdaptiveTimeout(LatencyTracker(window=50, min_samples=5), enabled=True)
+
+
+def test_timeout_scales_with_tokens_and_is_clamped():
+    """DOD: Tests that the timeout grows with the prompt and completion estimates within the configured bounds."""
+    timeouts = make_timeouts()
+    small = timeouts.timeout_for("gpt-4o", 500, 150)
+    large = timeouts.timeout_for("gpt-4o", 100_000, 1000)
+
+    assert small == 20.0
+    assert 20.0 < large < 180.0
+    assert timeouts.timeout_for("gpt-4o", 10_000_000, 1000) == 600.0
+    assert AdaptiveTimeout(enabled=False).timeout_for("gpt-4o", 500, 150) == 180.0
+
+
+def test_latency_history_scales_prediction_per_model():
+    """DOD: Tests that recorded latencies scale the prediction for their model only once enough samples exist."""
+    timeouts = make_timeouts()
+    prior = timeouts.prior(2000, 300)
+    for _ in range(4):
+        timeouts.tracker.record("slow-model", 2.0)
+    assert timeouts.predict("slow-model", 2000, 300) == pytest.approx(prior)
+    timeouts.tracker.record("slow-model", 2.0)
+
+    assert timeouts.predict("slow-model", 2000, 300) == pytest.approx(2 * prior)
+    assert timeouts.predict("gpt-4o", 2000, 300) == pytest.approx(prior)
+
+
+def test_success_past_fixed_timeout_is_counted_but_recovers_no_time():
+    """DOD: Tests that a call finishing after the fixed timeout is counted without adding recovered seconds."""
+    timeouts = make_timeouts()
+
+    async def call():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    with patch("shared.utils.adaptive_timeout.settings.LLM_TIMEOUT_SECONDS", 0.01):
+        assert asyncio.run(timeouts.run("gpt-4o", 100, 10, call)) == "ok"
+
+    assert timeouts.counters["beyond_fixed_timeout"] == 1
+    assert timeouts.stats["max_seconds_recovered"] == 0.0
+
+
+def test_hung_call_times_out_early_and_reports_recovered_time():
+    """DOD: Tests that a hanging call is abandoned at the predicted timeout and the time saved against the fixed timeout is counted."""
+    timeouts = make_timeouts()
+
+    async def call():
+        await asyncio.sleep(10)
+
+    with patch("shared.utils.adaptive_timeout.settings.LLM_TIMEOUT_MIN_SECONDS", 0.05), \
+         patch("shared.utils.adaptive_timeout.settings.LLM_TIMEOUT_MULTIPLIER", 0.01):
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(timeouts.run("gpt-4o", 100, 10, call))
+
+    assert timeouts.counters["timeouts"] == 1
+    assert timeouts.stats["max_seconds_recovered"] == pytest.approx(180 - 0.05, abs=0.1)
+    assert timeouts.tracker.samples("gpt-4o") == 1
+
+
+def test_simple_agent_times_out_from_prediction():
+    """DOD: Tests that the simple agent reports AGENT_TIMEOUT at the predicted timeout rather than the fixed 180 seconds."""
+    agent = SimpleLLMPrReviewAgent()
+    agent.limiter = AIMDLimiter(retries=0)
+    agent.timeouts = make_timeouts()
+    agent.executor = MagicMock()
+    agent.executor.review_cache = None
+
+    async def hang(factor, inputs, invoke):
+        return await invoke(lambda: asyncio.sleep(10))
+
+    agent.executor.run_chain = hang
+    with patch("shared.utils.adaptive_timeout.settings.LLM_TIMEOUT_MIN_SECONDS", 0.05), \
+         patch("shared.utils.adaptive_timeout.settings.LLM_TIMEOUT_MULTIPLIER", 0.01):
+        result = asyncio.run(agent.review("+ x = 1\n", [], ["bugs"]))
+
+    assert [e.error_code for e in result.errors] == [ErrorCode.AGENT_TIMEOUT]
+    assert agent.timeouts.counters["timeouts"] == 1
+
+
+def test_simple_agent_cache_hits_skip_timeout_and_latency_history(tmp_path):
+    """DOD: Tests that a cached review is not timed, so it neither counts as a call nor shrinks later timeouts."""
+    agent = SimpleLLMPrReviewAgent()
+    agent.limiter = AIMDLimiter(retries=0)
+    agent.timeouts = make_timeouts()
+    agent.executor.review_cache = LLMReviewCache(root=str(tmp_path))
+    chain = MagicMock()
+    chain.ainvoke = AsyncMock(return_value={"files": []})
+
+    with patch.object(agent.executor, "build_chain", return_value=chain):
+        asyncio.run(agent.review("+ x = 1\n", [], ["bugs"]))
+        asyncio.run(agent.review("+ x = 1\n", [], ["bugs"]))
+
+    assert chain.ainvoke.await_count == 1
+    assert agent.timeouts.counters["calls"] == 1
+    assert agent.timeouts.tracker.samples(agent.executor.llm.model_name) == 1
+    assert agent.limiter.counters["calls"] == 1
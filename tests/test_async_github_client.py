@@ -0,0 +1,77 @@
+import asyncio
+import httpx
+import pytest
+from shared.integrations.clients.async_github_client import AsyncGitHubClient
+from shared.exceptions.fetcher_exceptions import RateLimitException, TokenInvalidException
+
+
+def make_client(handler, max_concurrency=2):
+    client = AsyncGitHubClient(max_concurrency=max_concurrency)
+    client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_get_blobs_bounds_concurrency():
+    """DOD: Tests that get_blobs fans out concurrently but never exceeds max_concurrency in-flight requests."""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, content=request.url.path.rsplit("/", 1)[-1].encode())
+
+    async def run():
+        async with make_client(handler, max_concurrency=3) as client:
+            return await client.get_blobs("user", "repo", [f"sha{i}" for i in range(10)], "token")
+
+    blobs = asyncio.run(run())
+    assert blobs == {f"sha{i}": f"sha{i}".encode() for i in range(10)}
+    assert peak == 3
+
+
+def test_get_pr_diff_sends_diff_accept_header():
+    """DOD: Tests that get_pr_diff requests the diff media type with the token header."""
+    def handler(request):
+        assert request.headers["Accept"] == "application/vnd.github.v3.diff"
+        assert request.headers["Authorization"] == "token token"
+        return httpx.Response(200, text="diff --git a/x b/x\n")
+
+    async def run():
+        async with make_client(handler) as client:
+            return await client.get_pr_diff("user", "repo", 1, "token")
+
+    assert str(asyncio.run(run())) == "diff --git a/x b/x\n"
+
+
+@pytest.mark.parametrize("status_code, exc", [(401, TokenInvalidException), (429, RateLimitException)])
+def test_http_errors_keep_exception_mapping(status_code, exc):
+    """DOD: Tests that async HTTP errors are mapped through handle_http_error like the sync client."""
+    async def run():
+        async with make_client(lambda request: httpx.Response(status_code, text="error")) as client:
+            await client.get_pr_files("user", "repo", 1, "token")
+
+    with pytest.raises(exc):
+        asyncio.run(run())
+
+
+def test_get_blobs_raises_rate_limit_instead_of_returning_partial_repo():
+    """DOD: Tests that quota errors from blob downloads are raised while ordinary per-blob failures are skipped."""
+    def handler(request):
+        sha = request.url.path.rsplit("/", 1)[-1]
+        if sha == "gone":
+            return httpx.Response(404, text="Not Found")
+        if sha == "limited":
+            return httpx.Response(429, text="rate limit")
+        return httpx.Response(200, content=sha.encode())
+
+    async def run(shas):
+        async with make_client(handler) as client:
+            return await client.get_blobs("user", "repo", shas, "token")
+
+    assert asyncio.run(run(["ok", "gone"])) == {"ok": b"ok"}
+    with pytest.raises(RateLimitException):
+        asyncio.run(run(["ok", "limited"]))
@@ -0,0 +1,97 @@
+import os
+import time
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from shared.cache.blob_store import BlobStore, git_blob_sha
+from shared.cache.disk_lru_store import DiskLRUStore
+from shared.integrations.github_fetcher import GitHubPRFetcher
+
+
+def test_git_blob_sha_matches_git():
+    """DOD: Tests that git_blob_sha produces the same object id as `git hash-object`."""
+    assert git_blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_disk_lru_store_evicts_least_recently_used(tmp_path):
+    """DOD: Tests that the store evicts the least recently read entries once max_bytes is exceeded."""
+    store = DiskLRUStore(str(tmp_path), max_bytes=250)
+    store.put("aa01", b"x" * 100)
+    store.put("aa02", b"y" * 100)
+    old = time.time() - 100
+    os.utime(store._path("aa02"), (old, old))
+    os.utime(store._path("aa01"), (old - 50, old - 50))
+    assert store.get("aa01") == b"x" * 100  # refreshes recency of aa01
+    store.put("aa03", b"z" * 100)
+    assert "aa01" in store
+    assert "aa02" not in store
+    assert "aa03" in store
+
+
+def test_disk_lru_store_total_survives_overwrites_and_new_instances(tmp_path):
+    """DOD: Tests that overwriting an entry does not double count its size and that later instances reuse the scanned total."""
+    store = DiskLRUStore(str(tmp_path), max_bytes=1000)
+    store.put("aa01", b"x" * 100)
+    store.put("aa01", b"y" * 60)
+    assert store.stats["total_bytes"] == 60
+
+    with patch.object(DiskLRUStore, "_scan") as scan:
+        again = DiskLRUStore(str(tmp_path), max_bytes=1000)
+    scan.assert_not_called()
+    assert again.stats["total_bytes"] == 60
+
+
+def test_blob_store_rejects_mismatched_content(tmp_path):
+    """DOD: Tests that BlobStore refuses content whose hash does not match the key."""
+    store = BlobStore(root=str(tmp_path), max_bytes=1024)
+    with pytest.raises(ValueError):
+        store.put(git_blob_sha(b"a"), b"b")
+
+
+def test_fetch_entire_code_downloads_only_changed_blobs(tmp_path):
+    """DOD: Tests that a second fetch of the same PR downloads only blobs whose content changed."""
+    fetcher = GitHubPRFetcher(blob_store=BlobStore(root=str(tmp_path), max_bytes=1024 * 1024))
+    contents = {"a.py": b"def a():\n    pass\n", "b.py": b"def b():\n    pass\n"}
+    blobs_by_sha = {}
+
+    def make_tree():
+        blobs_by_sha.update({git_blob_sha(data): data for data in contents.values()})
+        return {"tree": [{"path": p, "type": "blob", "mode": "100644", "sha": git_blob_sha(d)} for p, d in contents.items()]}
+
+    fetcher.client = MagicMock()
+    fetcher.client.get_pr.return_value = {"head": {"sha": "head"}, "base": {"sha": "base"}}
+    fetcher.client.get_tree.side_effect = lambda *args: make_tree()
+    fetcher.client.get_blob.side_effect = lambda owner, repo, sha, token: blobs_by_sha[sha]
+
+    first = fetcher.fetch_entire_code_for_branch("https://github.com/user/repo", 1, "token")
+    assert first == {p: d.decode() for p, d in contents.items()}
+    assert fetcher.client.get_blob.call_count == 2
+
+    contents["b.py"] = b"def b():\n    return 1\n"
+    fetcher.client.get_blob.reset_mock()
+    second = fetcher.fetch_entire_code_for_branch("https://github.com/user/repo", 1, "token")
+    assert second["b.py"] == "def b():\n    return 1\n"
+    assert fetcher.client.get_blob.call_count == 1
+    assert fetcher.blob_store.hits == 1
+
+
+def test_afetch_entire_code_uses_pinned_snapshot_and_blob_store(tmp_path):
+    """DOD: Tests that the async full fetch resolves the head through the snapshot and downloads only blobs missing from the store."""
+    fetcher = GitHubPRFetcher(blob_store=BlobStore(root=str(tmp_path), max_bytes=1024 * 1024))
+    contents = {"a.py": b"A = 1\n", "b.py": b"B = 2\n"}
+    fetcher.blob_store.put(git_blob_sha(contents["a.py"]), contents["a.py"])
+    fetcher.client = MagicMock()
+    fetcher.client.get_pr.return_value = {"head": {"sha": "head"}, "base": {"sha": "base"}}
+    fetcher.client.get_tree.return_value = {"tree": [{"path": p, "type": "blob", "mode": "100644", "sha": git_blob_sha(d)} for p, d in contents.items()]}
+    fetcher.fetch_pr_snapshot = MagicMock(wraps=fetcher.fetch_pr_snapshot)
+
+    with patch("shared.integrations.github_fetcher.AsyncGitHubClient") as client_cls:
+        client = client_cls.return_value.__aenter__.return_value
+        client.get_blobs = AsyncMock(return_value={git_blob_sha(contents["b.py"]): contents["b.py"]})
+        file_map = asyncio.run(fetcher.afetch_entire_code_for_branch("https://github.com/user/repo", 1, "token"))
+
+    assert file_map == {"a.py": "A = 1\n", "b.py": "B = 2\n"}
+    fetcher.fetch_pr_snapshot.assert_called_once_with("https://github.com/user/repo", 1, "token")
+    fetcher.client.get_tree.assert_called_once_with("user", "repo", "head", "token")
+    assert list(client.get_blobs.await_args.args[2]) == [git_blob_sha(contents["b.py"])]
+    assert fetcher.blob_store.get(git_blob_sha(contents["b.py"])) == contents["b.py"]
@@ -0,0 +1,69 @@
+import json
+import billiard
+from unittest.mock import MagicMock, patch
+from shared.config import settings
+from shared.cache.call_graph_store import CallGraphStore
+from shared.integrations.lazy_file_map import LazyFileMap
+from shared.services.code_language_service import LanguageService
+
+
+def make_map(contents):
+    loader = MagicMock(side_effect=lambda path, sha: contents[path].encode())
+    return LazyFileMap({path: f"sha-{hash(content)}" for path, content in contents.items()}, loader), loader
+
+
+def test_call_graph_reuses_persisted_fragments_without_downloading(tmp_path):
+    """DOD: Tests that a second task over unchanged files builds the call graph from stored fragments only."""
+    contents = {"a.py": "def a():\n    return b()\n", "b.py": "def b():\n    return 1\n", "README.md": "# x\n"}
+    first_map, first_loader = make_map(contents)
+    graph = LanguageService(CallGraphStore(root=str(tmp_path))).get_call_graph(first_map)
+    assert graph == {"a.py:a": ["b"], "b.py:b": []}
+    assert first_loader.call_count == 2
+
+    second_map, second_loader = make_map(contents)
+    service = LanguageService(CallGraphStore(root=str(tmp_path)))
+    assert service.get_call_graph(second_map) == graph
+    assert second_loader.call_count == 0
+
+
+def test_call_graph_reparses_only_changed_files(tmp_path):
+    """DOD: Tests that only files whose content hash changed are parsed again, also for plain dict file maps."""
+    store = CallGraphStore(root=str(tmp_path))
+    LanguageService(store).get_call_graph({"a.py": "def a():\n    return b()\n", "b.py": "def b():\n    pass\n"})
+
+    service = LanguageService(store)
+    handler = service.get_handler(language="py")
+    handler.call_graph_fragment = MagicMock(wraps=handler.call_graph_fragment)
+    graph = service.get_call_graph({"a.py": "def a():\n    return c()\n", "b.py": "def b():\n    pass\n"})
+    assert graph == {"a.py:a": ["c"], "b.py:b": []}
+    handler.call_graph_fragment.assert_called_once()
+
+
+def test_call_graph_parses_misses_in_process_pool(tmp_path):
+    """DOD: Tests that the process-pool parse yields the same call graph as parsing in-process."""
+    file_map = {f"m{i}.py": f"def f{i}():\n    return g{i}()\n" for i in range(70)}
+    serial = LanguageService(CallGraphStore(root=str(tmp_path / "serial"))).get_call_graph(file_map)
+    with patch.object(settings, "CALL_GRAPH_PARSE_PROCESSES", 2):
+        parallel = LanguageService(CallGraphStore(root=str(tmp_path / "parallel"))).get_call_graph(file_map)
+    assert parallel == serial
+    assert parallel["m69.py:f69"] == ["g69"]
+
+
+def _build_graph_in_daemon(root, out):
+    with patch.object(settings, "CALL_GRAPH_PARSE_PROCESSES", 2):
+        graph = LanguageService(CallGraphStore(root=root)).get_call_graph({f"m{i}.py": f"def f{i}():\n    return g{i}()\n" for i in range(70)})
+    with open(out, "w") as f:
+        json.dump(graph, f)
+
+
+def test_call_graph_process_pool_runs_inside_daemon_workers(tmp_path):
+    """DOD: Tests that a daemonic (Celery prefork) process can still parse misses in the process pool."""
+    out = str(tmp_path / "graph.json")
+    worker = billiard.Process(target=_build_graph_in_daemon, args=(str(tmp_path / "store"), out), daemon=True)
+    worker.start()
+    worker.join(60)
+    assert worker.exitcode == 0
+    with open(out) as f:
+        graph = json.load(f)
+    assert len(graph) == 70
+    assert graph["m69.py:f69"] == ["g69"]
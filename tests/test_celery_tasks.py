@@ -1,9 +1,10 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from celery_worker.tasks import analyze_pr_task
 from shared.models.enums import TaskStatus, PlatformType, ErrorCode
 from shared.models.payloads import AnalyzePRTaskPayload, ErrorResult
 from shared.exceptions.fetcher_exceptions import FetcherException, PermissionDeniedException
+from shared.services.file_filter import FileFilter
 
 def make_request_data():
     return {
@@ -18,14 +19,19 @@ def make_request_data():
 def test_analyze_pr_task_success():
     """DOD: Tests that analyze_pr_task stores COMPLETED status and results when fetcher returns successfully."""
     request_data = make_request_data()
+    snapshot = MagicMock(file_map={}, file_filter=FileFilter(), head_sha="abc", request_count=3)
     with patch("celery_worker.tasks.TaskDAO.get_by_id", return_value=MagicMock(**request_data)), \
          patch("celery_worker.tasks.TaskDAO.update_status"), \
          patch("celery_worker.tasks.PlatformFetcherFactory.get_fetcher") as mock_factory, \
+         patch("review_agents.complicated_llm_review_agent.ComplicatedLLMChainExecutor.summarize", return_value="summary"), \
          patch("celery_worker.tasks.TaskDAO.store_results_and_update_status") as mock_store:
         mock_fetcher = MagicMock()
-        mock_fetcher.fetch_pr_data.return_value = {"files": [], "diff": ""}
+        mock_fetcher.afetch_pr_data = AsyncMock(return_value={"files": [], "diff": "", "snapshot": snapshot})
         mock_factory.return_value = mock_fetcher
         analyze_pr_task(request_data)
+        # The review reads files from the pinned snapshot instead of fetching the branch again.
+        mock_fetcher.afetch_lazy_code_for_branch.assert_not_called()
+        mock_fetcher.afetch_entire_code_for_branch.assert_not_called()
         call_args = mock_store.call_args
         if call_args.args:
             assert call_args.args[2] == TaskStatus.COMPLETED
@@ -40,7 +46,7 @@ def test_analyze_pr_task_fetcher_exception():
          patch("celery_worker.tasks.PlatformFetcherFactory.get_fetcher") as mock_factory, \
          patch("celery_worker.tasks.TaskDAO.store_results_and_update_status") as mock_store:
         mock_fetcher = MagicMock()
-        mock_fetcher.fetch_pr_data.side_effect = PermissionDeniedException("No access")
+        mock_fetcher.afetch_pr_data = AsyncMock(side_effect=PermissionDeniedException("No access"))
         mock_factory.return_value = mock_fetcher
         analyze_pr_task(request_data)
         call_args = mock_store.call_args
@@ -61,7 +67,7 @@ def test_analyze_pr_task_generic_exception():
          patch("celery_worker.tasks.PlatformFetcherFactory.get_fetcher") as mock_factory, \
          patch("celery_worker.tasks.TaskDAO.store_results_and_update_status") as mock_store:
         mock_fetcher = MagicMock()
-        mock_fetcher.fetch_pr_data.side_effect = Exception("Some error")
+        mock_fetcher.afetch_pr_data = AsyncMock(side_effect=Exception("Some error"))
         mock_factory.return_value = mock_fetcher
         analyze_pr_task(request_data)
         call_args = mock_store.call_args
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from review_agents.chains.complicated_llm_chain import ComplicatedLLMChainExecutor, MAX_PROMPT_TOKENS
+from review_agents.complicated_llm_review_agent import ComplicatedLLMPrReviewAgent
+from shared.exceptions.agent_exceptions import AgentPromptException
+from shared.models.enums import ErrorCode
+from shared.utils import token_counter
+from shared.utils.context_budget import ContextBlock, fit_context, join_blocks
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens():
+    # The character estimate keeps token counts deterministic whether or not an encoding is cached locally.
+    with patch.object(token_counter, "_encoding", None), patch.object(token_counter, "_encoding_failed", True):
+        yield
+
+
+def block(kind, name, lines):
+    return ContextBlock(kind, name, f"# {kind}: {name}", "".join(f"    line_{i:04d} = compute_value({i})\n" for i in range(lines)))
+
+
+def test_fit_context_drops_other_file_callees_before_own_file_callees():
+    """DOD: Tests that callee context is trimmed lowest priority first, keeping the function and same-file callees."""
+    target = block("function", "pkg/a.py:f", 10)
+    own = block("callee", "pkg/a.py:helper", 10)
+    other = block("callee", "pkg/b.py:util", 10)
+    full = join_blocks([target, other, own])
+
+    assert fit_context([target, other, own], token_counter.count_tokens(full)) == [full]
+    budget = token_counter.count_tokens(join_blocks([target, own])) + 5
+    assert fit_context([target, other, own], budget) == [join_blocks([target, own])]
+
+
+def test_fit_context_splits_oversize_function_into_overlapping_windows():
+    """DOD: Tests that a function too large for the budget is reviewed in line windows that fit and overlap."""
+    target = block("function", "pkg/a.py:big", 200)
+    windows = fit_context([target, block("callee", "pkg/a.py:helper", 5)], budget=600, overlap_lines=10)
+
+    assert len(windows) > 1
+    assert all(token_counter.count_tokens(w) <= 600 for w in windows)
+    assert windows[0].startswith("# function: pkg/a.py:big (lines 1-")
+    first_lines, second_lines = (set(w.splitlines()[1:]) for w in windows[:2])
+    assert len(first_lines & second_lines) == 10
+    covered = set().union(*(w.splitlines()[1:] for w in windows))
+    assert covered == set(target.source.splitlines())
+
+
+def test_fit_context_rejects_line_larger_than_budget():
+    """DOD: Tests that a budget smaller than a single source line raises a prompt error."""
+    with pytest.raises(AgentPromptException):
+        fit_context([block("function", "pkg/a.py:f", 3)], budget=12)
+
+
+def test_executor_rejects_oversize_prompt_without_calling_llm():
+    """DOD: Tests that a rendered prompt over MAX_PROMPT_TOKENS is rejected locally before the chain is invoked."""
+    executor = ComplicatedLLMChainExecutor(review_cache=MagicMock())
+    chain = MagicMock()
+    chain.ainvoke = AsyncMock()
+    inputs = {"function": {}, "context": "x = 1\n" * MAX_PROMPT_TOKENS, "diff_summary": ""}
+
+    with pytest.raises(AgentPromptException):
+        asyncio.run(executor._ainvoke_cached(chain, executor.prompts["bugs"], "bugs", inputs, {}))
+    chain.ainvoke.assert_not_awaited()
+    executor.review_cache.get_or_compute.assert_not_called()
+
+
+def test_review_reports_prompt_error_for_function_that_cannot_fit():
+    """DOD: Tests that a function whose context cannot fit the budget yields a prompt error while others are still reviewed."""
+    agent = ComplicatedLLMPrReviewAgent()
+    agent.executor = MagicMock()
+    agent.executor.summarize.return_value = "summary"
+    agent.executor.review_cache = None
+    agent.executor.prompt_overhead.side_effect = lambda factors, fn, summary: MAX_PROMPT_TOKENS - 12 if fn["function_name"] == "f" else 100
+    agent.executor.run_chain = AsyncMock(return_value={"files": [{"name": "b.py", "issues": []}]})
+    agent.language_service = MagicMock()
+    agent.language_service.extract_functions_from_diff.return_value = [
+        {"filename": "a.py", "function_name": "f"}, {"filename": "b.py", "function_name": "g"}
+    ]
+    agent.language_service.get_call_graph.return_value = {}
+    agent.language_service.fetch_function_context_blocks.side_effect = lambda fn, fm, cg: [block("function", f"{fn['filename']}:{fn['function_name']}", 3)]
+
+    result = asyncio.run(agent.review("diff", [], {}, ["bugs"]))
+
+    assert [e.error_code for e in result.errors] == [ErrorCode.AGENT_PROMPT_ERROR]
+    assert agent.executor.run_chain.await_count == 1
+
+
+def test_token_count_falls_back_to_estimate_without_tokenizer():
+    """DOD: Tests that token counting and budget checks work from the character estimate when no encoding is available."""
+    assert token_counter.count_tokens("a" * 41) == 11
+    assert token_counter.fits_token_budget("a" * 40, 10)
+    assert not token_counter.fits_token_budget("a" * 41, 10)
+
+
+def test_tokenizer_is_only_loaded_from_a_populated_cache_dir(tmp_path, monkeypatch):
+    """DOD: Tests that an empty TIKTOKEN_CACHE_DIR falls back to the estimate without asking tiktoken, which would download."""
+    monkeypatch.setattr(token_counter.settings, "TIKTOKEN_CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("TIKTOKEN_CACHE_DIR", raising=False)
+    with patch.object(token_counter, "_encoding_failed", False), \
+         patch.object(token_counter, "tiktoken") as mock_tiktoken:
+        assert token_counter.count_tokens("a" * 41) == 11
+        mock_tiktoken.get_encoding.assert_not_called()
+
+    (tmp_path / "cached-encoding").write_bytes(b"")
+    with patch.object(token_counter, "_encoding_failed", False), \
+         patch.object(token_counter, "tiktoken") as mock_tiktoken:
+        mock_tiktoken.get_encoding.return_value.encode.return_value = [1, 2, 3]
+        assert token_counter.count_tokens("a" * 41) == 3
+        assert token_counter.os.environ["TIKTOKEN_CACHE_DIR"] == str(tmp_path)
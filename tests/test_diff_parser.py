@@ -0,0 +1,77 @@
+from shared.utils.diff_parser import parse_unified_diff
+from shared.services.code_language_service import LanguageService
+
+DIFF = """diff --git a/app/main.py b/app/main.py
+index 1111111..2222222 100644
+--- a/app/main.py
++++ b/app/main.py
+@@ -1,5 +1,5 @@
+ def main():
+-    return 1
++    return helper()
+ 
+ def other():
+--- removed sql-style comment
+@@ -10,3 +10,2 @@ def tail():
+ x = 1
+-y = 2
+ z = 3
+\\ No newline at end of file
+diff --git a/old name.py b/new name.py
+similarity index 90%
+rename from old name.py
+rename to new name.py
+diff --git a/logo.png b/logo.png
+new file mode 100644
+index 0000000..3333333
+Binary files /dev/null and b/logo.png differ
+diff --git a/gone.py b/gone.py
+deleted file mode 100644
+--- a/gone.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-X = 1
+-Y = 2
+"""
+
+
+def test_parse_unified_diff_tracks_lines_per_hunk():
+    """DOD: Tests that added and removed line numbers are tracked per hunk, including header-looking content lines."""
+    main, renamed, binary, deleted = parse_unified_diff(DIFF)
+
+    assert main.path == "app/main.py"
+    assert main.status == "modified"
+    assert [(h.old_start, h.new_start) for h in main.hunks] == [(1, 1), (10, 10)]
+    assert main.added_lines == {2}
+    # "--- removed sql-style comment" is a removed line, not a file header
+    assert main.removed_lines == {2, 5, 11}
+    assert main.modified_lines == {1, 2, 4, 10}
+
+
+def test_parse_unified_diff_handles_renames_binaries_and_deletions():
+    """DOD: Tests that renames with spaces, binary files and deleted files get the right paths and status."""
+    _, renamed, binary, deleted = parse_unified_diff(DIFF.splitlines(keepends=True))
+
+    assert (renamed.old_path, renamed.new_path, renamed.status) == ("old name.py", "new name.py", "renamed")
+    assert renamed.hunks == []
+    assert binary.is_binary and binary.status == "added" and binary.path == "logo.png"
+    assert deleted.status == "removed" and deleted.new_path is None and deleted.path == "gone.py"
+    # "@@ -1,2 +0,0 @@": removals in a deleted file anchor at line 1, never before it.
+    assert deleted.removed_lines == {1, 2}
+    assert deleted.modified_lines == {1}
+
+
+def test_extract_functions_from_diff_uses_parsed_removals():
+    """DOD: Tests that a function whose body only lost lines is still reported as touched."""
+    diff = """diff --git a/app/main.py b/app/main.py
+--- a/app/main.py
++++ b/app/main.py
+@@ -1,4 +1,3 @@
+ def main():
+     a = 1
+-    b = 2
+     return a
+"""
+    source = "def main():\n    a = 1\n    return a\n\ndef untouched():\n    pass\n"
+    functions = LanguageService().extract_functions_from_diff(diff, {"app/main.py": source})
+    assert functions == [{"filename": "app/main.py", "function_name": "main"}]
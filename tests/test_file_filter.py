@@ -0,0 +1,94 @@
+from unittest.mock import patch
+from shared.integrations.github_fetcher import GitHubPRFetcher
+from shared.services.file_filter import FileFilter, compile_globs, DEFAULT_EXCLUDE_GLOBS
+from shared.utils.spooled_diff import SpooledDiff
+
+
+def section(path, body, header="@@ -1,0 +1,{n} @@\n"):
+    lines = body.splitlines(keepends=True)
+    return (
+        f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n"
+        + header.format(n=len(lines))
+        + "".join(lines)
+    )
+
+
+APP = section("app/main.py", "+def main():\n+    return 1\n")
+LOCK = section("package-lock.json", '+{"lockfileVersion": 3}\n')
+GENERATED = section("api/client.go", "+// Code generated by protoc-gen-go. DO NOT EDIT.\n+package api\n")
+MINIFIED = section("static/app.js", "+" + "var a=1;" * 40 + "\n")
+BINARY = "diff --git a/logo.svg b/logo.svg\nindex 1..2 100644\nBinary files a/logo.svg and b/logo.svg differ\n"
+DIFF = APP + LOCK + GENERATED + MINIFIED + BINARY
+
+
+def test_globs_match_components_and_anchored_paths():
+    """DOD: Tests that slash-free globs match any path component while globs with a slash are anchored at the repo root."""
+    pattern = compile_globs(["node_modules", "*.min.js", "/dist/", "docs/**/*.png"])
+
+    assert pattern.search("web/node_modules/react/index.js")
+    assert pattern.search("static/app.min.js")
+    assert pattern.search("dist/bundle.js")
+    assert pattern.search("docs/img/a/b.png")
+    assert not pattern.search("src/dist/helpers.py")
+    assert not pattern.search("node_modules_helper.py")
+    assert not pattern.search("img/b.png")
+
+
+def test_filter_tree_skips_by_glob_and_size_and_counts_savings():
+    """DOD: Tests that filter_tree drops excluded and oversized paths before download and records bytes and tokens saved."""
+    file_filter = FileFilter(exclude_globs=DEFAULT_EXCLUDE_GLOBS, max_file_bytes=1000, enabled=True)
+    blobs = {"app/main.py": "s1", "vendor/lib.py": "s2", "yarn.lock": "s3", "data/big.py": "s4"}
+    sizes = {"app/main.py": 100, "vendor/lib.py": 400, "yarn.lock": 600, "data/big.py": 5000}
+
+    assert file_filter.filter_tree(blobs, sizes) == {"app/main.py": "s1"}
+    stats = file_filter.stats.as_dict()
+    assert stats["files_skipped"] == 3
+    assert stats["bytes_saved"] == 6000
+    assert stats["tokens_saved"] == 1500
+    assert stats["skipped"] == {"tree.glob": 2, "tree.size": 1}
+
+
+def test_filter_diff_drops_lock_generated_minified_and_binary_sections():
+    """DOD: Tests that filter_diff keeps only reviewable file sections, for both string and spooled diffs."""
+    for diff in (DIFF, SpooledDiff.from_chunks([DIFF.encode()])):
+        file_filter = FileFilter(exclude_globs=["*.lock", "package-lock.json"], max_file_bytes=10_000, enabled=True)
+        filtered = file_filter.filter_diff(diff)
+
+        assert type(filtered) is type(diff)
+        assert str(filtered) == APP
+        assert file_filter.stats.skipped == {"diff.glob": 1, "diff.generated": 1, "diff.minified": 1, "diff.binary": 1}
+        assert file_filter.stats.bytes_saved == len(DIFF) - len(APP)
+
+
+def test_filter_files_drops_the_paths_filter_diff_dropped():
+    """DOD: Tests that the changed-files listing loses the same binary, generated and minified files as the diff."""
+    file_filter = FileFilter(exclude_globs=["package-lock.json"], max_file_bytes=10_000, enabled=True)
+    files = [{"filename": name} for name in ("app/main.py", "package-lock.json", "api/client.go", "static/app.js", "logo.svg")]
+
+    file_filter.filter_diff(DIFF)
+
+    assert file_filter.filter_files(files) == [{"filename": "app/main.py"}]
+
+
+def test_generated_marker_ignored_when_diff_does_not_show_file_start():
+    """DOD: Tests that generated markers only count in hunks that include the top of the file."""
+    diff = section("app/notes.py", " # DO NOT EDIT below without review\n+x = 1\n", header="@@ -40,1 +40,{n} @@\n")
+    file_filter = FileFilter(exclude_globs=[], enabled=True)
+
+    assert file_filter.filter_diff(diff) is diff
+
+
+def test_snapshot_tree_is_filtered_before_download():
+    """DOD: Tests that the GitHub snapshot never requests blobs for paths the file filter skips."""
+    fetcher = GitHubPRFetcher()
+    with patch.object(fetcher, "client") as mock_client, \
+         patch("shared.integrations.github_fetcher.settings.LAZY_FILE_MAP", True):
+        mock_client.get_pr.return_value = {"head": {"sha": "head-sha"}, "base": {"sha": "base-sha"}}
+        mock_client.get_tree.return_value = {"tree": [
+            {"path": "app/main.py", "type": "blob", "mode": "100644", "sha": "s1", "size": 10},
+            {"path": "node_modules/x/index.js", "type": "blob", "mode": "100644", "sha": "s2", "size": 20},
+        ]}
+        snapshot = fetcher.fetch_pr_snapshot("https://github.com/user/repo", 1, "token")
+
+        assert list(snapshot.file_map) == ["app/main.py"]
+        assert snapshot.file_filter.stats.bytes_saved == 20
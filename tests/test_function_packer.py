@@ -0,0 +1,57 @@
+import asyncio
+from unittest.mock import MagicMock, AsyncMock, patch
+from review_agents.chains.complicated_llm_chain import ComplicatedLLMChainExecutor
+from review_agents.complicated_llm_review_agent import ComplicatedLLMPrReviewAgent
+from shared.utils.function_packer import PackItem, pack_first_fit_decreasing
+from shared.utils.context_budget import ContextBlock
+
+
+def test_first_fit_decreasing_respects_capacity_and_item_limit():
+    """DOD: Tests that packing fills batches largest-first within the token capacity and item limit, isolating oversize items."""
+    sizes = {"a": 60, "b": 50, "c": 40, "d": 30, "e": 20, "f": 10, "huge": 500}
+    batches = pack_first_fit_decreasing([PackItem(k, t) for k, t in sizes.items()], capacity=100, max_items=3)
+
+    assert [[i.key for i in b.items] for b in batches] == [["huge"], ["a", "c"], ["b", "d", "e"], ["f"]]
+    assert all(b.tokens <= 100 for b in batches[1:])
+    assert sum(len(b.items) for b in batches) == len(sizes)
+
+
+def test_batched_review_packs_small_functions_and_splits_results_per_function():
+    """DOD: Tests that batching reviews many small functions in few requests and maps issues back to each function's file by id."""
+    functions = [{"filename": f"pkg/m{i}.py", "function_name": f"h{i}"} for i in range(60)]
+    agent = ComplicatedLLMPrReviewAgent()
+    executor = agent.executor
+    agent.executor = MagicMock(wraps=executor)
+    agent.executor.review_cache = None
+    agent.executor.summarize = MagicMock(return_value="summary")
+    agent.language_service = MagicMock()
+    agent.language_service.extract_functions_from_diff.return_value = functions
+    agent.language_service.get_call_graph.return_value = {}
+    agent.language_service.fetch_function_context_blocks.side_effect = lambda fn, fm, cg: [
+        ContextBlock("function", f"{fn['filename']}:{fn['function_name']}", f"# Function: {fn}", f"def {fn['function_name']}():\n    return 1\n")
+    ]
+
+    async def review_batch(factors, rendered, diff_summary, invoke):
+        ids = [line.split(":")[0][4:] for line in rendered.split("\n") if line.startswith("### ")]
+
+        async def provider():
+            return {"functions": [{"id": key, "issues": [{"type": "bugs", "subtype": "x", "line": 2, "description": "d", "suggestion": "s"}]} for key in ids]}
+        return await invoke(provider)
+
+    agent.executor.run_batch_chain = AsyncMock(side_effect=review_batch)
+    with patch("review_agents.complicated_llm_review_agent.settings.COMPLICATED_REVIEW_BATCHING", True), \
+         patch("review_agents.complicated_llm_review_agent.settings.COMPLICATED_REVIEW_MODE", "per_factor"):
+        result = asyncio.run(agent.review("diff", [], {}, ["bugs", "performance"]))
+
+    requests = agent.executor.run_batch_chain.await_count
+    # 2000 completion tokens / 150 per review -> 13 functions per single-factor request.
+    assert requests == 2 * 5
+    assert len(functions) * 2 / requests >= 12
+    assert sorted(f.name for f in result.files) == sorted(fn["filename"] for fn in functions)
+    assert all([i.type.value for i in f.issues] == ["bugs"] for f in result.files)
+
+
+def test_batch_prompt_renders_function_headers():
+    """DOD: Tests that batch entries carry the id header the batch schema refers back to."""
+    entry = ComplicatedLLMChainExecutor.format_batch_entry("f3", {"function": {"filename": "a.py", "function_name": "f"}, "context": "def f(): pass"})
+    assert entry == "### f3: a.py:f\ndef f(): pass"
@@ -0,0 +1,115 @@
+import os
+import subprocess
+import pytest
+from shared.integrations.git_mirror_fetcher import GitMirrorPRFetcher
+from shared.exceptions.fetcher_exceptions import PRNotFoundException, RepoNotFoundException
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=cwd, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+
+def write(root, path, content):
+    full = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "w") as f:
+        f.write(content)
+
+
+@pytest.fixture
+def origin(tmp_path):
+    """A local repo with a default branch and a PR head published as refs/pull/1/head."""
+    root = str(tmp_path / "origin")
+    os.makedirs(root)
+    git(root, "init", "--quiet", "-b", "main")
+    write(root, "app/main.py", "def main():\n    return 1\n")
+    write(root, "app/old_name.py", "X = 1\n")
+    write(root, "README.md", "# demo\n")
+    git(root, "add", "-A")
+    git(root, "commit", "--quiet", "-m", "base")
+
+    git(root, "checkout", "--quiet", "-b", "feature")
+    write(root, "app/main.py", "def main():\n    return helper()\n\ndef helper():\n    return 2\n")
+    git(root, "mv", "app/old_name.py", "app/new_name.py")
+    write(root, "app/added.py", "Y = 2\n")
+    git(root, "rm", "--quiet", "README.md")
+    git(root, "add", "-A")
+    git(root, "commit", "--quiet", "-m", "feature")
+    git(root, "update-ref", "refs/pull/1/head", "feature")
+    git(root, "checkout", "--quiet", "main")
+    return root
+
+
+def test_git_mirror_fetch_pr_data_matches_platform_shape(origin, tmp_path):
+    """DOD: Tests that the mirror fetcher returns GitHub-shaped files and a unified diff from a file:// remote."""
+    fetcher = GitMirrorPRFetcher(cache_dir=str(tmp_path / "mirrors"))
+    data = fetcher.fetch_pr_data(f"file://{origin}", 1)
+
+    files = {f["filename"]: f for f in data["files"]}
+    assert files["app/main.py"]["status"] == "modified"
+    assert files["app/main.py"]["additions"] == 4
+    assert files["app/main.py"]["deletions"] == 1
+    assert files["app/added.py"]["status"] == "added"
+    assert files["README.md"]["status"] == "removed"
+    assert files["app/new_name.py"]["status"] == "renamed"
+    assert files["app/new_name.py"]["previous_filename"] == "app/old_name.py"
+
+    assert "diff --git a/app/main.py b/app/main.py" in str(data["diff"])
+    assert "+def helper():" in str(data["diff"])
+    assert data["snapshot"].head_sha == git(origin, "rev-parse", "refs/pull/1/head")
+    assert data["snapshot"].base_sha == git(origin, "rev-parse", "main")
+
+
+def test_git_mirror_diffs_against_pr_base_branch_from_merge_ref(origin, tmp_path):
+    """DOD: Tests that a PR into a non-default branch is diffed against that branch via the merge ref's first parent."""
+    git(origin, "checkout", "--quiet", "-b", "release", "main")
+    write(origin, "app/release.py", "R = 1\n")
+    git(origin, "add", "-A")
+    git(origin, "commit", "--quiet", "-m", "release only")
+    git(origin, "checkout", "--quiet", "-b", "fix", "release")
+    write(origin, "app/main.py", "def main():\n    return 3\n")
+    git(origin, "commit", "--quiet", "-am", "fix")
+    merge = git(origin, "commit-tree", "fix^{tree}", "-p", "release", "-p", "fix", "-m", "merge")
+    git(origin, "update-ref", "refs/pull/2/head", "fix")
+    git(origin, "update-ref", "refs/pull/2/merge", merge)
+    git(origin, "checkout", "--quiet", "main")
+
+    fetcher = GitMirrorPRFetcher(cache_dir=str(tmp_path / "mirrors"))
+    data = fetcher.fetch_pr_data(f"file://{origin}", 2)
+
+    assert [f["filename"] for f in data["files"]] == ["app/main.py"]
+    assert "app/release.py" not in str(data["diff"])
+    assert data["snapshot"].base_sha == git(origin, "rev-parse", "release")
+
+
+def test_git_mirror_file_map_and_incremental_fetch(origin, tmp_path):
+    """DOD: Tests that branch contents come from the mirror and a re-fetch picks up a new PR head."""
+    fetcher = GitMirrorPRFetcher(cache_dir=str(tmp_path / "mirrors"))
+    file_map = fetcher.fetch_entire_code_for_branch(f"file://{origin}", 1)
+    assert file_map == {
+        "app/main.py": "def main():\n    return helper()\n\ndef helper():\n    return 2\n",
+        "app/new_name.py": "X = 1\n",
+        "app/added.py": "Y = 2\n",
+    }
+
+    git(origin, "checkout", "--quiet", "feature")
+    write(origin, "app/added.py", "Y = 3\n")
+    git(origin, "commit", "--quiet", "-am", "push")
+    git(origin, "update-ref", "refs/pull/1/head", "feature")
+
+    lazy_map = fetcher.fetch_lazy_code_for_branch(f"file://{origin}", 1)
+    assert lazy_map["app/added.py"] == "Y = 3\n"
+    assert lazy_map.stats["fetched_files"] == 1
+    assert len(os.listdir(tmp_path / "mirrors")) == 2  # one mirror plus its lock file
+
+
+def test_git_mirror_maps_missing_refs_and_repos(origin, tmp_path):
+    """DOD: Tests that a missing PR ref and a missing repository raise the matching fetcher exceptions."""
+    fetcher = GitMirrorPRFetcher(cache_dir=str(tmp_path / "mirrors"))
+    with pytest.raises(PRNotFoundException):
+        fetcher.fetch_pr_data(f"file://{origin}", 99)
+    with pytest.raises(RepoNotFoundException):
+        fetcher.fetch_pr_data(f"file://{tmp_path}/missing", 1)
@@ -0,0 +1,148 @@
+import io
+import tarfile
+import pytest
+from unittest.mock import patch, MagicMock
+from requests import HTTPError
+from shared.integrations.clients.github_client import GitHubClient, tree_blobs
+from shared.cache.http_response_cache import HttpResponseCache
+from shared.exceptions.fetcher_exceptions import RepoNotFoundException
+
+
+def make_tarball(files, prefix="user-repo-abc123"):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as archive:
+        for path, data in files.items():
+            info = tarfile.TarInfo(name=f"{prefix}/{path}")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    buf.seek(0)
+    return buf
+
+
+def make_response(json_data=None, raw=None, content=None, status_code=200):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.json.return_value = json_data
+    resp.raw = raw
+    resp.content = content
+    resp.links = {}
+    resp.__enter__.return_value = resp
+    if status_code >= 400:
+        resp.text = "error"
+        resp.raise_for_status.side_effect = HTTPError(response=resp)
+    return resp
+
+
+def test_get_all_files_by_branch_uses_tree_and_tarball():
+    """DOD: Tests that get_all_files_by_branch builds {path: content} from one tree request and one tarball stream, fetching only blobs missing from the archive."""
+    tree = {
+        "sha": "tree-sha",
+        "truncated": False,
+        "tree": [
+            {"path": "src", "type": "tree", "sha": "d1"},
+            {"path": "src/app.py", "type": "blob", "mode": "100644", "sha": "b1"},
+            {"path": "README.md", "type": "blob", "mode": "100644", "sha": "b2"},
+            {"path": "ignored.txt", "type": "blob", "mode": "100644", "sha": "b3"},
+            {"path": "link", "type": "blob", "mode": "120000", "sha": "b4"},
+        ],
+    }
+    tarball = make_tarball({"src/app.py": b"print('hi')\n", "README.md": b"# Readme\n", "link": b"src/app.py"})
+
+    def fake_get(url, headers=None, stream=False):
+        if "/git/trees/" in url:
+            return make_response(json_data=tree)
+        if "/tarball/" in url:
+            return make_response(raw=tarball)
+        if url.endswith("/git/blobs/b3"):
+            return make_response(content=b"export-ignored\n")
+        raise AssertionError(f"Unexpected URL {url}")
+
+    with patch("shared.integrations.clients.github_client.requests.Session.get", side_effect=fake_get) as mock_get:
+        files = GitHubClient().get_all_files_by_branch("user", "repo", "token", "abc123")
+
+    assert files == {
+        "src/app.py": "print('hi')\n",
+        "README.md": "# Readme\n",
+        "ignored.txt": "export-ignored\n",
+    }
+    assert mock_get.call_count == 3
+
+
+def test_get_tree_completes_truncated_listing_from_subtrees():
+    """DOD: Tests that a truncated recursive tree is completed by listing the root and fetching each subtree, so no file is missing."""
+    trees = {
+        "abc123?recursive=1": {"sha": "root", "truncated": True, "tree": [{"path": "a.py", "type": "blob", "mode": "100644", "sha": "b1"}]},
+        "root": {"sha": "root", "tree": [
+            {"path": "a.py", "type": "blob", "mode": "100644", "sha": "b1"},
+            {"path": "src", "type": "tree", "sha": "t1"},
+        ]},
+        "t1?recursive=1": {"sha": "t1", "truncated": False, "tree": [
+            {"path": "pkg", "type": "tree", "sha": "t2"},
+            {"path": "pkg/x.py", "type": "blob", "mode": "100644", "sha": "b2"},
+        ]},
+    }
+
+    def fake_get(url, headers=None, stream=False):
+        return make_response(json_data=trees[url.split("/git/trees/")[1]])
+
+    with patch("shared.integrations.clients.github_client.requests.Session.get", side_effect=fake_get) as mock_get:
+        tree = GitHubClient().get_tree("user", "repo", "abc123", "token")
+
+    assert tree_blobs(tree) == {"a.py": "b1", "src/pkg/x.py": "b2"}
+    assert not tree["truncated"]
+    assert mock_get.call_count == 3
+
+
+def test_get_all_files_by_branch_maps_http_errors():
+    """DOD: Tests that snapshot fetch failures are mapped through handle_http_error."""
+    with patch("shared.integrations.clients.github_client.requests.Session.get", return_value=make_response(status_code=404)):
+        with pytest.raises(RepoNotFoundException):
+            GitHubClient().get_all_files_by_branch("user", "repo", "token", "abc123")
+
+
+def test_conditional_requests_replay_cached_body_on_304(tmp_path):
+    """DOD: Tests that repeated PR fetches send If-None-Match and serve the stored body when GitHub answers 304."""
+    client = GitHubClient(http_cache=HttpResponseCache(root=str(tmp_path), max_bytes=1024 * 1024))
+    first = make_response(json_data=[{"filename": "a.py"}])
+    first.headers = {"ETag": '"v1"', "Content-Type": "application/json"}
+    first.content = b'[{"filename": "a.py"}]'
+    not_modified = make_response(status_code=304)
+    not_modified.raise_for_status.side_effect = None
+
+    with patch("shared.integrations.clients.github_client.requests.Session.get", side_effect=[first, not_modified]) as mock_get:
+        assert client.get_pr_files("user", "repo", 1, "token") == [{"filename": "a.py"}]
+        assert client.get_pr_files("user", "repo", 1, "token") == [{"filename": "a.py"}]
+
+    assert "If-None-Match" not in mock_get.call_args_list[0].kwargs["headers"]
+    assert mock_get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert client.http_cache.not_modified == 1
+
+
+def test_conditional_cache_is_scoped_per_token(tmp_path):
+    """DOD: Tests that cached responses are keyed by token so one token never revalidates another's entry."""
+    cache = HttpResponseCache(root=str(tmp_path), max_bytes=1024)
+    url = "https://api.github.com/repos/user/repo/pulls/1"
+    assert cache.key(url, "token-a", "application/json") != cache.key(url, "token-b", "application/json")
+
+
+def test_iter_pr_files_follows_pagination(tmp_path):
+    """DOD: Tests that get_pr_files requests 100 entries per page and returns every page in order instead of truncating at the first."""
+    client = GitHubClient(http_cache=HttpResponseCache(root=str(tmp_path), max_bytes=1024 * 1024))
+    base = "https://api.github.com/repos/user/repo/pulls/1/files?per_page=100"
+    pages = {
+        base: [{"filename": f"f{i}.py"} for i in range(100)],
+        f"{base}&page=2": [{"filename": f"f{i}.py"} for i in range(100, 200)],
+        f"{base}&page=3": [{"filename": "f200.py"}],
+    }
+
+    def fake_get(url, headers=None):
+        resp = make_response(json_data=pages[url])
+        resp.headers = {}
+        resp.links = {"last": {"url": f"{base}&page=3"}} if url == base else {}
+        return resp
+
+    with patch("shared.integrations.clients.github_client.requests.Session.get", side_effect=fake_get) as mock_get:
+        files = client.get_pr_files("user", "repo", 1, "token")
+
+    assert [f["filename"] for f in files] == [f"f{i}.py" for i in range(201)]
+    assert mock_get.call_count == 3
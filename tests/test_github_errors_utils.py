@@ -46,4 +46,11 @@ def test_handle_http_error_no_response():
     err = HTTPError("no response")
     err.response = None
     with pytest.raises(GitHubAPIException):
-        handle_http_error(err) 
\ No newline at end of file
+        handle_http_error(err) 
+
+def test_handle_http_error_403_quota_exhausted():
+    """DOD: Raises RateLimitException for a 403 that reports an exhausted quota."""
+    err = make_http_error(403)
+    err.response.headers = {"X-RateLimit-Remaining": "0"}
+    with pytest.raises(RateLimitException):
+        handle_http_error(err)
@@ -1,5 +1,6 @@
+import asyncio
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from shared.integrations.github_fetcher import GitHubPRFetcher
 from shared.exceptions.fetcher_exceptions import (
     InvalidRepoException, RepoNotFoundException, PermissionDeniedException, TokenInvalidException, RateLimitException, GitHubAPIException, FetcherException
@@ -39,4 +40,77 @@ def test_success_path(fetcher):
         mock_client.get_pr_diff.return_value = "diff"
         result = fetcher.fetch_pr_data("https://github.com/user/repo", 1, "token")
         assert result["files"] == [{"filename": "file.py"}]
-        assert result["diff"] == "diff" 
\ No newline at end of file
+        assert result["diff"] == "diff"
+
+
+def test_fetch_pr_data_returns_pinned_snapshot(fetcher):
+    """DOD: Tests that fetch_pr_data resolves the PR once, pins head/base SHAs for the diff and tree, and exposes the snapshot for strategies."""
+    with patch.object(fetcher, "client") as mock_client:
+        mock_client.get_pr.return_value = {"head": {"sha": "head-sha", "ref": "feature"}, "base": {"sha": "base-sha"}}
+        mock_client.get_pr_files.return_value = [{"filename": "file.py"}]
+        mock_client.get_pr_diff.return_value = "diff"
+        mock_client.get_tree.return_value = {"tree": [{"path": "file.py", "type": "blob", "mode": "100644", "sha": "blob-sha"}]}
+        result = fetcher.fetch_pr_data("https://github.com/user/repo", 1, "token")
+        snapshot = result["snapshot"]
+
+        assert snapshot.head_sha == "head-sha" and snapshot.base_sha == "base-sha"
+        assert snapshot.diff is result["diff"]
+        mock_client.get_pr_diff.assert_called_once_with("user", "repo", 1, "token", base_sha="base-sha", head_sha="head-sha")
+        assert list(snapshot.file_map) == ["file.py"]
+        mock_client.get_tree.assert_called_once_with("user", "repo", "head-sha", "token")
+        mock_client.get_pr.assert_called_once()
+
+
+def test_afetch_pr_data_fetches_files_and_diff_concurrently(fetcher):
+    """DOD: Tests that afetch_pr_data pages through the file listing while the pinned diff streams, filtering entries as they arrive."""
+    in_flight, peak = 0, 0
+
+    async def request(result):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return result
+
+    client = MagicMock()
+    client.__aenter__ = AsyncMock(return_value=client)
+    client.__aexit__ = AsyncMock(return_value=None)
+    client.request_count = 2
+
+    async def iter_pr_files(*args):
+        for page in ([{"filename": "file.py"}], [{"filename": "node_modules/x/index.js"}]):
+            for item in await request(page):
+                yield item
+
+    client.iter_pr_files = iter_pr_files
+    client.get_pr_diff.side_effect = lambda *args, **kwargs: request("diff")
+
+    with patch.object(fetcher, "client") as mock_client, \
+         patch("shared.integrations.github_fetcher.AsyncGitHubClient", return_value=client):
+        mock_client.get_pr.return_value = {"head": {"sha": "head-sha"}, "base": {"sha": "base-sha"}}
+        mock_client.request_count = 1
+        result = asyncio.run(fetcher.afetch_pr_data("https://github.com/user/repo", 1, "token"))
+        request_count = result["snapshot"].request_count
+
+    assert peak == 2
+    assert result["snapshot"].files == [{"filename": "file.py"}] and result["snapshot"].diff == "diff"
+    client.get_pr_diff.assert_called_once_with("user", "repo", 1, "token", base_sha="base-sha", head_sha="head-sha")
+    mock_client.get_pr_files.assert_not_called()
+    assert request_count == 3
+
+
+def test_branch_fetches_resolve_head_through_snapshot(fetcher):
+    """DOD: Tests that the eager and lazy branch fetches pin the head through fetch_pr_snapshot with a single PR lookup each."""
+    with patch.object(fetcher, "client") as mock_client, \
+         patch.object(fetcher, "_fetch_files_via_blob_store", return_value={"file.py": "x"}) as fetch_files, \
+         patch.object(fetcher, "fetch_pr_snapshot", wraps=fetcher.fetch_pr_snapshot) as fetch_snapshot:
+        mock_client.get_pr.return_value = {"head": {"sha": "head-sha"}, "base": {"sha": "base-sha"}}
+        mock_client.get_tree.return_value = {"tree": [{"path": "file.py", "type": "blob", "mode": "100644", "sha": "blob-sha"}]}
+        fetcher.fetch_entire_code_for_branch("https://github.com/user/repo", 1, "token")
+        lazy = fetcher.fetch_lazy_code_for_branch("https://github.com/user/repo", 1, "token")
+
+    assert fetch_snapshot.call_count == 2
+    assert mock_client.get_pr.call_count == 2
+    fetch_files.assert_called_once_with("user", "repo", "head-sha", "token", {"file.py": "blob-sha"})
+    assert list(lazy) == ["file.py"]
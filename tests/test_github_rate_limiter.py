@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import pytest
+import redis
+from unittest.mock import patch, MagicMock
+from shared.integrations.clients.github_rate_limiter import GitHubRateLimiter
+from shared.exceptions.fetcher_exceptions import RateLimitException
+
+
+def make_limiter(reserve_results, max_wait=60):
+    mock_redis = MagicMock()
+    mock_redis.register_script.return_value = MagicMock(side_effect=reserve_results)
+    return GitHubRateLimiter(redis_client=mock_redis, burst=5, max_wait=max_wait), mock_redis
+
+
+def test_acquire_sleeps_until_token_available():
+    """DOD: Tests that acquire waits for the time returned by the shared bucket before letting the request through."""
+    limiter, _ = make_limiter(["0.5", "0.25", "0"])
+    with patch("shared.integrations.clients.github_rate_limiter.time.sleep") as mock_sleep:
+        limiter.acquire("token")
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 0.25]
+    assert limiter.waited_seconds == 0.75
+
+
+def test_acquire_raises_when_wait_exceeds_budget():
+    """DOD: Tests that a wait longer than max_wait surfaces as RateLimitException instead of blocking the task."""
+    limiter, _ = make_limiter(["3600"], max_wait=60)
+    with pytest.raises(RateLimitException):
+        limiter.acquire("token")
+
+
+def test_update_records_quota_headers_per_token_scope():
+    """DOD: Tests that X-RateLimit headers are written to the token's Redis hash with an expiry after reset."""
+    limiter, mock_redis = make_limiter([])
+    limiter.update("token", {"X-RateLimit-Remaining": "42", "X-RateLimit-Reset": "1700000000"})
+    pipe = mock_redis.pipeline.return_value
+    key = pipe.hset.call_args.args[0]
+    assert key.startswith("github:ratelimit:") and "token" not in key
+    assert pipe.hset.call_args.kwargs["mapping"] == {"remaining": 42, "reset": 1700000000}
+    pipe.expireat.assert_called_once_with(key, 1700000060)
+
+
+def test_limiter_fails_open_without_redis():
+    """DOD: Tests that an unreachable Redis does not block GitHub requests."""
+    limiter, mock_redis = make_limiter(redis.ConnectionError("down"))
+    limiter.acquire("token")
+    limiter.acquire("token")
+    assert mock_redis.register_script.return_value.call_count == 1
+
+
+def test_reserve_passes_free_flow_threshold_to_script():
+    """DOD: Tests that the shared bucket is told the quota reserve below which pacing starts."""
+    limiter, mock_redis = make_limiter(["0"])
+    limiter.reserve_calls = 300
+    limiter.acquire("token")
+    assert mock_redis.register_script.return_value.call_args.kwargs["args"] == [5, 300]
+
+
+def test_aacquire_keeps_redis_round_trip_off_the_event_loop():
+    """DOD: Tests that aacquire runs the blocking Redis reservation in a worker thread."""
+    limiter, _ = make_limiter([])
+    threads = []
+
+    def reserve(token):
+        threads.append(threading.get_ident())
+        return 0.0
+
+    limiter.reserve = reserve
+    loop_thread = threading.get_ident()
+    asyncio.run(limiter.aacquire("token"))
+    assert threads and threads[0] != loop_thread
+
+
+def test_aupdate_records_quota_off_the_event_loop():
+    """DOD: Tests that aupdate writes the quota headers from a worker thread rather than the event loop."""
+    limiter, _ = make_limiter([])
+    threads = []
+    limiter.update = lambda token, headers: threads.append(threading.get_ident())
+
+    loop_thread = threading.get_ident()
+    asyncio.run(limiter.aupdate("token", {"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "1"}))
+    assert threads and threads[0] != loop_thread
@@ -0,0 +1,51 @@
+from unittest.mock import MagicMock
+from shared.integrations.lazy_file_map import LazyFileMap
+from shared.exceptions.fetcher_exceptions import GitHubAPIException
+from shared.services.code_language_service import LanguageService
+
+DIFF = """diff --git a/pkg/changed.py b/pkg/changed.py
+--- a/pkg/changed.py
++++ b/pkg/changed.py
+@@ -4,1 +4,2 @@
+ def changed():
++    return helper()
+"""
+
+
+def make_map():
+    contents = {
+        "pkg/changed.py": b"def helper():\n    return 2\n\ndef changed():\n    return helper()\n",
+        "pkg/untouched.py": b"def other():\n    pass\n",
+        "README.md": b"# readme\n",
+    }
+    loader = MagicMock(side_effect=lambda path, sha: contents[path])
+    return LazyFileMap({path: f"sha-{path}" for path in contents}, loader), loader
+
+
+def test_lazy_file_map_fetches_on_first_access_only():
+    """DOD: Tests that membership and iteration do not download, and each file is downloaded at most once."""
+    file_map, loader = make_map()
+    assert "pkg/untouched.py" in file_map
+    assert sorted(file_map) == ["README.md", "pkg/changed.py", "pkg/untouched.py"]
+    assert loader.call_count == 0
+    assert file_map["README.md"] == "# readme\n"
+    assert file_map.get("README.md") == "# readme\n"
+    assert loader.call_count == 1
+    assert file_map.get("missing.py") is None
+
+
+def test_lazy_file_map_treats_failed_downloads_as_missing():
+    """DOD: Tests that a file whose download fails behaves like a missing key."""
+    file_map = LazyFileMap({"a.py": "sha"}, MagicMock(side_effect=GitHubAPIException("boom")))
+    assert file_map.get("a.py") is None
+
+
+def test_language_service_reads_only_pr_footprint():
+    """DOD: Tests that function extraction and call-graph building on a lazy map only download the changed files."""
+    file_map, loader = make_map()
+    service = LanguageService()
+    functions = service.extract_functions_from_diff(DIFF, file_map)
+    call_graph = service.get_call_graph(file_map, filenames={fn["filename"] for fn in functions})
+    assert {fn["function_name"] for fn in functions} == {"changed"}
+    assert call_graph["pkg/changed.py:changed"] == ["pkg/changed.py:helper"]
+    assert [c.args[0] for c in loader.call_args_list] == ["pkg/changed.py"]
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from review_agents.complicated_llm_review_agent import ComplicatedLLMPrReviewAgent
+from shared.utils.context_budget import ContextBlock
+from shared.utils.llm_concurrency_limiter import AIMDLimiter, is_rate_limit_error
+
+
+def test_limiter_bounds_in_flight_calls():
+    """DOD: Tests that no more calls run at once than the AIMD window allows."""
+    limiter = AIMDLimiter(initial=3, max_limit=3, retries=0)
+    running = []
+
+    async def call():
+        running.append(limiter.in_flight)
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def main():
+        return await asyncio.gather(*(limiter.run(call) for _ in range(20)))
+
+    assert asyncio.run(main()) == [1] * 20
+    assert max(running) == 3
+    assert limiter.stats["max_in_flight"] == 3
+
+
+def test_limiter_retries_rate_limited_call_and_shrinks_window_once_per_burst():
+    """DOD: Tests that concurrent 429s halve the window once and the calls are retried until they succeed."""
+    limiter = AIMDLimiter(initial=8, min_limit=1, max_limit=8, retries=2, backoff_base=0)
+    attempts = {}
+
+    async def call(i):
+        attempts[i] = attempts.get(i, 0) + 1
+        await asyncio.sleep(0.01)
+        if attempts[i] == 1:
+            raise RuntimeError("Error code: 429 - Rate limit reached")
+        return i
+
+    async def main():
+        return await asyncio.gather(*(limiter.run(lambda i=i: call(i)) for i in range(4)))
+
+    assert asyncio.run(main()) == [0, 1, 2, 3]
+    assert limiter.counters["decreases"] == 1
+    assert limiter.counters["retries"] == 4
+    assert 4 <= limiter.limit < 8
+
+
+def test_limiter_shrinks_on_timeout_without_retry_and_rebinds_across_loops():
+    """DOD: Tests that a timeout shrinks the window and is re-raised, and that the limiter works across event loops."""
+    limiter = AIMDLimiter(initial=4, retries=3, backoff_base=0)
+    call = AsyncMock(side_effect=asyncio.TimeoutError())
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(limiter.run(call))
+    assert call.await_count == 1
+    assert limiter.limit == 2
+
+    assert asyncio.run(limiter.run(AsyncMock(return_value="ok"))) == "ok"
+    assert limiter.in_flight == 0
+
+
+def test_complicated_agent_retries_rate_limit_instead_of_returning_error():
+    """DOD: Tests that a rate-limited review call is retried and its issues are kept rather than reported as AGENT_RATE_LIMIT."""
+    agent = ComplicatedLLMPrReviewAgent()
+    agent.limiter = AIMDLimiter(retries=2, backoff_base=0)
+    agent.executor = MagicMock()
+    agent.executor.summarize.return_value = "summary"
+    agent.executor.review_cache = None
+    agent.executor.prompt_overhead.return_value = 100
+    provider = AsyncMock(side_effect=[
+        RuntimeError("429 Too Many Requests"),
+        {"files": [{"name": "a.py", "issues": [{"type": "bugs", "subtype": "x", "line": 2, "description": "d", "suggestion": "s"}]}]},
+    ])
+
+    async def run_chain(factor, func_data, invoke):
+        return await invoke(provider)
+    agent.executor.run_chain = AsyncMock(side_effect=run_chain)
+    agent.language_service = MagicMock()
+    agent.language_service.extract_functions_from_diff.return_value = [{"filename": "a.py", "function_name": "f"}]
+    agent.language_service.get_call_graph.return_value = {}
+    agent.language_service.fetch_function_context_blocks.return_value = [ContextBlock("function", "a.py:f", "# Function: f", "def f(): pass\n")]
+
+    result = asyncio.run(agent.review("diff", [], {}, ["bugs"]))
+
+    assert result.errors == []
+    assert [(f.name, [i.line for i in f.issues]) for f in result.files] == [("a.py", [2])]
+    assert provider.await_count == 2
+
+
+def test_is_rate_limit_error_detects_status_and_message():
+    """DOD: Tests that rate limits are recognised by status code or message and other errors are not."""
+    status_error = Exception("Too Many Requests")
+    status_error.status_code = 429
+    assert is_rate_limit_error(status_error)
+    assert is_rate_limit_error(RuntimeError("You exceeded your current quota"))
+    assert not is_rate_limit_error(RuntimeError("Bad gateway"))
@@ -0,0 +1,83 @@
+import os
+import time
+import asyncio
+from unittest.mock import MagicMock, AsyncMock, patch
+from shared.cache.llm_review_cache import LLMReviewCache
+from review_agents.chains.complicated_llm_chain import ComplicatedLLMChainExecutor
+from review_agents.chains.simple_llm_chain import SimpleLLMChainExecutor
+
+REVIEW = {"files": [{"name": "a.py", "issues": []}]}
+
+
+def mock_chain():
+    chain = MagicMock()
+    chain.ainvoke = AsyncMock(return_value=REVIEW)
+    return chain
+
+
+def test_key_covers_model_template_factor_and_inputs():
+    """DOD: Tests that the key changes with model, template, factor and every input, including the diff summary."""
+    inputs = {"function": "def f(): pass", "context": "", "diff_summary": "s1"}
+    key = LLMReviewCache.key("gpt-4o", "T", "bugs", inputs)
+
+    assert key == LLMReviewCache.key("gpt-4o", "T", "bugs", dict(inputs))
+    assert key != LLMReviewCache.key("gpt-4o", "T", "bugs", {**inputs, "diff_summary": "s2"})
+    assert key != LLMReviewCache.key("gpt-4o-mini", "T", "bugs", inputs)
+    assert key != LLMReviewCache.key("gpt-4o", "T2", "bugs", inputs)
+    assert key != LLMReviewCache.key("gpt-4o", "T", "performance", inputs)
+    assert key != LLMReviewCache.key("gpt-4o", "T", "bugs", {**inputs, "function": "def g(): pass"})
+
+
+def test_run_chain_reuses_review_across_executors(tmp_path):
+    """DOD: Tests that a later task reviewing the same function and factor is served from the shared cache without an LLM call."""
+    function_data = {"function": {"filename": "a.py", "code": "def f(): pass"}, "context": "", "diff_summary": "summary"}
+    first = ComplicatedLLMChainExecutor(review_cache=LLMReviewCache(root=str(tmp_path)))
+    chain = mock_chain()
+    with patch.object(first, "build_chain", return_value=chain):
+        assert asyncio.run(first.run_chain("bugs", function_data)) == REVIEW
+
+    second = ComplicatedLLMChainExecutor(review_cache=LLMReviewCache(root=str(tmp_path)))
+    second_chain = mock_chain()
+    with patch.object(second, "build_chain", return_value=second_chain):
+        assert asyncio.run(second.run_chain("bugs", function_data)) == REVIEW
+        asyncio.run(second.run_chain("performance", function_data))
+
+    assert chain.ainvoke.await_count == 1
+    assert second_chain.ainvoke.await_count == 1
+    assert second.review_cache.stats["hits"] == 1
+    assert second.review_cache.stats["hit_rate"] == 0.5
+
+
+def test_cache_hit_does_not_go_through_provider_invoke(tmp_path):
+    """DOD: Tests that only a cache miss is wrapped by the caller's provider invoke (limiter, timeout, hedging)."""
+    executor = ComplicatedLLMChainExecutor(review_cache=LLMReviewCache(root=str(tmp_path)))
+    function_data = {"function": {"filename": "a.py", "code": "def f(): pass"}, "context": "", "diff_summary": "summary"}
+    invoked = []
+
+    async def invoke(compute):
+        invoked.append(1)
+        return await compute()
+
+    with patch.object(executor, "build_chain", return_value=mock_chain()):
+        assert asyncio.run(executor.run_chain("bugs", function_data, invoke)) == REVIEW
+        assert asyncio.run(executor.run_chain("bugs", function_data, invoke)) == REVIEW
+
+    assert len(invoked) == 1
+
+
+def test_simple_chain_cache_expires_after_ttl(tmp_path):
+    """DOD: Tests that simple-chain results are cached and that entries older than the TTL are fetched again."""
+    cache = LLMReviewCache(root=str(tmp_path), ttl_seconds=60)
+    executor = SimpleLLMChainExecutor(review_cache=cache)
+    chain = mock_chain()
+    with patch.object(executor, "build_chain", return_value=chain):
+        asyncio.run(executor.run_chain("bugs", {"code": "diff"}))
+        asyncio.run(executor.run_chain("bugs", {"code": "diff"}))
+        assert chain.ainvoke.await_count == 1
+
+        for dirpath, _, names in os.walk(str(tmp_path)):
+            for name in names:
+                os.utime(os.path.join(dirpath, name), (time.time(), time.time() - 120))
+        asyncio.run(executor.run_chain("bugs", {"code": "diff"}))
+
+    assert chain.ainvoke.await_count == 2
@@ -0,0 +1,57 @@
+import asyncio
+from unittest.mock import MagicMock, AsyncMock, patch
+from review_agents.complicated_llm_review_agent import ComplicatedLLMPrReviewAgent
+from shared.models.enums import ErrorCode
+from shared.utils.context_budget import ContextBlock
+from shared.utils.llm_concurrency_limiter import AIMDLimiter
+
+
+def issue(factor, line):
+    return {"type": factor, "subtype": "x", "line": line, "description": "d", "suggestion": "s"}
+
+
+def make_agent(functions):
+    agent = ComplicatedLLMPrReviewAgent()
+    agent.executor = MagicMock()
+    agent.executor.summarize.return_value = "summary"
+    agent.executor.review_cache = None
+    agent.limiter = AIMDLimiter(retries=0)
+    agent.language_service = MagicMock()
+    agent.language_service.extract_functions_from_diff.return_value = functions
+    agent.language_service.get_call_graph.return_value = {}
+    agent.language_service.fetch_function_context_blocks.return_value = [ContextBlock("function", "a.py:f", "# Function: f", "")]
+    agent.executor.prompt_overhead.return_value = 100
+    return agent
+
+
+def test_multi_factor_mode_makes_one_call_per_function():
+    """DOD: Tests that multi_factor mode reviews each function once for all factors and splits issues back per factor."""
+    functions = [{"filename": "a.py", "function_name": "f"}, {"filename": "b.py", "function_name": "g"}]
+    agent = make_agent(functions)
+
+    async def review(factors, func_data, invoke):
+        name = func_data["function"]["filename"]
+        return await invoke(AsyncMock(return_value={"files": [{"name": name, "issues": [issue("bugs", 3), issue("performance", 7), issue("security", 9)]}]}))
+
+    agent.executor.run_multi_factor_chain = AsyncMock(side_effect=review)
+    agent.executor.run_chain = AsyncMock()
+    with patch("review_agents.complicated_llm_review_agent.settings.COMPLICATED_REVIEW_MODE", "multi_factor"):
+        result = asyncio.run(agent.review("diff", [], {}, ["bugs", "performance", "code_style"]))
+
+    assert agent.executor.run_multi_factor_chain.await_count == 2
+    agent.executor.run_chain.assert_not_awaited()
+    assert {f.name: [(i.type.value, i.line) for i in f.issues] for f in result.files} == {
+        "a.py": [("bugs", 3), ("performance", 7)],
+        "b.py": [("bugs", 3), ("performance", 7)],
+    }
+
+
+def test_multi_factor_mode_reports_one_error_per_function():
+    """DOD: Tests that a failed combined call yields a single error result for the function rather than one per factor."""
+    agent = make_agent([{"filename": "a.py", "function_name": "f"}])
+    agent.executor.run_multi_factor_chain = AsyncMock(side_effect=RuntimeError("429 Too Many Requests"))
+    with patch("review_agents.complicated_llm_review_agent.settings.COMPLICATED_REVIEW_MODE", "multi_factor"):
+        result = asyncio.run(agent.review("diff", [], {}, ["bugs", "performance"]))
+
+    assert [e.error_code for e in result.errors] == [ErrorCode.AGENT_RATE_LIMIT]
+    assert result.files == []
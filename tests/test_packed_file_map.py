@@ -0,0 +1,38 @@
+from shared.integrations.packed_file_map import PackedFileMap
+from shared.cache.call_graph_store import CallGraphStore
+from shared.services.code_language_service import LanguageService
+
+
+def make_map():
+    file_map = PackedFileMap()
+    file_map.add("a.py", b"def a():\n    return b()\n", "sha-a")
+    file_map.add("empty.txt", b"")
+    file_map.add("notes.md", "café \xff".encode("latin-1"))
+    return file_map
+
+
+def test_packed_file_map_behaves_like_a_dict():
+    """DOD: Tests that the packed map supports lookup, iteration, membership and equality like dict."""
+    file_map = make_map()
+    assert list(file_map) == ["a.py", "empty.txt", "notes.md"]
+    assert file_map["a.py"] == "def a():\n    return b()\n"
+    assert file_map["empty.txt"] == ""
+    assert file_map["notes.md"] == "caf� �"
+    assert "a.py" in file_map and "b.py" not in file_map
+    assert file_map.get("b.py") is None
+    assert file_map.blob_sha("a.py") == "sha-a" and file_map.blob_sha("empty.txt") is None
+    assert make_map() == dict(make_map())
+
+    # Appending after a read remaps the arena
+    file_map.add("b.py", b"def b():\n    pass\n")
+    assert file_map["b.py"] == "def b():\n    pass\n"
+    assert file_map.stats == {"files": 4, "packed_bytes": len(b"def a():\n    return b()\n") + 6 + len(b"def b():\n    pass\n")}
+    file_map.close()
+
+
+def test_language_service_accepts_packed_file_map(tmp_path):
+    """DOD: Tests that LanguageService builds the call graph from a packed map."""
+    file_map = make_map()
+    file_map.add("b.py", b"def b():\n    pass\n")
+    graph = LanguageService(CallGraphStore(root=str(tmp_path))).get_call_graph(file_map)
+    assert graph == {"a.py:a": ["b"], "b.py:b": []}
@@ -0,0 +1,103 @@
+from unittest.mock import patch
+from shared.services.code_language_handlers.python_code_language_handler import PythonHandler
+from shared.services.code_language_handlers import python_module_index
+from shared.services.code_language_service import LanguageService
+from shared.cache.call_graph_store import CallGraphStore
+
+SOURCE = '''def helper():
+    return compute(
+        1,
+    )
+
+def changed():
+    return helper()
+'''
+
+DIFF = """diff --git a/pkg/mod.py b/pkg/mod.py
+--- a/pkg/mod.py
++++ b/pkg/mod.py
+@@ -6,1 +6,2 @@
+ def changed():
++    return helper()
+"""
+
+
+def test_module_is_parsed_once_across_handler_methods(tmp_path):
+    """DOD: Tests that extraction, call graph and context share a single parse per file content."""
+    service = LanguageService(CallGraphStore(root=str(tmp_path)))
+    file_map = {"pkg/mod.py": SOURCE}
+    with patch.object(python_module_index.ast, "parse", wraps=python_module_index.ast.parse) as parse:
+        functions = service.extract_functions_from_diff(DIFF, file_map)
+        call_graph = service.get_call_graph(file_map)
+        context = service.fetch_function_context(functions[0], file_map, call_graph)
+    assert parse.call_count == 1
+    assert functions == [{"filename": "pkg/mod.py", "function_name": "changed"}]
+    assert call_graph["pkg/mod.py:changed"] == ["pkg/mod.py:helper"]
+    # Callee source is cut with end_lineno, so the multi-line return is complete.
+    assert "# Callee: pkg/mod.py:helper\ndef helper():\n    return compute(\n        1,\n    )" in context
+
+
+def test_module_index_reparses_changed_content():
+    """DOD: Tests that a new version of a file gets a fresh index and a syntax error yields an empty one."""
+    handler = PythonHandler()
+    first = handler.module_index("a.py", "def a():\n    pass\n")
+    assert handler.module_index("a.py", "def a():\n    pass\n") is first
+    assert handler.module_index("a.py", "def b():\n    pass\n").by_name.keys() == {"b"}
+    broken = handler.module_index("a.py", "def (:\n")
+    assert broken.error is not None and broken.functions == []
+
+
+NESTED = '''class Service:
+    def sync(self):
+        return 1
+
+    async def fetch(self):
+        def parse(data):
+            return data
+        return parse(await self.load())
+
+def fetch():
+    return 2
+'''
+
+
+def test_module_index_qualifies_methods_nested_and_async_functions():
+    """DOD: Tests that methods, async defs and nested functions get distinct qualified names and spans."""
+    index = PythonHandler().module_index("svc.py", NESTED)
+    assert [(f.qualname, f.start, f.end) for f in index.functions] == [
+        ("Service.sync", 2, 3),
+        ("Service.fetch", 5, 8),
+        ("Service.fetch.<locals>.parse", 6, 7),
+        ("fetch", 10, 11),
+    ]
+
+
+def test_functions_containing_returns_innermost_enclosing_functions():
+    """DOD: Tests that changed lines map to their innermost enclosing function, skipping lines outside any function."""
+    index = PythonHandler().module_index("svc.py", NESTED)
+    found = index.functions_containing([1, 3, 7, 8, 9, 11, 11])
+    assert [f.qualname for f in found] == ["Service.sync", "Service.fetch", "Service.fetch.<locals>.parse", "fetch"]
+    assert index.functions_containing([4, 9, 40]) == []
+
+
+def test_module_index_collects_functions_in_except_handlers():
+    """DOD: Tests that functions defined in except and except* clauses are indexed."""
+    source = (
+        "try:\n    import fast\nexcept ImportError:\n    def fallback():\n        return 1\n"
+        "try:\n    pass\nexcept* ValueError:\n    def on_group():\n        return 2\n"
+    )
+    index = PythonHandler().module_index("compat.py", source)
+    assert [(f.qualname, f.start, f.end) for f in index.functions] == [("fallback", 4, 5), ("on_group", 9, 10)]
+
+
+def test_module_index_collects_functions_in_match_cases():
+    """DOD: Tests that functions defined inside match cases are indexed with the enclosing prefix."""
+    source = (
+        "def dispatch(kind):\n    match kind:\n        case 'a':\n            def handle():\n                return 1\n"
+        "        case _:\n            def handle_other():\n                return 2\n"
+    )
+    index = PythonHandler().module_index("dispatch.py", source)
+    assert [f.qualname for f in index.functions] == [
+        "dispatch", "dispatch.<locals>.handle", "dispatch.<locals>.handle_other",
+    ]
+    assert index.innermost_function(8).qualname == "dispatch.<locals>.handle_other"
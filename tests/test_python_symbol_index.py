@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock
+from shared.cache.call_graph_store import CallGraphStore
+from shared.integrations.lazy_file_map import LazyFileMap
+from shared.services.code_language_service import LanguageService
+
+REPO = {
+    "app/__init__.py": "from .utils import slugify\n",
+    "app/utils.py": "def slugify(text):\n    return text.lower()\n\ndef unused():\n    return 0\n",
+    "app/models.py": "class Store:\n    def save(self, item):\n        return item\n",
+    "app/service.py": (
+        "import app.models as models\n"
+        "from app import slugify\n"
+        "from .utils import unused as _unused\n"
+        "\n"
+        "class Service:\n"
+        "    def run(self, name):\n"
+        "        store = models.Store()\n"
+        "        return self.finish(store.save(slugify(name)))\n"
+        "\n"
+        "    def finish(self, value):\n"
+        "        return print(value)\n"
+    ),
+    "README.md": "# app\n",
+}
+
+
+def make_map():
+    loader = MagicMock(side_effect=lambda path, sha: REPO[path].encode())
+    return LazyFileMap({path: f"sha-{path}" for path in REPO}, loader), loader
+
+
+def test_call_graph_resolves_imports_reexports_and_self_calls(tmp_path):
+    """DOD: Tests that callees are resolved through imports, package re-exports, module attributes and self."""
+    file_map, loader = make_map()
+    service = LanguageService(CallGraphStore(root=str(tmp_path)))
+    graph = service.get_call_graph(file_map, filenames={"app/service.py"})
+
+    assert set(graph["app/service.py:Service.run"]) == {
+        "app/service.py:Service.finish", "app/models.py:Store", "store.save", "app/utils.py:slugify",
+    }
+    assert graph["app/service.py:Service.finish"] == ["print"]
+    # Only the callee modules were read, never README.md
+    assert "README.md" not in {c.args[0] for c in loader.call_args_list}
+
+
+def test_function_context_pulls_cross_file_callee_bodies(tmp_path):
+    """DOD: Tests that context assembly includes the bodies of resolved callees from other files only."""
+    file_map, _ = make_map()
+    service = LanguageService(CallGraphStore(root=str(tmp_path)))
+    graph = service.get_call_graph(file_map, filenames={"app/service.py"})
+    context = service.fetch_function_context({"filename": "app/service.py", "function_name": "Service.run"}, file_map, graph)
+
+    assert "# Callee: app/utils.py:slugify\ndef slugify(text):\n    return text.lower()" in context
+    assert "# Callee: app/service.py:Service.finish" in context
+    assert "def unused" not in context
+
+
+def test_call_graph_lists_a_callee_once_across_spellings(tmp_path):
+    """DOD: Tests that one callee reached through a bare name and a module alias appears once in the graph and context."""
+    repo = {
+        "pkg/util.py": "def helper():\n    return 1\n",
+        "pkg/main.py": "import pkg.util as u\nfrom pkg.util import helper\n\ndef run():\n    return helper() + u.helper()\n",
+    }
+    service = LanguageService(CallGraphStore(root=str(tmp_path)))
+    graph = service.get_call_graph(repo)
+    context = service.fetch_function_context({"filename": "pkg/main.py", "function_name": "run"}, repo, graph)
+
+    assert graph["pkg/main.py:run"] == ["pkg/util.py:helper"]
+    assert context.count("# Callee: pkg/util.py:helper") == 1
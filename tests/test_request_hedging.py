@@ -0,0 +1,138 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from review_agents.complicated_llm_review_agent import ComplicatedLLMPrReviewAgent
+from shared.utils.context_budget import ContextBlock
+from shared.utils.llm_concurrency_limiter import AIMDLimiter
+from shared.utils.request_hedging import LatencyTracker, RequestHedger
+
+
+def warmed_hedger(max_extra_ratio=0.05, latency=0.01):
+    tracker = LatencyTracker(window=100, min_samples=20)
+    for _ in range(20):
+        tracker.record("k", latency)
+    return RequestHedger(tracker, percentile=95, max_extra_ratio=max_extra_ratio)
+
+
+def test_latency_tracker_percentile_needs_min_samples():
+    """DOD: Tests that percentiles are only reported once enough latencies are recorded and follow the window."""
+    tracker = LatencyTracker(window=100, min_samples=10)
+    for i in range(9):
+        tracker.record("k", i)
+    assert tracker.percentile("k", 95) is None
+    for i in range(9, 100):
+        tracker.record("k", i)
+    assert tracker.percentile("k", 95) == 95
+    assert tracker.percentile("other", 95) is None
+
+
+def test_hedger_duplicates_slow_call_and_cancels_loser():
+    """DOD: Tests that a call past the latency percentile is hedged, the fast duplicate wins and the slow original is cancelled."""
+    hedger = warmed_hedger(max_extra_ratio=1.0)
+    started, cancelled = [], []
+
+    async def call():
+        attempt = len(started)
+        started.append(attempt)
+        try:
+            await asyncio.sleep(5 if attempt == 0 else 0.01)
+            return attempt
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+
+    async def main():
+        result = await hedger.run("k", call)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(main()) == 1
+    assert cancelled == [0]
+    assert hedger.counters["hedged"] == 1 and hedger.counters["hedge_wins"] == 1
+
+
+def test_hedger_respects_extra_call_budget():
+    """DOD: Tests that no more than the configured share of calls is duplicated."""
+    hedger = warmed_hedger(max_extra_ratio=0.05, latency=0.001)
+    # Keep every call slower than the warmed percentile.
+    hedger.tracker.record = MagicMock()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def main():
+        return [await hedger.run("k", call) for _ in range(40)]
+
+    assert asyncio.run(main()) == ["ok"] * 40
+    assert hedger.counters["hedged"] == 2
+    assert len(calls) == 42
+    assert hedger.stats["extra_call_ratio"] <= 0.05
+
+
+def test_hedger_returns_hedge_when_primary_fails():
+    """DOD: Tests that the first successful response wins even if the other call raises."""
+    hedger = warmed_hedger(max_extra_ratio=1.0)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("connection reset")
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    assert asyncio.run(hedger.run("k", call)) == "ok"
+
+
+def test_hedge_waits_for_a_limiter_slot_of_its_own():
+    """DOD: Tests that a hedged duplicate holds its own limiter slot, and is not sent while the window is full."""
+    def run_hedged(limit):
+        limiter = AIMDLimiter(initial=limit, min_limit=1, max_limit=limit, retries=0)
+        hedger = warmed_hedger(max_extra_ratio=1.0)
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.1 if len(calls) == 1 else 0.01)
+            return len(calls)
+
+        result = asyncio.run(limiter.run(lambda: hedger.run("k", call, slot=limiter.slot)))
+        return result, limiter.counters["max_in_flight"], hedger.counters["hedge_wins"]
+
+    assert run_hedged(limit=2) == (2, 2, 1)
+    # The primary holds the only slot, so the duplicate never starts and the primary wins.
+    assert run_hedged(limit=1) == (1, 1, 0)
+
+
+def test_complicated_agent_hedges_when_enabled():
+    """DOD: Tests that the complicated agent routes review calls through the hedger keyed by model and factor."""
+    agent = ComplicatedLLMPrReviewAgent()
+    agent.limiter = AIMDLimiter(retries=0)
+    agent.hedger = MagicMock()
+    agent.hedger.run = AsyncMock(return_value={"files": [{"name": "a.py", "issues": []}]})
+    agent.executor = MagicMock()
+    agent.executor.llm.model_name = "gpt-4o"
+    provider = AsyncMock()
+
+    async def run_chain(factor, func_data, invoke):
+        return await invoke(provider)
+    agent.executor.run_chain = AsyncMock(side_effect=run_chain)
+    agent.executor.summarize.return_value = "summary"
+    agent.executor.review_cache = None
+    agent.executor.prompt_overhead.return_value = 100
+    agent.language_service = MagicMock()
+    agent.language_service.extract_functions_from_diff.return_value = [{"filename": "a.py", "function_name": "f"}]
+    agent.language_service.get_call_graph.return_value = {}
+    agent.language_service.fetch_function_context_blocks.return_value = [ContextBlock("function", "a.py:f", "# Function: f", "def f(): pass\n")]
+
+    with patch("review_agents.complicated_llm_review_agent.settings.LLM_HEDGING_ENABLED", True):
+        result = asyncio.run(agent.review("diff", [], {}, ["bugs"]))
+
+    assert result.errors == []
+    assert agent.hedger.run.await_args.args == (("gpt-4o", "bugs"), provider)
+    # The duplicate, if any, takes a limiter slot of its own.
+    assert agent.hedger.run.await_args.kwargs["slot"] == agent.limiter.slot
@@ -0,0 +1,63 @@
+from unittest.mock import patch, MagicMock
+from shared.integrations.clients.github_client import GitHubClient
+from shared.cache.http_response_cache import HttpResponseCache
+from shared.utils.spooled_diff import SpooledDiff, bounded_diff_text
+from shared.utils.diff_parser import parse_unified_diff
+
+DIFF = (
+    "diff --git a/app.py b/app.py\n"
+    "--- a/app.py\n"
+    "+++ b/app.py\n"
+    "@@ -1,2 +1,3 @@\n"
+    " import os\n"
+    "+import sys\n"
+    " print(os)\n"
+)
+
+
+def make_diff_response(body: bytes, status_code=200, headers=None):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.headers = headers or {}
+    resp.iter_content.side_effect = lambda size: (body[i:i + size] for i in range(0, len(body), size))
+    resp.__enter__.return_value = resp
+    return resp
+
+
+def test_spooled_diff_lines_survive_chunk_boundaries(tmp_path):
+    """DOD: Tests that a diff written in small chunks rolls over to disk and still yields whole lines that parse like the string form."""
+    data = DIFF.encode()
+    diff = SpooledDiff.from_chunks((data[i:i + 7] for i in range(0, len(data), 7)), max_memory=16)
+
+    assert diff._file._rolled
+    assert "".join(diff.iter_lines()) == DIFF
+    assert str(diff) == DIFF
+    assert len(diff) == len(data)
+    assert parse_unified_diff(diff) == parse_unified_diff(DIFF)
+
+
+def test_bounded_diff_text_cuts_at_line_boundary():
+    """DOD: Tests that prompt text is capped at a line boundary with a truncation note, for both spooled and string diffs."""
+    diff = SpooledDiff.from_chunks([DIFF.encode()])
+
+    text = bounded_diff_text(diff, limit=45)
+    assert text.startswith("diff --git a/app.py b/app.py\n--- a/app.py\n")
+    assert "+++ b/app.py" not in text
+    assert f"of {len(DIFF)} bytes shown" in text
+    assert bounded_diff_text(DIFF, limit=45).startswith("diff --git a/app.py b/app.py\n--- a/app.py\n")
+    assert bounded_diff_text(diff, limit=10_000) == DIFF
+
+
+def test_get_pr_diff_streams_into_spool_and_replays_on_304(tmp_path):
+    """DOD: Tests that get_pr_diff streams the body into a SpooledDiff, caches it, and replays it from the cache on 304."""
+    client = GitHubClient(http_cache=HttpResponseCache(root=str(tmp_path), max_bytes=1024 * 1024))
+    first = make_diff_response(DIFF.encode(), headers={"ETag": '"d1"'})
+    not_modified = make_diff_response(b"", status_code=304)
+
+    with patch("shared.integrations.clients.github_client.requests.Session.get", side_effect=[first, not_modified]) as mock_get:
+        assert str(client.get_pr_diff("user", "repo", 1, "token")) == DIFF
+        assert str(client.get_pr_diff("user", "repo", 1, "token")) == DIFF
+
+    assert mock_get.call_args_list[0].kwargs["stream"] is True
+    assert mock_get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"d1"'
+    assert client.http_cache.not_modified == 1